@@ -0,0 +1,4 @@
+"""Micro-benchmarks.
+
+Every module can be launched directly, e.g. `python -m benchmarks.mint_decoder`.
+"""
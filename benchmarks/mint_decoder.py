@@ -0,0 +1,27 @@
+"""Benchmark `MintNFTDecoder` against the generic `InputDecoder`."""
+from timeit import repeat
+
+from eth_abi.abi import encode
+
+from intape.core.rpc import InputDecoder, MintNFTDecoder
+from intape.core.rpc.erc721_abi import ERC721_ABI
+from intape.core.rpc.mint import MINT_NFT_SELECTOR
+
+NUMBER = 10_000
+
+
+def main() -> None:
+    """Run benchmark."""
+    args = encode(
+        ["address", "string"],  # type: ignore
+        ["0x2302a71cb0e286e0f930ee47fdcd9bf82bac05dd", "ipfs://QmdkTR6yFkXLh96DtAgBqW2bDGsxYKDTKZSLGgHkP8niyU"],
+    )
+    tx_input = "0x" + (MINT_NFT_SELECTOR + args).hex()
+
+    for decoder in (InputDecoder(ERC721_ABI), MintNFTDecoder(ERC721_ABI)):  # type: ignore
+        best = min(repeat(lambda: decoder.decode_function(tx_input), number=NUMBER, repeat=5))
+        print(f"{decoder.__class__.__name__:<16} {best / NUMBER * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark list responses with double validation against the fast path."""
+from asyncio import new_event_loop
+from datetime import datetime
+from timeit import repeat
+from types import SimpleNamespace
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pytz import UTC
+
+from intape.core.serialization import list_response
+from intape.schemas.video import VideoSchema
+
+NUMBER = 20
+
+FIELD = create_response_field("Response", list[VideoSchema])
+
+
+def make_videos(count: int) -> list[SimpleNamespace]:
+    """Create objects with video columns."""
+    return [
+        SimpleNamespace(
+            id=i,
+            description=f"Video {i}",
+            tags=["music", "live"],
+            file_cid="QmdkTR6yFkXLh96DtAgBqW2bDGsxYKDTKZSLGgHkP8niyU",
+            created_at=datetime(2022, 12, 1, 12, 30, tzinfo=UTC),
+            user_id=1,
+            metadata_cid="ipfs://QmdkTR6yFkXLh96DtAgBqW2bDGsxYKDTKZSLGgHkP8niyU",
+        )
+        for i in range(count)
+    ]
+
+
+async def validated(videos: list[Any]) -> bytes:
+    """Serialize the way the endpoints did: `from_orm`, then `response_model` validation."""
+    content = await serialize_response(field=FIELD, response_content=[VideoSchema.from_orm(video) for video in videos])
+    return JSONResponse(content).body
+
+
+def main() -> None:
+    """Run benchmark."""
+    loop = new_event_loop()
+    for count in (10, 100, 1000):
+        videos = make_videos(count)
+        assert loop.run_until_complete(validated(videos)) == list_response(VideoSchema, videos).body
+        slow = min(repeat(lambda: loop.run_until_complete(validated(videos)), number=NUMBER, repeat=5))
+        fast = min(repeat(lambda: list_response(VideoSchema, videos), number=NUMBER, repeat=5))
+        print(
+            f"{count:>5} items: validated {slow / NUMBER * 1e3:8.3f} ms, "
+            f"fast {fast / NUMBER * 1e3:8.3f} ms, {slow / fast:5.1f}x"
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
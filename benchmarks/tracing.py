@@ -0,0 +1,48 @@
+"""Benchmark overhead of tracing spans outside of and inside sampled traces."""
+from asyncio import run
+from time import perf_counter
+from typing import Awaitable, Callable
+
+from intape.core.tracing import Tracer, span, traced
+
+NUMBER = 100_000
+
+
+async def noop() -> None:
+    """Do nothing."""
+
+
+@traced()
+async def traced_noop() -> None:
+    """Do nothing in a span."""
+
+
+async def measure(label: str, func: Callable[[], Awaitable[None]]) -> None:
+    """Print time per call of the coroutine function."""
+    best = float("inf")
+    for _ in range(5):
+        start = perf_counter()
+        for _ in range(NUMBER):
+            await func()
+        best = min(best, perf_counter() - start)
+    print(f"{label:<24} {best / NUMBER * 1e9:8.1f} ns/call")
+
+
+async def with_span() -> None:
+    """Do nothing in a span created by the context manager."""
+    with span("noop"):
+        pass
+
+
+async def main() -> None:
+    """Run benchmark."""
+    await measure("bare call", noop)
+    await measure("not sampled, decorator", traced_noop)
+    await measure("not sampled, span", with_span)
+    tracer = Tracer(sample_rate=1)
+    with tracer.trace("root"):
+        await measure("sampled, span", with_span)
+
+
+if __name__ == "__main__":
+    run(main())
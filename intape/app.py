@@ -5,13 +5,24 @@ from os.path import isfile
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
 
+from .core.cache import create_cache
 from .core.config import Config
 from .core.exceptions.handler import register_exception_handler
+from .core.loop_monitor import LoopMonitor
 from .core.middlewares import (
+    CacheMiddleware,
+    CompressionMiddleware,
     ConfigMiddleware,
     DBAsyncSessionMiddleware,
     IPFSAsyncSessionMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    QueryStatsMiddleware,
+    TracingMiddleware,
+    create_profile_endpoint,
+    metrics_endpoint,
 )
+from .core.tracing import Tracer, set_tracer
 from .routes import router
 
 log = logging.getLogger(__name__)
@@ -53,7 +64,19 @@ class App:
 
     def setup_app(self) -> None:
         """Add middlewares and routers to FastAPI application."""
+        tracer = Tracer.from_config(self.config)
+        set_tracer(tracer)
+        self.app.add_event_handler("shutdown", tracer.close)
+        cache = create_cache(self.config.CACHE_URL)
+        self.app.add_event_handler("shutdown", cache.close)
+        loop_monitor = LoopMonitor(slow_threshold=self.config.LOOP_SLOW_THRESHOLD)
+        self.app.add_event_handler("startup", loop_monitor.start)
+        self.app.add_event_handler("shutdown", loop_monitor.stop)
         self.app.include_router(router)
+        self.app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+        if self.config.PROFILING_TOKEN is not None:
+            profile_endpoint = create_profile_endpoint(self.config.PROFILING_TOKEN)
+            self.app.add_route("/debug/profile", profile_endpoint, include_in_schema=False)
 
         # cors middleware
         self.app.add_middleware(
@@ -69,5 +92,24 @@ class App:
         self.app.add_middleware(IPFSAsyncSessionMiddleware, config=self.config)
         # config middleware
         self.app.add_middleware(ConfigMiddleware, config=self.config)
+        # cache middleware
+        self.app.add_middleware(CacheMiddleware, cache=cache)
+        # SQL statement statistics middleware, outside of the db session middleware
+        self.app.add_middleware(
+            QueryStatsMiddleware,
+            routes=self.app.routes,
+            budget=self.config.QUERY_BUDGET,
+            strict=self.config.QUERY_BUDGET_STRICT,
+        )
+        # tracing middleware, starts traces of sampled requests
+        self.app.add_middleware(TracingMiddleware, routes=self.app.routes)
+        # profiling middleware, only if profiling is enabled
+        if self.config.PROFILING_TOKEN is not None:
+            self.app.add_middleware(ProfilingMiddleware, token=self.config.PROFILING_TOKEN)
+        # compression middleware, only if compression is enabled
+        if self.config.COMPRESSION_MIN_SIZE is not None:
+            self.app.add_middleware(CompressionMiddleware, minimum_size=self.config.COMPRESSION_MIN_SIZE)
+        # metrics middleware, the outermost one to measure the whole request
+        self.app.add_middleware(MetricsMiddleware, routes=self.app.routes)
         # exception handler
         register_exception_handler(self.app)
@@ -1,9 +1,10 @@
 """Module with main CLI function."""
-import logging
 from os import environ
 
 import click
 
+from intape.core.logs import DEFAULT_FORMAT, parse_sampling, setup_logging
+
 
 @click.group()
 def cli() -> None:
@@ -11,13 +12,10 @@ def cli() -> None:
     log_level = environ.get("LOG_LEVEL", "INFO").upper()
     if log_level not in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
         raise ValueError(f"Invalid log level: {log_level}")
-    log_format = environ.get("LOG_FORMAT", "%(asctime)s   %(name)-25s %(levelname)-8s %(message)s")
+    log_format = environ.get("LOG_FORMAT", DEFAULT_FORMAT)
     log_file = environ.get("LOG_FILE", None)
-    logging.basicConfig(
-        level=log_level,
-        format=log_format,
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler(log_file) if log_file else logging.NullHandler(),
-        ],
-    )
+    # Write logs as JSON objects
+    log_json = environ.get("LOG_JSON", "0").lower() in ("1", "true", "yes")
+    # Fraction of kept debug messages by logger, e.g. "intape.worker=0.1,intape.core.rpc=0.01"
+    log_sampling = parse_sampling(environ.get("LOG_SAMPLING", ""))
+    setup_logging(log_level, log_format, log_file, json_format=log_json, sampling=log_sampling)
@@ -0,0 +1,45 @@
+"""Shared cache.
+
+The backend is chosen by the `CACHE_URL` setting: `redis://host:port/db`
+shares entries between all processes, `memory://?maxsize=10000` keeps them
+in the memory of every process, and an empty URL, the default, disables
+caching. Entries are invalidated by the API and by the worker, so the memory
+backend only suits a single API process without the worker, like tests.
+"""
+from urllib.parse import parse_qs, urlsplit
+
+from .base import Cache
+from .entities import get_entity, set_current_entity, set_entity
+from .memory import MemoryCache
+from .null import NullCache
+from .redis import RedisCache, RedisConnection, RedisError
+
+__all__ = [
+    "Cache",
+    "MemoryCache",
+    "NullCache",
+    "RedisCache",
+    "RedisConnection",
+    "RedisError",
+    "create_cache",
+    "get_entity",
+    "set_current_entity",
+    "set_entity",
+]
+
+
+def create_cache(url: str | None) -> Cache:
+    """Create cache from URL.
+
+    Raises:
+        ValueError: If the URL scheme is not supported.
+    """
+    if not url:
+        return NullCache()
+    parts = urlsplit(url)
+    if parts.scheme == "memory":
+        query = parse_qs(parts.query)
+        return MemoryCache(maxsize=int(query.get("maxsize", ["10000"])[0]))
+    if parts.scheme == "redis":
+        return RedisCache.from_url(url)
+    raise ValueError(f"Unsupported cache URL scheme: {parts.scheme}")
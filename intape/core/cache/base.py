@@ -0,0 +1,47 @@
+"""Cache interface."""
+from abc import ABC, abstractmethod
+from typing import Iterable, Sequence
+
+
+class Cache(ABC):
+    """Cache of byte strings.
+
+    Entries expire after their TTL, and can be tagged, so that all entries of
+    a tag are deleted at once. Callers serialize values themselves, which
+    lets the same entries be shared by all processes in a network cache.
+
+    Examples:
+        >>> await cache.set("users:1", body, ttl=60, tags=["users:1"])
+        >>> await cache.get("users:1")
+        >>> await cache.invalidate_tags("users:1")
+    """
+
+    async def get(self, key: str) -> bytes | None:
+        """Get value of the key, or `None` if it is not cached."""
+        return (await self.get_many([key]))[0]
+
+    @abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> list[bytes | None]:
+        """Get values of the keys, `None` for keys which are not cached."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float | None = None, tags: Iterable[str] = ()) -> None:
+        """Set value of the key.
+
+        Args:
+            key (str): Key.
+            value (bytes): Value.
+            ttl (float | None): Lifetime of the entry in seconds, `None` to keep it until evicted.
+            tags (Iterable[str]): Tags of the entry.
+        """
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Delete the keys."""
+
+    @abstractmethod
+    async def invalidate_tags(self, *tags: str) -> None:
+        """Delete all entries of the tags."""
+
+    async def close(self) -> None:
+        """Close connections of the cache."""
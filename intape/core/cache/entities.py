@@ -0,0 +1,67 @@
+"""Cache of serialized entities.
+
+Entities are stored with their entity tags, so that conditional requests
+are answered from the cache too.
+
+Examples:
+    >>> cached = await get_entity(cache, key)
+    >>> if cached is not None:
+    >>>     return conditional_response(*cached, if_none_match)
+"""
+from typing import Awaitable, Callable, Iterable
+
+from .base import Cache
+from .null import NullCache
+
+
+async def get_entity(cache: Cache, key: str) -> tuple[str, bytes] | None:
+    """Get entity tag and body of the entity.
+
+    Returns:
+        tuple[str, bytes] | None: Entity tag and body, or `None` if the entity is not cached.
+    """
+    value = await cache.get(key)
+    if value is None:
+        return None
+    etag, _, body = value.partition(b"\n")
+    return etag.decode(), body
+
+
+async def set_entity(
+    cache: Cache, key: str, etag: str, body: bytes, ttl: float | None = None, tags: Iterable[str] = ()
+) -> None:
+    """Cache entity tag and body of the entity."""
+    # Entity tags never contain line breaks
+    await cache.set(key, etag.encode() + b"\n" + body, ttl, tags)
+
+
+async def set_current_entity(
+    cache: Cache,
+    key: str,
+    etag: str,
+    body: bytes,
+    get_etag: Callable[[], Awaitable[str | None]],
+    ttl: float | None = None,
+    tags: Iterable[str] = (),
+) -> None:
+    """Cache entity tag and body of the entity, unless it was changed since it was read.
+
+    Writers invalidate the entity after they commit, so a body read before
+    the commit must not be cached after the invalidation. The current tag is
+    checked right before the entity is cached. A write committed between the
+    check and the caching can still be missed, so cached entities are stale
+    for at most their TTL.
+
+    Args:
+        cache (Cache): Cache.
+        key (str): Key of the entity.
+        etag (str): Entity tag of the body.
+        body (bytes): Body.
+        get_etag (Callable[[], Awaitable[str | None]]): Function getting the current entity tag.
+        ttl (float | None): Lifetime of the entry in seconds.
+        tags (Iterable[str]): Tags of the entry.
+    """
+    if isinstance(cache, NullCache):
+        return
+    if await get_etag() == etag:
+        await set_entity(cache, key, etag, body, ttl, tags)
@@ -0,0 +1,78 @@
+"""Process-local cache."""
+from collections import OrderedDict
+from time import monotonic
+from typing import Iterable, Sequence
+
+from .base import Cache
+
+
+class MemoryCache(Cache):
+    """LRU cache in the memory of the process.
+
+    Entries are not shared between processes, so tag invalidation only
+    reaches the entries of the process that invalidates them, and entries
+    of other processes stay until they expire.
+    """
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        """Initialize cache.
+
+        Args:
+            maxsize (int): Maximum number of entries.
+        """
+        self.maxsize = maxsize
+        # Value, expiration time and tags by key, least recently used first
+        self._entries: OrderedDict[str, tuple[bytes, float | None, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        """Return number of entries, including expired ones."""
+        return len(self._entries)
+
+    async def get_many(self, keys: Sequence[str]) -> list[bytes | None]:
+        """Get values of the keys, `None` for keys which are not cached."""
+        now = monotonic()
+        values: list[bytes | None] = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                values.append(None)
+            elif entry[1] is not None and entry[1] <= now:
+                self._remove(key)
+                values.append(None)
+            else:
+                self._entries.move_to_end(key)
+                values.append(entry[0])
+        return values
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None, tags: Iterable[str] = ()) -> None:
+        """Set value of the key."""
+        self._remove(key)
+        tags = tuple(tags)
+        self._entries[key] = (value, None if ttl is None else monotonic() + ttl, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    async def delete(self, *keys: str) -> None:
+        """Delete the keys."""
+        for key in keys:
+            self._remove(key)
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        """Delete all entries of the tags."""
+        for tag in tags:
+            for key in self._tags.pop(tag, ()):
+                self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
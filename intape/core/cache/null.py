@@ -0,0 +1,21 @@
+"""Disabled cache."""
+from typing import Iterable, Sequence
+
+from .base import Cache
+
+
+class NullCache(Cache):
+    """Cache which doesn't keep anything."""
+
+    async def get_many(self, keys: Sequence[str]) -> list[bytes | None]:
+        """Return `None` for every key."""
+        return [None] * len(keys)
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None, tags: Iterable[str] = ()) -> None:
+        """Do nothing."""
+
+    async def delete(self, *keys: str) -> None:
+        """Do nothing."""
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        """Do nothing."""
@@ -0,0 +1,114 @@
+"""Response body compression.
+
+Bodies are compressed with brotli or gzip, whichever the client prefers. Compressed bodies are
+deterministic, so that the same body always has the same compressed bytes.
+
+Responses are compressed by `CompressionMiddleware`.
+"""
+import gzip
+import zlib
+from typing import Callable, Protocol
+
+import brotli
+
+# Smaller bodies don't get much smaller, and fit into a single packet anyway
+MINIMUM_SIZE = 500
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Types of bodies worth compressing, images and videos are already compressed
+COMPRESSIBLE_TYPES = frozenset(
+    {
+        "application/json",
+        "application/javascript",
+        "application/xml",
+        "image/svg+xml",
+        "text/css",
+        "text/csv",
+        "text/html",
+        "text/javascript",
+        "text/plain",
+        "text/xml",
+    }
+)
+
+
+class StreamCompressor(Protocol):
+    """Incremental compressor."""
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress the next chunk."""
+
+    def flush(self) -> bytes:
+        """Finish the stream."""
+
+
+class _GzipCompressor:
+    def __init__(self) -> None:
+        # 16 + MAX_WBITS writes the gzip header and trailer
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self) -> None:
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _gzip(data: bytes) -> bytes:
+    return gzip.compress(data, GZIP_LEVEL, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+# Supported encodings in the order of preference
+ENCODERS: dict[str, Callable[[bytes], bytes]] = {"br": _brotli, "gzip": _gzip}
+COMPRESSORS: dict[str, Callable[[], StreamCompressor]] = {"br": _BrotliCompressor, "gzip": _GzipCompressor}
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Choose the supported encoding with the highest quality in the `Accept-Encoding` header.
+
+    Returns:
+        str | None: Encoding, or `None` if the body should be sent as is.
+    """
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        param, _, value = params.partition("=")
+        if param.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                continue
+        qualities[name] = quality
+
+    best = None
+    best_quality = 0.0
+    for encoding in ENCODERS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    """Check if bodies of the content type are worth compressing."""
+    return content_type.partition(";")[0].strip().lower() in COMPRESSIBLE_TYPES
@@ -32,10 +32,30 @@ class Config:
     DATABASE_URL: str
     IPFS_URL: str
     SECRET: str
-    RPC_URL: str
+    RPC_URLS: tuple[str, ...]
     CONTRACT_ADDRESS: str = "0xe67bf587f00afdd30a564fe9a436ecf8845a6829"
     IPFS_AUTH: tuple[str, str] | None = None
     ORIGINS: tuple[str, ...] = ("*",)
+    RPC_TIMEOUT: float = 10.0
+    RPC_RETRIES: int = 3
+    RPC_CACHE_SIZE: int = 10000
+    RPC_CACHE_FILE: str | None = None
+    RPC_RATE_LIMIT: float = 10.0
+    RPC_MAX_CONCURRENCY: int = 16
+    RPC_WS_URL: str | None = None
+    WORKER_CONCURRENCY: int = 4
+    WORKER_HTTP_PORT: int | None = 9100
+    QUERY_BUDGET: int = 20
+    QUERY_BUDGET_STRICT: bool = False
+    TRACE_SAMPLE_RATE: float = 0.0
+    TRACE_SLOW_THRESHOLD: float | None = 1.0
+    TRACE_EXPORTERS: tuple[str, ...] = ()
+    TRACE_OTLP_URL: str = "http://localhost:4318/v1/traces"
+    PROFILING_TOKEN: str | None = None
+    LOOP_SLOW_THRESHOLD: float | None = 0.25
+    COMPRESSION_MIN_SIZE: int | None = 500
+    CACHE_URL: str | None = None
+    CACHE_TTL: float = 60.0
 
     @staticmethod
     def _get_env(name: str, default: str | None = None) -> str:
@@ -83,12 +103,39 @@ class Config:
         else:
             CONTRACT_ADDRESS = contract_address
 
+        # RPC_URL may contain several comma-separated endpoints for failover
+        RPC_URLS = tuple(url.strip() for url in cls._get_env("RPC_URL").split(",") if url.strip())
+        if not RPC_URLS:
+            raise ValueError("Environment variable RPC_URL does not contain any URL")
+
         return cls(
             DATABASE_URL=cls._get_env("DATABASE_URL"),
             IPFS_URL=cls._get_env("IPFS_URL"),
             IPFS_AUTH=IPFS_AUTH,
             CONTRACT_ADDRESS=CONTRACT_ADDRESS,
-            RPC_URL=cls._get_env("RPC_URL"),
+            RPC_URLS=RPC_URLS,
+            RPC_TIMEOUT=float(cls._get_env("RPC_TIMEOUT", "10")),
+            RPC_RETRIES=int(cls._get_env("RPC_RETRIES", "3")),
+            RPC_CACHE_SIZE=int(cls._get_env("RPC_CACHE_SIZE", "10000")),
+            RPC_CACHE_FILE=cls._get_env("RPC_CACHE_FILE", "") or None,
+            RPC_RATE_LIMIT=float(cls._get_env("RPC_RATE_LIMIT", "10")),
+            RPC_MAX_CONCURRENCY=int(cls._get_env("RPC_MAX_CONCURRENCY", "16")),
+            RPC_WS_URL=cls._get_env("RPC_WS_URL", "") or None,
+            WORKER_CONCURRENCY=int(cls._get_env("WORKER_CONCURRENCY", "4")),
+            WORKER_HTTP_PORT=int(cls._get_env("WORKER_HTTP_PORT", "9100")) or None,
+            QUERY_BUDGET=int(cls._get_env("QUERY_BUDGET", "20")),
+            QUERY_BUDGET_STRICT=cls._get_env("QUERY_BUDGET_STRICT", "0").lower() in ("1", "true", "yes"),
+            TRACE_SAMPLE_RATE=float(cls._get_env("TRACE_SAMPLE_RATE", "0")),
+            TRACE_SLOW_THRESHOLD=float(cls._get_env("TRACE_SLOW_THRESHOLD", "1")) or None,
+            TRACE_EXPORTERS=tuple(
+                name.strip() for name in cls._get_env("TRACE_EXPORTERS", "").split(",") if name.strip()
+            ),
+            TRACE_OTLP_URL=cls._get_env("TRACE_OTLP_URL", "http://localhost:4318/v1/traces"),
+            PROFILING_TOKEN=cls._get_env("PROFILING_TOKEN", "") or None,
+            LOOP_SLOW_THRESHOLD=float(cls._get_env("LOOP_SLOW_THRESHOLD", "0.25")) or None,
+            COMPRESSION_MIN_SIZE=int(cls._get_env("COMPRESSION_MIN_SIZE", "500")) or None,
+            CACHE_URL=cls._get_env("CACHE_URL", "") or None,
+            CACHE_TTL=float(cls._get_env("CACHE_TTL", "60")),
             SECRET=cls._get_env("SECRET"),
             ORIGINS=ORIGINS,
         )
@@ -0,0 +1,46 @@
+"""Entity tags for conditional requests.
+
+Tags of database rows are built from the table, the primary key and the
+version counter of the row, so they can be checked with a query of the
+version alone, before the row is loaded and serialized.
+
+Examples:
+    >>> etag = await VideoModel.get_etag(db, id=video_id)
+    >>> if etag is not None and etag_matches(if_none_match, etag):
+    >>>     return not_modified(etag)
+"""
+from typing import Any
+
+from starlette.responses import Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Return strong entity tag made of the parts."""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check if the `If-None-Match` header matches the entity tag.
+
+    Tags are compared with the weak comparison, as required for
+    `If-None-Match`.
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """Return `304 Not Modified` response with the entity tag."""
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def conditional_response(etag: str, body: bytes, if_none_match: str | None) -> Response:
+    """Return JSON body with the entity tag, or `304 Not Modified` if the tag matches."""
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return Response(body, media_type="application/json", headers={"ETag": etag})
@@ -3,8 +3,12 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from intape.core.metrics import Counter
+
 from .abc import AbstractException
 
+EXCEPTIONS = Counter("intape_http_exceptions_total", "Exceptions returned to clients.", ["exception"])
+
 
 class ErrorSchema(BaseModel):
     """Error response for AbstractException."""
@@ -26,6 +30,7 @@ def register_exception_handler(app: FastAPI) -> None:
         Returns:
             JSON serialized ErrorModel.
         """
+        EXCEPTIONS.labels(exc.__class__.__name__).inc()
         return JSONResponse(
             status_code=exc.status_code,
             content=ErrorSchema(
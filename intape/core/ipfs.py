@@ -0,0 +1,76 @@
+"""IPFS cluster client."""
+from hashlib import sha256
+from time import monotonic
+
+import aiohttp
+from asyncipfscluster import IPFSClient
+
+from .metrics import Histogram
+from .tracing import span
+
+IPFS_DURATION = Histogram("intape_ipfs_request_duration_seconds", "Duration of IPFS cluster requests.", ["operation"])
+
+# Files up to the size of a chunk are stored in a single block
+CHUNK_SIZE = 256 * 1024
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def _varint(value: int) -> bytes:
+    data = bytearray()
+    while value > 0x7F:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+
+def _bytes_field(number: int, value: bytes) -> bytes:
+    return _varint(number << 3 | 2) + _varint(len(value)) + value
+
+
+def _base58(data: bytes) -> str:
+    number = int.from_bytes(data, "big")
+    digits = ""
+    while number:
+        number, digit = divmod(number, 58)
+        digits = BASE58_ALPHABET[digit] + digits
+    return "1" * (len(data) - len(data.lstrip(b"\0"))) + digits
+
+
+def compute_cid(data: bytes) -> str:
+    """Return CID the cluster gives to the bytes, without adding them.
+
+    The CID is computed like `ipfs add` with the default options does: the
+    bytes are wrapped in a UnixFS file node of the DAG-PB codec, which is
+    hashed with SHA-256 into a CIDv0.
+
+    Raises:
+        ValueError: If the data is larger than a single chunk.
+    """
+    if len(data) > CHUNK_SIZE:
+        raise ValueError("Data larger than a chunk is split into many blocks")
+    # UnixFS node with the type File, the data and the file size
+    unixfs = b"\x08\x02" + (_bytes_field(2, data) if data else b"") + b"\x18" + _varint(len(data))
+    node = _bytes_field(1, unixfs)
+    return _base58(b"\x12\x20" + sha256(node).digest())
+
+
+class InstrumentedIPFSClient(IPFSClient):  # type: ignore[misc]
+    """IPFS cluster client that records request durations and spans."""
+
+    async def _add_formdata(self, data: aiohttp.FormData, name: str | None = None) -> str:
+        start = monotonic()
+        try:
+            with span("ipfs.add"):
+                return await super()._add_formdata(data, name)
+        finally:
+            IPFS_DURATION.labels("add").observe(monotonic() - start)
+
+    async def remove(self, cid: str) -> None:
+        """Remove CID from cluster."""
+        start = monotonic()
+        try:
+            with span("ipfs.remove", cid=cid):
+                await super().remove(cid)
+        finally:
+            IPFS_DURATION.labels("remove").observe(monotonic() - start)
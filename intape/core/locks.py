@@ -0,0 +1,48 @@
+"""Postgres advisory locks."""
+
+from contextlib import asynccontextmanager
+from hashlib import blake2b
+from logging import getLogger
+from typing import AsyncIterator
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+log = getLogger(__name__)
+
+
+def lock_key(name: str) -> int:
+    """Return advisory lock key for the name.
+
+    Postgres advisory lock keys are signed 64-bit integers, and the key must be
+    the same in every process, so the built-in `hash` can't be used.
+    """
+    return int.from_bytes(blake2b(name.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+@asynccontextmanager
+async def advisory_lock(engine: AsyncEngine, name: str) -> AsyncIterator[bool]:
+    """Try to take session-level advisory lock with the given name.
+
+    The lock is held on a dedicated connection until the context exits. If the
+    process dies, Postgres closes the connection and releases the lock, so
+    another process can take it over.
+
+    Examples:
+        >>> async with advisory_lock(engine, "remove_old_files") as acquired:
+        >>>     if acquired:
+        >>>         ...
+
+    Yields:
+        bool: Whether the lock was acquired.
+    """
+    key = lock_key(name)
+    async with engine.connect() as conn:
+        acquired: bool = await conn.scalar(select(func.pg_try_advisory_lock(key)))
+        if not acquired:
+            log.debug("Lock %s is held by another process", name)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await conn.scalar(select(func.pg_advisory_unlock(key)))
@@ -0,0 +1,203 @@
+"""Non-blocking logging.
+
+Log calls only put records to a queue, and a background thread formats them
+and writes them to the console and the log file, so slow disks or pipes
+don't block the event loop. High-volume debug messages can be sampled per
+logger before they are even queued.
+
+Examples:
+    >>> setup_logging("DEBUG", json_format=True, sampling={"intape.worker": 0.1})
+"""
+import atexit
+import json
+import logging
+from copy import copy
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from random import random
+from typing import Any
+
+from .tracing import current_span
+
+DEFAULT_FORMAT = "%(asctime)s   %(name)-25s %(levelname)-8s %(message)s"
+
+# Attributes of every log record, everything else was passed in `extra`
+_RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+_listener: QueueListener | None = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as JSON objects, one per line.
+
+    Fields passed in `extra` and the ID of the sampled trace are added to
+    the object.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format record."""
+        data: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = record.stack_info
+        return json.dumps(data, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of low-level records of selected loggers.
+
+    Rates apply to the logger and its children, the most specific logger
+    wins. Records above `level` are always kept.
+    """
+
+    def __init__(self, rates: dict[str, float], level: int = logging.DEBUG) -> None:
+        """Initialize filter.
+
+        Args:
+            rates (dict[str, float]): Fraction of kept records by logger name, from 0 to 1.
+            level (int): Maximum level of sampled records.
+        """
+        super().__init__()
+        self.rates = rates
+        self.level = level
+        self._cache: dict[str, float | None] = {}
+
+    def _rate(self, name: str) -> float | None:
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        rate = None
+        prefix = name
+        while prefix:
+            if prefix in self.rates:
+                rate = self.rates[prefix]
+                break
+            prefix = prefix.rpartition(".")[0]
+        self._cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Check if the record is kept."""
+        if record.levelno > self.level:
+            return True
+        rate = self._rate(record.name)
+        return rate is None or random() < rate
+
+
+class LazyQueueHandler(QueueHandler):
+    """Queue handler that leaves formatting to the listener thread.
+
+    The standard handler formats the whole record in the calling thread.
+    This one only merges the arguments into the message, so that mutable
+    arguments can't change before the record is written, and renders the
+    traceback, which refers to frames of the calling thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Prepare record for the queue."""
+        record = copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        span = current_span()
+        if span is not None:
+            record.trace_id = f"{span.trace_id:032x}"
+        return record
+
+
+def parse_sampling(value: str) -> dict[str, float]:
+    """Parse sampling rates, e.g. `intape.worker=0.1,intape.core.rpc=0.01`.
+
+    Raises:
+        ValueError: If the value is malformed.
+    """
+    rates = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def setup_logging(
+    level: str | int = logging.INFO,
+    fmt: str = DEFAULT_FORMAT,
+    log_file: str | None = None,
+    json_format: bool = False,
+    sampling: dict[str, float] | None = None,
+) -> None:
+    """Send records of the root logger through the queue to the console and the log file.
+
+    Calling it again replaces the previous configuration. Queued records are
+    written out at exit.
+
+    Args:
+        level (str | int): Level of the root logger.
+        fmt (str): Format of text records.
+        log_file (str | None): Path of the log file.
+        json_format (bool): Write records as JSON objects instead of text.
+        sampling (dict[str, float] | None): Fraction of kept debug records by logger name.
+    """
+    global _listener
+    formatter = JSONFormatter() if json_format else logging.Formatter(fmt)
+    handlers: list[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue: SimpleQueue[logging.LogRecord] = SimpleQueue()
+    queue_handler = LazyQueueHandler(queue)
+    if sampling:
+        queue_handler.addFilter(SamplingFilter(sampling))
+
+    listener = QueueListener(queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    root = logging.getLogger()
+    _remove_queue_handlers(root)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    if _listener is None:
+        atexit.register(stop_logging)
+    else:
+        _stop_listener(_listener)
+    _listener = listener
+
+
+def _remove_queue_handlers(logger: logging.Logger) -> None:
+    for handler in logger.handlers[:]:
+        if isinstance(handler, LazyQueueHandler):
+            logger.removeHandler(handler)
+
+
+def _stop_listener(listener: QueueListener) -> None:
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+def stop_logging() -> None:
+    """Write out queued records and close the log handlers."""
+    global _listener
+    _remove_queue_handlers(logging.getLogger())
+    if _listener is not None:
+        _stop_listener(_listener)
+        _listener = None
@@ -0,0 +1,105 @@
+"""Event loop lag monitor.
+
+A task sleeps for a fixed interval and measures how late it is woken up,
+which is how long other callbacks kept the loop busy. A watchdog thread
+checks that the task wakes up in time, and when the loop is blocked longer
+than the threshold, it logs the stack of the blocking code while it is
+still running.
+"""
+import sys
+from asyncio import CancelledError, Task, get_running_loop, sleep
+from logging import getLogger
+from threading import Event, Thread, get_ident
+from time import monotonic
+from traceback import format_stack
+
+from .metrics import Counter, Gauge, Histogram
+
+log = getLogger(__name__)
+
+LOOP_LAG = Gauge("intape_event_loop_lag_seconds", "Delay of the last event loop wake-up.")
+LOOP_LAG_DISTRIBUTION = Histogram(
+    "intape_event_loop_lag_distribution_seconds",
+    "Delay of the event loop wake-ups.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+SLOW_CALLBACKS = Counter("intape_event_loop_slow_callbacks_total", "Callbacks that blocked the event loop too long.")
+
+
+class LoopMonitor:
+    """Measure event loop lag and report callbacks that block the loop.
+
+    Examples:
+        >>> monitor = LoopMonitor(slow_threshold=0.25)
+        >>> await monitor.start()
+        >>> ...
+        >>> await monitor.stop()
+    """
+
+    def __init__(self, interval: float = 0.5, slow_threshold: float | None = 0.25) -> None:
+        """Initialize monitor.
+
+        Args:
+            interval (float): Time between measurements in seconds.
+            slow_threshold (float | None): Log callbacks blocking the loop longer than this number of seconds.
+                `None` disables the watchdog thread.
+        """
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self._task: Task[None] | None = None
+        self._watchdog: Thread | None = None
+        self._stopped = Event()
+        self._loop_thread = 0
+        # Monotonic time when the measuring task is expected to wake up
+        self._deadline = 0.0
+        self._reported_deadline = 0.0
+
+    async def start(self) -> None:
+        """Start measuring the running loop."""
+        loop = get_running_loop()
+        self._loop_thread = get_ident()
+        self._deadline = monotonic() + self.interval
+        self._stopped.clear()
+        self._task = loop.create_task(self._measure())
+        if self.slow_threshold is not None:
+            self._watchdog = Thread(target=self._watch, args=(self.slow_threshold,), name="intape-loop-watchdog")
+            self._watchdog.daemon = True
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop measuring."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _measure(self) -> None:
+        while True:
+            self._deadline = monotonic() + self.interval
+            await sleep(self.interval)
+            lag = max(monotonic() - self._deadline, 0)
+            LOOP_LAG.set(lag)
+            LOOP_LAG_DISTRIBUTION.observe(lag)
+            if self.slow_threshold is not None and lag >= self.slow_threshold:
+                log.warning("Event loop was blocked for %.1f ms", lag * 1000)
+
+    def _watch(self, threshold: float) -> None:
+        while not self._stopped.wait(threshold / 2):
+            deadline = self._deadline
+            if monotonic() - deadline < threshold or deadline == self._reported_deadline:
+                continue
+            self._reported_deadline = deadline
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            SLOW_CALLBACKS.inc()
+            log.warning(
+                "Event loop is blocked for more than %.1f ms by:\n%s", threshold * 1000, "".join(format_stack(frame))
+            )
@@ -0,0 +1,270 @@
+"""Prometheus metrics.
+
+Minimal implementation of counters, gauges and histograms, rendered in the
+Prometheus text exposition format. Updating a metric is a dict lookup and an
+addition, so it can be done on hot paths.
+
+Examples:
+    >>> REQUESTS = Counter("intape_requests_total", "Total requests.", ["route"])
+    >>> REQUESTS.labels("/v1/ping").inc()
+    >>> print(REGISTRY.render())
+"""
+from bisect import bisect_left
+from math import inf
+from typing import Any, Callable, Generic, Iterable, Sequence, TypeVar
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0, inf)
+
+
+def _format_value(value: float) -> str:
+    if value == inf:
+        return "+Inf"
+    if value == -inf:
+        return "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class CounterValue:
+    """Value of a counter with particular labels."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        """Initialize the value."""
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the counter."""
+        self.value += amount
+
+
+class GaugeValue:
+    """Value of a gauge with particular labels."""
+
+    __slots__ = ("value", "function")
+
+    def __init__(self) -> None:
+        """Initialize the value."""
+        self.value = 0.0
+        self.function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        """Set the gauge."""
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the gauge."""
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrement the gauge."""
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the gauge by calling the function on every collection."""
+        self.function = function
+
+    def get(self) -> float:
+        """Return the current value."""
+        return self.function() if self.function is not None else self.value
+
+
+class HistogramValue:
+    """Value of a histogram with particular labels."""
+
+    __slots__ = ("upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: tuple[float, ...]) -> None:
+        """Initialize the value."""
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * len(upper_bounds)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Observe the value."""
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+
+V = TypeVar("V")
+
+
+class Metric(Generic[V]):
+    """Base metric with optional labels."""
+
+    type = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), registry: "Registry | None" = None
+    ) -> None:
+        """Initialize the metric and register it.
+
+        Args:
+            name (str): Metric name.
+            documentation (str): Help text.
+            labelnames (Iterable[str]): Label names.
+            registry (Registry | None): Registry to add the metric to. Defaults to `REGISTRY`.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], V] = {}
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _new_value(self) -> V:
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> V:
+        """Return the value with given label values."""
+        value = self._values.get(values)
+        if value is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"Expected {len(self.labelnames)} label values for {self.name}, got {len(values)}")
+            value = self._values[values] = self._new_value()
+        return value
+
+    def clear(self) -> None:
+        """Remove all values."""
+        self._values.clear()
+
+    def render(self) -> list[str]:
+        """Render the metric in the text exposition format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for labels, value in list(self._values.items()):
+            lines.extend(self._render_value(_format_labels(self.labelnames, labels), labels, value))
+        return lines
+
+    def _render_value(self, labels: str, _values: tuple[str, ...], value: V) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric[CounterValue]):
+    """Monotonically increasing counter."""
+
+    type = "counter"
+
+    def _new_value(self) -> CounterValue:
+        return CounterValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the counter without labels."""
+        self.labels().inc(amount)
+
+    def _render_value(self, labels: str, _values: tuple[str, ...], value: CounterValue) -> list[str]:
+        return [f"{self.name}{labels} {_format_value(value.value)}"]
+
+
+class Gauge(Metric[GaugeValue]):
+    """Value that can go up and down."""
+
+    type = "gauge"
+
+    def _new_value(self) -> GaugeValue:
+        return GaugeValue()
+
+    def set(self, value: float) -> None:
+        """Set the gauge without labels."""
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the gauge without labels."""
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrement the gauge without labels."""
+        self.labels().dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the gauge without labels by calling the function."""
+        self.labels().set_function(function)
+
+    def _render_value(self, labels: str, _values: tuple[str, ...], value: GaugeValue) -> list[str]:
+        return [f"{self.name}{labels} {_format_value(value.get())}"]
+
+
+class Histogram(Metric[HistogramValue]):
+    """Distribution of observed values in buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: "Registry | None" = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initialize the histogram.
+
+        Args:
+            name (str): Metric name.
+            documentation (str): Help text.
+            labelnames (Iterable[str]): Label names.
+            registry (Registry | None): Registry to add the metric to. Defaults to `REGISTRY`.
+            buckets (Sequence[float]): Upper bounds of the buckets.
+        """
+        upper_bounds = tuple(sorted(buckets))
+        if not upper_bounds or upper_bounds[-1] != inf:
+            upper_bounds += (inf,)
+        self.upper_bounds = upper_bounds
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_value(self) -> HistogramValue:
+        return HistogramValue(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        """Observe the value without labels."""
+        self.labels().observe(value)
+
+    def _render_value(self, labels: str, values: tuple[str, ...], value: HistogramValue) -> list[str]:
+        lines = []
+        names = self.labelnames + ("le",)
+        total = 0
+        for upper_bound, count in zip(self.upper_bounds, value.counts):
+            total += count
+            bucket_labels = _format_labels(names, values + (_format_value(upper_bound),))
+            lines.append(f"{self.name}_bucket{bucket_labels} {total}")
+        lines.append(f"{self.name}_sum{labels} {_format_value(value.sum)}")
+        lines.append(f"{self.name}_count{labels} {total}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics."""
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self.metrics: dict[str, Metric[Any]] = {}
+
+    def register(self, metric: Metric[Any]) -> None:
+        """Add the metric.
+
+        Raises:
+            ValueError: If a metric with the same name is already registered.
+        """
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Render all metrics in the text exposition format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
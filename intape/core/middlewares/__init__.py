@@ -1,6 +1,24 @@
 """FastAPI middlewares."""
+from .cache import CacheMiddleware
+from .compression import CompressionMiddleware
 from .config import ConfigMiddleware
 from .db import DBAsyncSessionMiddleware
 from .ipfs import IPFSAsyncSessionMiddleware
+from .metrics import MetricsMiddleware, metrics_endpoint
+from .profiling import ProfilingMiddleware, create_profile_endpoint
+from .query_stats import QueryStatsMiddleware
+from .tracing import TracingMiddleware
 
-__all__ = ["DBAsyncSessionMiddleware", "IPFSAsyncSessionMiddleware", "ConfigMiddleware"]
+__all__ = [
+    "DBAsyncSessionMiddleware",
+    "IPFSAsyncSessionMiddleware",
+    "ConfigMiddleware",
+    "MetricsMiddleware",
+    "metrics_endpoint",
+    "QueryStatsMiddleware",
+    "TracingMiddleware",
+    "ProfilingMiddleware",
+    "create_profile_endpoint",
+    "CompressionMiddleware",
+    "CacheMiddleware",
+]
@@ -0,0 +1,24 @@
+"""Cache middleware."""
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from intape.core.cache import Cache
+
+
+class CacheMiddleware:
+    """Set the shared cache in the request state."""
+
+    def __init__(self, app: ASGIApp, cache: Cache) -> None:
+        """Initialize.
+
+        Args:
+            app (ASGIApp): ASGI application.
+            cache (Cache): Cache shared by all requests.
+        """
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle request."""
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["cache"] = self.cache
+        await self.app(scope, receive, send)
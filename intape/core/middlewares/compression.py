@@ -0,0 +1,161 @@
+"""Compression middleware."""
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from intape.core.compression import (
+    COMPRESSORS,
+    ENCODERS,
+    MINIMUM_SIZE,
+    StreamCompressor,
+    choose_encoding,
+    is_compressible,
+)
+
+
+def _should_compress(message: Message) -> bool:
+    status = message["status"]
+    if status < 200 or status in (204, 304):
+        return False
+    headers = Headers(raw=message["headers"])
+    return (
+        "content-encoding" not in headers
+        and "no-transform" not in headers.get("cache-control", "")
+        and is_compressible(headers.get("content-type", ""))
+    )
+
+
+def _encoded_etag(etag: str, encoding: str) -> str:
+    """Return entity tag of the body variant compressed with the encoding.
+
+    Every content coding of a body is a different representation, so it
+    needs its own strong validator.
+    """
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _decode_if_none_match(if_none_match: str, encoding: str) -> tuple[str, dict[str, str]]:
+    """Replace entity tags of the encoded variants with the tags of the bodies.
+
+    Returns:
+        tuple[str, dict[str, str]]: Header for the application, and the tags
+            sent by the client by the tags of the bodies.
+    """
+    suffix = f'-{encoding}"'
+    tags = []
+    variants = {}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        opaque = tag.removeprefix("W/")
+        if opaque.endswith(suffix):
+            decoded = opaque[: -len(suffix)] + '"'
+            variants[decoded] = opaque
+            tag = decoded
+        tags.append(tag)
+    return ", ".join(tags), variants
+
+
+class CompressionMiddleware:
+    """Compress response bodies in the encoding accepted by the client.
+
+    Only bodies of the compressible content types, at least `minimum_size`
+    bytes long, are compressed. Responses sent in a single message are
+    compressed at once, streaming responses chunk by chunk. Responses which
+    are already encoded are sent as is.
+
+    Compressed bodies get the `ETag` of the body with the encoding appended,
+    for example `"videos-1-3-gzip"`. The tags are translated back in
+    `If-None-Match`, so the application compares its own tags, and
+    `304 Not Modified` responses get the tag of the variant the client has.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE) -> None:
+        """Initialize.
+
+        Args:
+            app (ASGIApp): ASGI application.
+            minimum_size (int): Send bodies smaller than this number of bytes uncompressed.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+
+        # Entity tags of the variants the client has, by the tags of the bodies
+        variants: dict[str, str] = {}
+        if_none_match = request_headers.get("if-none-match")
+        if encoding is not None and if_none_match:
+            if_none_match, variants = _decode_if_none_match(if_none_match, encoding)
+            if variants:
+                # The scope is changed in place, so that the outer middlewares
+                # see what the application writes into it, like the endpoint
+                scope["headers"] = [(name, value) for name, value in scope["headers"] if name != b"if-none-match"] + [
+                    (b"if-none-match", if_none_match.encode("latin-1"))
+                ]
+
+        # The start message is held back until the first body message shows
+        # whether the body is compressed
+        start: Message | None = None
+        compressor: StreamCompressor | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                if message["status"] == 304 and variants:
+                    headers = MutableHeaders(scope=message)
+                    etag = headers.get("etag")
+                    if etag in variants:
+                        headers["ETag"] = variants[etag]
+                        headers.add_vary_header("Accept-Encoding")
+                if _should_compress(message):
+                    start = message
+                else:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(scope=start)
+                content_length = int(headers.get("content-length", -1))
+                if (not more_body and len(body) < self.minimum_size) or 0 <= content_length < self.minimum_size:
+                    await send(start)
+                    await send(message)
+                    start = None
+                    return
+                # Large bodies are sent in the variant chosen by the encoding
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    await send(start)
+                    await send(message)
+                    start = None
+                    return
+                headers["Content-Encoding"] = encoding
+                if "etag" in headers:
+                    headers["ETag"] = _encoded_etag(headers["etag"], encoding)
+                if not more_body:
+                    body = ENCODERS[encoding](body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                compressor = COMPRESSORS[encoding]()
+                await send(start)
+
+            data = compressor.compress(body)
+            if not more_body:
+                data += compressor.flush()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
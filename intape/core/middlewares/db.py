@@ -14,9 +14,15 @@ from starlette.types import ASGIApp
 
 from intape.core.config import Config
 from intape.core.exceptions import DatabaseException
+from intape.core.metrics import Gauge
+from intape.core.query_stats import instrument_engine
 
 log = logging.getLogger(__name__)
 
+DB_POOL_SIZE = Gauge("intape_db_pool_size", "Size of the database connection pool.")
+DB_POOL_CHECKED_OUT = Gauge("intape_db_pool_checked_out", "Database connections in use.")
+DB_POOL_OVERFLOW = Gauge("intape_db_pool_overflow", "Database connections open above the pool size.")
+
 
 class DBAsyncSessionMiddleware(BaseHTTPMiddleware):
     """Database session middleware."""
@@ -25,6 +31,11 @@ class DBAsyncSessionMiddleware(BaseHTTPMiddleware):
         """Initialize."""
         super().__init__(app)
         engine = create_async_engine(config.DATABASE_URL)
+        instrument_engine(engine)
+        pool = engine.pool
+        DB_POOL_SIZE.set_function(pool.size)  # type: ignore
+        DB_POOL_CHECKED_OUT.set_function(pool.checkedout)  # type: ignore
+        DB_POOL_OVERFLOW.set_function(lambda: max(pool.overflow(), 0))  # type: ignore
         self.async_session_maker = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
@@ -2,7 +2,7 @@
 
 import logging
 
-from asyncipfscluster import IPFSClient, exceptions
+from asyncipfscluster import exceptions
 from fastapi import Request, Response
 from starlette.middleware.base import (
     BaseHTTPMiddleware,
@@ -12,6 +12,7 @@ from starlette.types import ASGIApp
 
 from intape.core.config import Config
 from intape.core.exceptions import IPFSException
+from intape.core.ipfs import InstrumentedIPFSClient
 
 log = logging.getLogger(__name__)
 
@@ -27,7 +28,7 @@ class IPFSAsyncSessionMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
         """Dispatch."""
         try:
-            async with IPFSClient(self.config.IPFS_URL, self.config.IPFS_AUTH) as session:
+            async with InstrumentedIPFSClient(self.config.IPFS_URL, self.config.IPFS_AUTH) as session:
                 request.state.ipfs = session
                 return await call_next(request)
         except exceptions.IPFSException as error:
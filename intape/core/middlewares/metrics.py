@@ -0,0 +1,74 @@
+"""Request metrics middleware."""
+
+from time import perf_counter
+from typing import Sequence
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from intape.core.metrics import (
+    CONTENT_TYPE,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+)
+
+from .routes import RouteTemplates
+
+REQUESTS = Counter("intape_http_requests_total", "Finished HTTP requests.", ["method", "route", "status"])
+REQUEST_DURATION = Histogram("intape_http_request_duration_seconds", "Duration of HTTP requests.", ["method", "route"])
+IN_FLIGHT = Gauge("intape_http_requests_in_flight", "HTTP requests being processed.")
+
+
+class MetricsMiddleware:
+    """Request metrics middleware.
+
+    Requests are labeled with the route template, e.g. `/v1/video/{video_id}`,
+    so that the number of label values doesn't grow with the number of
+    distinct paths. It is a plain ASGI middleware, so it adds only a couple of
+    dict lookups and a closure per request.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute]) -> None:
+        """Initialize.
+
+        Args:
+            app (ASGIApp): ASGI application.
+            routes (Sequence[BaseRoute]): Application routes, used to find the route template.
+        """
+        self.app = app
+        self._route_template = RouteTemplates(routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = perf_counter() - start
+            IN_FLIGHT.dec()
+            route = self._route_template(scope)
+            method = scope["method"]
+            REQUEST_DURATION.labels(method, route).observe(duration)
+            REQUESTS.labels(method, route, str(status)).inc()
+
+
+async def metrics_endpoint(_: Request) -> Response:
+    """Return metrics in Prometheus text format."""
+    return Response(REGISTRY.render(), headers={"Content-Type": CONTENT_TYPE})
@@ -0,0 +1,106 @@
+"""Profiling middleware and endpoint."""
+from typing import Awaitable, Callable
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from intape.core.profiling import (
+    CallProfiler,
+    ProfilerBusyException,
+    check_token,
+    sample_stacks,
+)
+
+PROFILE_HEADER = "X-Intape-Profile"
+TOKEN_HEADER = "X-Profiling-Token"
+
+_PROFILE_HEADER = PROFILE_HEADER.lower().encode()
+
+
+class ProfilingMiddleware:
+    """Profile a single request with cProfile.
+
+    Requests with the `X-Intape-Profile` header set to the profiling token are
+    handled as usual, but the response is replaced with the profile in the
+    `pstats` format, sent as an attachment. The status of the original
+    response is in the `X-Profiled-Status` header.
+
+    The middleware is added only when the profiling token is configured.
+    """
+
+    def __init__(self, app: ASGIApp, token: str) -> None:
+        """Initialize.
+
+        Args:
+            app (ASGIApp): ASGI application.
+            token (str): Profiling token.
+        """
+        self.app = app
+        self.token = token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = next((value.decode("latin-1") for key, value in scope["headers"] if key == _PROFILE_HEADER), None)
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        response: Response
+        if not check_token(self.token, token):
+            response = PlainTextResponse("Invalid profiling token", status_code=403)
+            await response(scope, receive, send)
+            return
+
+        status = 500
+
+        async def discard(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        try:
+            with CallProfiler() as profiler:
+                await self.app(scope, receive, discard)
+        except ProfilerBusyException:
+            response = PlainTextResponse("Another request is being profiled", status_code=409)
+        else:
+            response = Response(
+                profiler.dump(),
+                media_type="application/octet-stream",
+                headers={
+                    "Content-Disposition": 'attachment; filename="request.prof"',
+                    "X-Profiled-Status": str(status),
+                },
+            )
+        await response(scope, receive, send)
+
+
+def create_profile_endpoint(token: str) -> Callable[[Request], Awaitable[Response]]:
+    """Create endpoint that samples stacks of the process.
+
+    The profiling token must be sent in the `X-Profiling-Token` header.
+
+    Query parameters:
+    - `seconds`: Profiling time, 10 seconds by default.
+    - `interval`: Time between samples, 5 ms by default.
+    """
+
+    async def profile_endpoint(request: Request) -> Response:
+        if not check_token(token, request.headers.get(TOKEN_HEADER)):
+            return PlainTextResponse("Invalid profiling token", status_code=403)
+        try:
+            seconds = float(request.query_params.get("seconds", 10))
+            interval = float(request.query_params.get("interval", 0.005))
+        except ValueError:
+            return PlainTextResponse("Invalid seconds or interval", status_code=400)
+        try:
+            stacks = await sample_stacks(seconds, interval)
+        except ProfilerBusyException:
+            return PlainTextResponse("Another profile is being taken", status_code=409)
+        return PlainTextResponse(stacks, headers={"Content-Disposition": 'attachment; filename="profile.folded"'})
+
+    return profile_endpoint
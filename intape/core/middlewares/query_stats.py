@@ -0,0 +1,73 @@
+"""SQL statement statistics middleware."""
+import logging
+from typing import Sequence
+
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from intape.core.metrics import Histogram
+from intape.core.query_stats import (
+    REQUEST_LISTENERS,
+    QueryBudgetExceeded,
+    track_queries,
+)
+
+from .routes import RouteTemplates
+
+log = logging.getLogger(__name__)
+
+DB_QUERIES = Histogram(
+    "intape_db_queries_per_request",
+    "Number of SQL statements executed by a request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+
+class QueryStatsMiddleware:
+    """Record SQL statements of every request and enforce query budgets.
+
+    The budget of an endpoint is set with `query_budget`, other endpoints get
+    the default one. A request over the budget is logged with its slowest
+    statements, or fails with `QueryBudgetExceeded` in strict mode, which is
+    meant for tests.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute], budget: int, strict: bool = False) -> None:
+        """Initialize.
+
+        Args:
+            app (ASGIApp): ASGI application.
+            routes (Sequence[BaseRoute]): Application routes, used to find the route template.
+            budget (int): Default maximum number of statements per request.
+            strict (bool): Raise `QueryBudgetExceeded` instead of logging a warning.
+        """
+        self.app = app
+        self.budget = budget
+        self.strict = strict
+        self._route_template = RouteTemplates(routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = self._route_template(scope)
+                DB_QUERIES.labels(route).observe(stats.count)
+                for listener in REQUEST_LISTENERS:
+                    listener(route, stats)
+
+        budget = getattr(scope.get("endpoint"), "query_budget", self.budget)
+        if stats.count > budget:
+            message = (
+                f"{scope['method']} {route} executed {stats.count} statements, budget is {budget}, "
+                f"took {stats.total_time * 1000:.1f} ms. Slowest statements:\n{stats.format_slowest()}"
+            )
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            log.warning(message)
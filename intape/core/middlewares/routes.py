@@ -0,0 +1,36 @@
+"""Route templates of requests."""
+from typing import Any, Callable, Sequence
+
+from starlette.routing import BaseRoute
+from starlette.types import Scope
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RouteTemplates:
+    """Find the route template of a request, e.g. `/v1/video/{video_id}`.
+
+    Templates are used instead of paths in metrics and logs, so that the
+    number of distinct values doesn't grow with the number of distinct paths.
+    """
+
+    def __init__(self, routes: Sequence[BaseRoute]) -> None:
+        """Initialize.
+
+        Args:
+            routes (Sequence[BaseRoute]): Application routes.
+        """
+        self.routes = routes
+        self._templates: dict[Callable[..., Any], str] | None = None
+
+    def __call__(self, scope: Scope) -> str:
+        """Return the route template of the handled request, or `UNMATCHED_ROUTE`."""
+        if self._templates is None:
+            # Routes are complete only after the application is set up
+            self._templates = {}
+            for route in self.routes:
+                endpoint = getattr(route, "endpoint", None)
+                path = getattr(route, "path", None)
+                if endpoint is not None and path is not None:
+                    self._templates.setdefault(endpoint, path)
+        return self._templates.get(scope.get("endpoint"), UNMATCHED_ROUTE)  # type: ignore
@@ -0,0 +1,48 @@
+"""Tracing middleware."""
+from typing import Sequence
+
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from intape.core.tracing import get_tracer
+
+from .routes import RouteTemplates
+
+
+class TracingMiddleware:
+    """Start a trace for every sampled request.
+
+    The root span is named after the method and the route template, e.g.
+    `POST /v1/video/`, and has the response status attribute.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute]) -> None:
+        """Initialize.
+
+        Args:
+            app (ASGIApp): ASGI application.
+            routes (Sequence[BaseRoute]): Application routes, used to find the route template.
+        """
+        self.app = app
+        self._route_template = RouteTemplates(routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with get_tracer().trace(scope["method"]) as root:
+            status = 500
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                root.update_name(f"{scope['method']} {self._route_template(scope)}")
+                root.set_attribute("status", status)
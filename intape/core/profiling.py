@@ -0,0 +1,134 @@
+"""On-demand profilers.
+
+`sample_stacks` periodically takes stacks of all threads from a background
+thread, so it doesn't slow down the profiled code much and can be used in
+production. The result is in the collapsed stack format, which is accepted
+by `flamegraph.pl`, speedscope and similar tools.
+
+`CallProfiler` runs `cProfile` while a single request is handled and
+returns the result in the `pstats` format.
+
+Both are used only when `PROFILING_TOKEN` is configured.
+"""
+import marshal
+import sys
+from asyncio import sleep
+from collections import Counter
+from cProfile import Profile
+from secrets import compare_digest
+from threading import Event, Thread, get_ident
+from types import FrameType
+
+MAX_DURATION = 60.0
+MIN_INTERVAL = 0.001
+
+
+class ProfilerBusyException(Exception):
+    """Another profile is being taken."""
+
+
+_sampling = False
+
+
+def check_token(expected: str | None, token: str | None) -> bool:
+    """Check profiling token in constant time."""
+    return expected is not None and token is not None and compare_digest(expected.encode(), token.encode())
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    # Semicolons separate frames and spaces separate the count in the output
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})".replace(";", ":").replace(" ", "_")
+
+
+def _collapse(frame: FrameType | None) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class _Sampler(Thread):
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="intape-profiler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.stopped = Event()
+
+    def run(self) -> None:
+        ident = get_ident()
+        while not self.stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != ident:
+                    self.stacks[_collapse(frame)] += 1
+
+
+async def sample_stacks(duration: float, interval: float = 0.005) -> str:
+    """Sample stacks of all threads for the given time.
+
+    Args:
+        duration (float): Profiling time in seconds, at most `MAX_DURATION`.
+        interval (float): Time between samples in seconds, at least `MIN_INTERVAL`.
+
+    Returns:
+        str: Collapsed stacks, one `frame;frame;frame count` line per distinct stack.
+
+    Raises:
+        ProfilerBusyException: If another profile is being taken.
+    """
+    global _sampling
+    if _sampling:
+        raise ProfilerBusyException()
+    _sampling = True
+    sampler = _Sampler(max(interval, MIN_INTERVAL))
+    sampler.start()
+    try:
+        await sleep(min(max(duration, 0), MAX_DURATION))
+    finally:
+        sampler.stopped.set()
+        sampler.join()
+        _sampling = False
+    return "".join(f"{stack} {count}\n" for stack, count in sampler.stacks.most_common())
+
+
+class CallProfiler:
+    """Deterministic profile of the code run while the profiler is active.
+
+    Only one profiler can be active at a time. All code running in the
+    thread is profiled, including other requests handled concurrently by the
+    event loop.
+
+    Examples:
+        >>> with CallProfiler() as profiler:
+        >>>     await handle_request()
+        >>> data = profiler.dump()
+    """
+
+    _active = False
+
+    def __init__(self) -> None:
+        """Initialize profiler."""
+        self.profile = Profile()
+
+    def __enter__(self) -> "CallProfiler":
+        """Start profiling.
+
+        Raises:
+            ProfilerBusyException: If another profiler is active.
+        """
+        if CallProfiler._active:
+            raise ProfilerBusyException()
+        CallProfiler._active = True
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Stop profiling."""
+        self.profile.disable()
+        CallProfiler._active = False
+
+    def dump(self) -> bytes:
+        """Return the profile in the format of `pstats` files."""
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
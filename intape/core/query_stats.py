@@ -0,0 +1,132 @@
+"""SQL statement statistics.
+
+Engine event hooks record every statement executed while statistics are
+tracked in the current context, e.g. by `QueryStatsMiddleware` for the
+duration of a request. The current statistics are stored in a context
+variable, so concurrent requests don't mix up their statements. Statements
+executed in a sampled trace are added to it as `db.statement` spans.
+
+Examples:
+    >>> instrument_engine(engine)
+    >>> with track_queries() as stats:
+    >>>     await UserModel.get_by_key(db, UserModel.id, 1)
+    >>> stats.count
+    1
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter, time_ns
+from typing import Any, Callable, Iterator, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .tracing import current_span
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+SLOWEST_STATEMENTS = 3
+
+_current: ContextVar["QueryStats | None"] = ContextVar("query_stats", default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """Request executed more statements than its budget allows."""
+
+
+@dataclass
+class QueryStats:
+    """Statistics of executed statements.
+
+    Attributes:
+        count (int): Number of executed statements.
+        total_time (float): Total execution time in seconds.
+        slowest (list[tuple[float, str]]): Slowest statements with their duration, slowest first.
+    """
+
+    count: int = 0
+    total_time: float = 0.0
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+
+    def record(self, statement: str, duration: float) -> None:
+        """Record executed statement."""
+        self.count += 1
+        self.total_time += duration
+        if len(self.slowest) < SLOWEST_STATEMENTS or duration > self.slowest[-1][0]:
+            self.slowest.append((duration, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_STATEMENTS:]
+
+    def format_slowest(self) -> str:
+        """Format slowest statements for logs."""
+        return "\n".join(
+            f"  {duration * 1000:.1f} ms: {' '.join(statement.split())}" for duration, statement in self.slowest
+        )
+
+
+# Called with the route template and statistics of every finished request
+REQUEST_LISTENERS: list[Callable[[str, QueryStats], None]] = []
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Record statements executed in the current context."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn: Connection, *_: Any) -> None:
+    if _current.get() is not None or current_span() is not None:
+        conn.info["query_start"] = (time_ns(), perf_counter())
+
+
+def _after_cursor_execute(conn: Connection, _cursor: Any, statement: str, *_: Any) -> None:
+    start = conn.info.pop("query_start", None)
+    if start is None:
+        return
+    start_time, start_counter = start
+    duration = perf_counter() - start_counter
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    parent = current_span()
+    if parent is not None:
+        parent.add_child("db.statement", start_time, duration, statement=" ".join(statement.split())[:200])
+
+
+def instrument_engine(engine: Engine | AsyncEngine) -> None:
+    """Record statements executed by the engine.
+
+    Statements are recorded only while `track_queries` is active or a trace
+    is sampled, otherwise the hooks cost two context variable lookups.
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def query_budget(limit: int) -> Callable[[F], F]:
+    """Set the maximum number of statements of the endpoint.
+
+    It must be applied below the route decorator, so that the route is
+    registered with the marked function.
+
+    Examples:
+        >>> @router.get("/{video_id}")
+        >>> @query_budget(2)
+        >>> async def get_video(...):
+        >>>     ...
+    """
+
+    def decorator(func: F) -> F:
+        setattr(func, "query_budget", limit)
+        return func
+
+    return decorator
@@ -1,6 +1,31 @@
 """Ethereum RPC client."""
 
 from .abi import ContractCall, InputDecoder, decode_constructor, decode_function
-from .client import EthClient
+from .cache import TransactionCache
+from .client import EthClient, RateLimiter
+from .exceptions import (
+    RPCException,
+    RPCResponseException,
+    RPCUnavailableException,
+    TransactionNotFoundException,
+)
+from .mint import MintNFTDecoder, decode_mint_nft_args
+from .ws import Subscription, WSRPCClient
 
-__all__ = ["EthClient", "InputDecoder", "ContractCall", "decode_function", "decode_constructor"]
+__all__ = [
+    "EthClient",
+    "InputDecoder",
+    "MintNFTDecoder",
+    "ContractCall",
+    "decode_function",
+    "decode_constructor",
+    "decode_mint_nft_args",
+    "RPCException",
+    "RPCResponseException",
+    "RPCUnavailableException",
+    "TransactionNotFoundException",
+    "TransactionCache",
+    "RateLimiter",
+    "WSRPCClient",
+    "Subscription",
+]
@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from typing import Any
 
 from eth_abi.abi import decode
+from eth_abi.exceptions import DecodingError
 
 from .utils import (
     detect_constructor_arguments,
@@ -31,7 +32,11 @@ class InputDecoder:
         self._selector_to_func_type = get_selector_to_function_type(abi)
 
     def decode_function(self, tx_input: str | bytes) -> ContractCall:
-        """Decode function."""
+        """Decode function.
+
+        Raises:
+            ValueError: If the function is not in the ABI, or its arguments can't be decoded.
+        """
         tx_input = hex_to_bytes(tx_input)
         selector, args = tx_input[:4], tx_input[4:]
         type_def = self._selector_to_func_type.get(selector, None)
@@ -42,7 +47,8 @@ class InputDecoder:
 
         try:
             values = decode(types, args)  # type: ignore
-        except OverflowError:
+        except (DecodingError, OverflowError, UnicodeDecodeError):
+            # Errors of `eth_abi` are not `ValueError`s, except for the Unicode one
             raise ValueError("Invalid arguments")
 
         return ContractCall(type_def["name"], list(zip(types, names, values)))
@@ -52,7 +58,11 @@ class InputDecoder:
         tx_input: str | bytes,
         bytecode: str | bytes | None = None,
     ) -> ContractCall:
-        """Decode constructor."""
+        """Decode constructor.
+
+        Raises:
+            ValueError: If there is no constructor in the ABI, or its arguments can't be decoded.
+        """
         tx_input = hex_to_bytes(tx_input)
 
         if not self._constructor_type:
@@ -65,7 +75,10 @@ class InputDecoder:
             tx_input = detect_constructor_arguments(self._constructor_type, tx_input)
 
         types, names = get_types_names(self._constructor_type["inputs"])
-        values = decode(types, tx_input)  # type: ignore
+        try:
+            values = decode(types, tx_input)  # type: ignore
+        except (DecodingError, OverflowError, UnicodeDecodeError):
+            raise ValueError("Invalid arguments")
 
         return ContractCall("constructor", list(zip(types, names, values)))
 
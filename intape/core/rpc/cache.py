@@ -0,0 +1,110 @@
+"""Cache for finalized transactions."""
+
+import json
+import os
+from collections import OrderedDict
+from logging import getLogger
+from time import monotonic
+from typing import Any
+
+log = getLogger(__name__)
+
+
+class TransactionCache:
+    """LRU cache of `eth_getTransactionByHash` results.
+
+    Mined transactions never change, so they are kept until evicted by newer
+    entries. Pending and not found transactions are cached only for
+    `negative_ttl` seconds, so that the next lookup after that goes to the
+    node again.
+
+    Mined transactions can optionally be persisted to a JSON file, which is
+    loaded on creation and written by `save`.
+    """
+
+    def __init__(self, maxsize: int = 10000, negative_ttl: float = 5.0, path: str | None = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            maxsize (int): Maximum number of mined transactions.
+            negative_ttl (float): Lifetime of pending and not found results in seconds.
+            path (str | None): JSON file to persist mined transactions to.
+        """
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self.path = path
+        self._finalized: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._negative: dict[str, tuple[float, dict[str, Any] | None]] = {}
+        self._dirty = False
+        if path is not None:
+            self.load()
+
+    def __len__(self) -> int:
+        """Return number of mined transactions in the cache."""
+        return len(self._finalized)
+
+    def get(self, tx_hash: str) -> tuple[bool, dict[str, Any] | None]:
+        """Get transaction from the cache.
+
+        Returns:
+            tuple[bool, dict | None]: Whether the hash was found in the cache and the cached result.
+        """
+        key = tx_hash.lower()
+        tx = self._finalized.get(key)
+        if tx is not None:
+            self._finalized.move_to_end(key)
+            return True, tx
+
+        negative = self._negative.get(key)
+        if negative is not None:
+            expires_at, pending_tx = negative
+            if expires_at > monotonic():
+                return True, pending_tx
+            del self._negative[key]
+        return False, None
+
+    def put(self, tx_hash: str, tx: dict[str, Any] | None) -> None:
+        """Put `eth_getTransactionByHash` result to the cache."""
+        key = tx_hash.lower()
+        if tx is None or tx.get("blockNumber") is None:
+            now = monotonic()
+            if len(self._negative) >= self.maxsize:
+                self._negative = {k: v for k, v in self._negative.items() if v[0] > now}
+            self._negative[key] = (now + self.negative_ttl, tx)
+            return
+
+        self._negative.pop(key, None)
+        self._finalized[key] = tx
+        self._finalized.move_to_end(key)
+        while len(self._finalized) > self.maxsize:
+            self._finalized.popitem(last=False)
+        self._dirty = True
+
+    def load(self) -> None:
+        """Load mined transactions from the cache file."""
+        if self.path is None or not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data: dict[str, dict[str, Any]] = json.load(f)
+        except (OSError, ValueError):
+            log.exception("Unable to load transaction cache from %s", self.path)
+            return
+        for tx_hash, tx in data.items():
+            self.put(tx_hash, tx)
+        self._dirty = False
+        log.debug("Loaded %s transactions from %s", len(self._finalized), self.path)
+
+    def save(self) -> None:
+        """Write mined transactions to the cache file, if anything changed."""
+        if self.path is None or not self._dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self._finalized, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            log.exception("Unable to save transaction cache to %s", self.path)
+            return
+        self._dirty = False
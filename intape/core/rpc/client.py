@@ -1,16 +1,64 @@
 """Ethereum RPC client."""
 
+from asyncio import Condition, Lock, TimeoutError, sleep
+from dataclasses import dataclass
 from logging import getLogger
+from random import uniform
+from time import monotonic
 from types import TracebackType
-from typing import Any, Type
+from typing import Any, Sequence, Type
 
-from aiohttp import ClientSession
+from aiohttp import (
+    ClientError,
+    ClientResponseError,
+    ClientSession,
+    ClientTimeout,
+)
 
+from intape.core.metrics import Gauge, Histogram
+from intape.core.tracing import NoopSpan, span
+
+from .cache import TransactionCache
+from .exceptions import (
+    RPCResponseException,
+    RPCUnavailableException,
+    TransactionNotFoundException,
+)
 from .types import Transaction
 from .utils import hex_to_int
 
 log = getLogger(__name__)
 
+RPC_DURATION = Histogram(
+    "intape_rpc_request_duration_seconds", "Duration of Ethereum JSON-RPC requests.", ["method", "result"]
+)
+RPC_CONCURRENCY_LIMIT = Gauge("intape_rpc_concurrency_limit", "Concurrency limit of Ethereum JSON-RPC requests.")
+RPC_IN_FLIGHT = Gauge("intape_rpc_in_flight", "Ethereum JSON-RPC requests being sent.")
+RPC_QUEUE_DEPTH = Gauge("intape_rpc_queue_depth", "Ethereum JSON-RPC requests waiting for the limiter.")
+
+# Methods that can be safely sent again if the previous attempt failed.
+IDEMPOTENT_METHODS = frozenset(
+    {
+        "eth_blockNumber",
+        "eth_call",
+        "eth_chainId",
+        "eth_estimateGas",
+        "eth_gasPrice",
+        "eth_getBalance",
+        "eth_getBlockByHash",
+        "eth_getBlockByNumber",
+        "eth_getCode",
+        "eth_getLogs",
+        "eth_getTransactionByHash",
+        "eth_getTransactionCount",
+        "eth_getTransactionReceipt",
+        "net_version",
+    }
+)
+
+# JSON-RPC error codes used by providers to report exceeded quotas.
+RATE_LIMIT_ERROR_CODES = frozenset({-32005, -32029, -32090, 429})
+
 
 def _construct_data(method: str, id: int, params: Any) -> dict[str, Any]:
     return {
@@ -21,24 +69,264 @@ def _construct_data(method: str, id: int, params: Any) -> dict[str, Any]:
     }
 
 
+@dataclass(eq=False)
+class Endpoint:
+    """RPC endpoint with health state.
+
+    Latency is an exponentially weighted moving average of successful calls.
+    After `failure_threshold` consecutive failures the circuit breaker opens
+    and the endpoint is skipped for `cooldown` seconds. After the cooldown a
+    single call is let through: success closes the breaker, failure opens it
+    again.
+    """
+
+    url: str
+    failure_threshold: int = 3
+    cooldown: float = 30.0
+    latency: float = 0.0
+    failures: int = 0
+    open_until: float = 0.0
+
+    def is_available(self, now: float) -> bool:
+        """Check if the circuit breaker lets calls through."""
+        return now >= self.open_until
+
+    def record_success(self, latency: float) -> None:
+        """Record successful call."""
+        self.latency = latency if self.latency == 0.0 else 0.8 * self.latency + 0.2 * latency
+        self.failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self, now: float) -> None:
+        """Record failed call."""
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.open_until == 0.0:
+                log.warning("RPC endpoint %s failed %s times in a row, disabling it", self.url, self.failures)
+            self.open_until = now + self.cooldown
+
+    @property
+    def score(self) -> tuple[int, float]:
+        """Health score, lower is better.
+
+        Endpoints with fewer consecutive failures always win, latency breaks ties.
+        """
+        return self.failures, self.latency
+
+
+class EndpointPool:
+    """Set of RPC endpoints that routes calls to the fastest healthy one."""
+
+    def __init__(self, urls: Sequence[str], failure_threshold: int = 3, cooldown: float = 30.0) -> None:
+        """Initialize the pool."""
+        if not urls:
+            raise ValueError("At least one RPC URL is required")
+        self.endpoints = [Endpoint(url, failure_threshold, cooldown) for url in urls]
+
+    def select(self, exclude: Sequence[Endpoint] = ()) -> Endpoint:
+        """Select the endpoint for the next call.
+
+        Healthy endpoints are preferred, ordered by score. Endpoints from
+        `exclude` (already tried for this call) are used only if nothing else
+        is left. If all circuit breakers are open, the endpoint that recovers
+        first is returned.
+        """
+        now = monotonic()
+        candidates = [e for e in self.endpoints if e not in exclude] or self.endpoints
+        available = [e for e in candidates if e.is_available(now)]
+        if available:
+            return min(available, key=lambda e: e.score)
+        return min(candidates, key=lambda e: e.open_until)
+
+
+class RateLimiter:
+    """Client-side rate limiter.
+
+    Combines a token bucket, which caps the request rate at `rate` requests
+    per second with bursts of up to `burst` requests, with AIMD concurrency
+    control: every successful call raises the concurrency limit by
+    `1 / limit` (about one per round trip of the whole window), every
+    throttled call halves it.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int | None = None,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            rate (float): Requests per second, 0 disables the token bucket.
+            burst (int | None): Bucket capacity, defaults to `rate`.
+            max_concurrency (int): Upper bound of the concurrency limit.
+            min_concurrency (int): Lower bound of the concurrency limit.
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self._limit = float(max_concurrency)
+        self._tokens = float(self.burst)
+        self._updated_at = monotonic()
+        self._in_flight = 0
+        self._waiting = 0
+        self._condition = Condition()
+        self._token_lock = Lock()
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently sent."""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for a slot."""
+        return self._waiting
+
+    def export_metrics(self) -> None:
+        """Report the state of this limiter in the RPC gauges.
+
+        The gauges show a single limiter, so only the one shared by all
+        clients of the process is exported.
+        """
+        RPC_CONCURRENCY_LIMIT.set_function(lambda: self.limit)
+        RPC_IN_FLIGHT.set_function(lambda: self.in_flight)
+        RPC_QUEUE_DEPTH.set_function(lambda: self.queue_depth)
+
+    async def acquire(self) -> None:
+        """Wait for a concurrency slot and a token."""
+        self._waiting += 1
+        try:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._in_flight < self.limit)
+                self._in_flight += 1
+            try:
+                await self._take_token()
+            except BaseException:
+                await self._release_slot()
+                raise
+        finally:
+            self._waiting -= 1
+
+    async def release(self, throttled: bool = False) -> None:
+        """Release the slot and adjust concurrency limit.
+
+        Args:
+            throttled (bool): Whether the provider rejected the call because of rate limits.
+        """
+        if throttled:
+            old = self.limit
+            self._limit = max(float(self.min_concurrency), self._limit / 2)
+            log.warning("RPC calls are throttled, lowering concurrency limit from %s to %s", old, self.limit)
+        else:
+            self._limit = min(float(self.max_concurrency), self._limit + 1 / self._limit)
+        await self._release_slot()
+
+    async def _release_slot(self) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    async def _take_token(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._token_lock:
+            self._refill()
+            if self._tokens < 1:
+                await sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
 class RPCProxy:
     """RPC proxy."""
 
-    def __init__(self, url: str, method_name: str, session: ClientSession, id: int) -> None:
+    def __init__(self, client: "RPCClient", method_name: str, id: int) -> None:
         """Initialize the proxy."""
-        self.url = url
+        self.client = client
         self.method_name = method_name
-        self.session = session
         self.id = id
 
     async def __call__(self, *args: Any) -> Any:
-        """Call the RPC method."""
-        log.debug("Calling %s with %s", self.method_name, args)
-        response = await self.session.post(self.url, json=_construct_data(self.method_name, self.id, args))
-        response.raise_for_status()
-        response_json = await response.json()
-        log.debug("Response: %s", response_json)
-        return response_json["result"]
+        """Call the RPC method.
+
+        Idempotent methods are retried on other endpoints with jittered
+        exponential backoff, also when the provider throttles the call.
+
+        Raises:
+            RPCResponseException: If the node returned JSON-RPC error.
+            RPCUnavailableException: If no endpoint answered the request.
+        """
+        with span(f"rpc.{self.method_name}") as rpc_span:
+            return await self._call(args, rpc_span)
+
+    async def _call(self, args: tuple[Any, ...], rpc_span: NoopSpan) -> Any:
+        client = self.client
+        attempts = client.retries + 1 if self.method_name in IDEMPOTENT_METHODS else 1
+        data = _construct_data(self.method_name, self.id, args)
+        tried: list[Endpoint] = []
+        error: Exception | None = None
+
+        for attempt in range(attempts):
+            if attempt:
+                await sleep(uniform(0, min(client.backoff_cap, client.backoff_base * 2 ** (attempt - 1))))
+            endpoint = client.pool.select(tried)
+            tried.append(endpoint)
+            rpc_span.set_attribute("attempts", attempt + 1)
+            rpc_span.set_attribute("endpoint", endpoint.url)
+            log.debug("Calling %s with %s on %s", self.method_name, args, endpoint.url)
+
+            await client.limiter.acquire()
+            throttled = False
+            try:
+                start = monotonic()
+                async with client.session.post(endpoint.url, json=data, timeout=client.timeout) as response:
+                    response.raise_for_status()
+                    response_json = await response.json(content_type=None)
+                endpoint.record_success(monotonic() - start)
+            except (ClientError, TimeoutError, ValueError) as e:
+                throttled = isinstance(e, ClientResponseError) and e.status == 429
+                endpoint.record_failure(monotonic())
+                RPC_DURATION.labels(self.method_name, "throttled" if throttled else "error").observe(
+                    monotonic() - start
+                )
+                log.warning(
+                    "Call %s on %s failed (attempt %s/%s): %r", self.method_name, endpoint.url, attempt + 1, attempts, e
+                )
+                error = e
+                continue
+            else:
+                log.debug("Response: %s", response_json)
+                if "error" in response_json:
+                    rpc_error = response_json["error"]
+                    error = RPCResponseException(rpc_error.get("code", 0), rpc_error.get("message", ""))
+                    throttled = error.code in RATE_LIMIT_ERROR_CODES
+                    RPC_DURATION.labels(self.method_name, "throttled" if throttled else "error").observe(
+                        monotonic() - start
+                    )
+                    if throttled:
+                        log.warning("Call %s on %s was throttled: %s", self.method_name, endpoint.url, error)
+                        continue
+                    raise error
+                RPC_DURATION.labels(self.method_name, "success").observe(monotonic() - start)
+                return response_json["result"]
+            finally:
+                await client.limiter.release(throttled)
+
+        raise RPCUnavailableException(f"Call {self.method_name} failed after {attempts} attempts") from error
 
 
 class RPCClient:
@@ -46,27 +334,69 @@ class RPCClient:
 
     id_counter = 0
 
-    def __init__(self, url: str, session: ClientSession) -> None:
-        """Initialize the client."""
-        self.url = url
+    def __init__(
+        self,
+        pool: EndpointPool,
+        session: ClientSession,
+        timeout: float = 10.0,
+        retries: int = 3,
+        backoff_base: float = 0.2,
+        backoff_cap: float = 5.0,
+        limiter: RateLimiter | None = None,
+    ) -> None:
+        """Initialize the client.
+
+        Args:
+            pool (EndpointPool): Endpoints to send calls to.
+            session (ClientSession): HTTP session.
+            timeout (float): Timeout of a single call in seconds.
+            retries (int): Number of retries for idempotent methods.
+            backoff_base (float): Base delay between retries in seconds.
+            backoff_cap (float): Maximum delay between retries in seconds.
+            limiter (RateLimiter | None): Rate limiter, may be shared between clients.
+        """
+        self.pool = pool
+        self.limiter = limiter if limiter is not None else RateLimiter()
         self.session = session
+        self.timeout = ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
 
     def __getattr__(self, name: str) -> RPCProxy:
         """Get the RPC proxy."""
         if name.startswith("__") and name.endswith("__"):
             raise AttributeError(name)
         self.id_counter += 1
-        return RPCProxy(self.url, name, self.session, self.id_counter)
+        return RPCProxy(self, name, self.id_counter)
 
 
 class EthClient:
     """Ethereum RPC client."""
 
-    def __init__(self, url: str, session: ClientSession | None = None):
-        """Initialize the Ethereum client."""
-        self.url = url
+    def __init__(
+        self,
+        urls: str | Sequence[str],
+        session: ClientSession | None = None,
+        timeout: float = 10.0,
+        retries: int = 3,
+        cache: TransactionCache | None = None,
+        limiter: RateLimiter | None = None,
+    ):
+        """Initialize the Ethereum client.
+
+        Args:
+            urls (str | Sequence[str]): RPC endpoint or list of endpoints.
+            session (ClientSession | None): HTTP session.
+            timeout (float): Timeout of a single call in seconds.
+            retries (int): Number of retries for idempotent methods.
+            cache (TransactionCache | None): Transaction cache, may be shared between clients.
+            limiter (RateLimiter | None): Rate limiter, may be shared between clients.
+        """
+        self.pool = EndpointPool([urls] if isinstance(urls, str) else urls)
         self.session = session or ClientSession()
-        self.rpc = RPCClient(url, self.session)
+        self.cache = cache if cache is not None else TransactionCache()
+        self.rpc = RPCClient(self.pool, self.session, timeout=timeout, retries=retries, limiter=limiter)
 
     async def __aenter__(self) -> "EthClient":
         """Enter the context manager."""
@@ -76,6 +406,7 @@ class EthClient:
         self, exc_type: Type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
     ) -> None:
         """Exit the context manager."""
+        self.cache.save()
         await self.session.__aexit__(exc_type, exc_val, exc_tb)
 
     async def get_block_number(self) -> int:
@@ -83,11 +414,25 @@ class EthClient:
         return hex_to_int(await self.rpc.eth_blockNumber())
 
     async def get_tx(self, tx_hash: str, abi: list[dict[Any, Any]] | None = None) -> Transaction:
-        """Get the transaction input."""
-        tx = await self.rpc.eth_getTransactionByHash(tx_hash)
+        """Get the transaction input.
+
+        Mined transactions are served from the cache, pending and not found
+        ones are cached only briefly.
+
+        Raises:
+            TransactionNotFoundException: If the transaction is not found.
+        """
+        with span("eth.get_tx", tx=tx_hash) as tx_span:
+            found, tx = self.cache.get(tx_hash)
+            tx_span.set_attribute("cached", found)
+            if not found:
+                tx = await self.rpc.eth_getTransactionByHash(tx_hash)
+                self.cache.put(tx_hash, tx)
+        if tx is None:
+            raise TransactionNotFoundException(f"Transaction {tx_hash} not found")
         return Transaction(
             blockHash=tx["blockHash"],
-            blockNumber=hex_to_int(tx["blockNumber"]),
+            blockNumber=hex_to_int(tx["blockNumber"]) if tx["blockNumber"] is not None else None,
             from_=tx["from"],
             to=tx["to"],
             gas=hex_to_int(tx["gas"]),
@@ -0,0 +1,23 @@
+"""RPC exceptions."""
+
+
+class RPCException(Exception):
+    """Base RPC exception."""
+
+
+class RPCResponseException(RPCException):
+    """JSON-RPC error returned by the node."""
+
+    def __init__(self, code: int, message: str) -> None:
+        """Initialize."""
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+
+
+class RPCUnavailableException(RPCException):
+    """No RPC endpoint answered the request."""
+
+
+class TransactionNotFoundException(RPCException):
+    """Transaction is not known to the node."""
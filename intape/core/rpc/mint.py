@@ -0,0 +1,97 @@
+"""Fast decoder for the `mintNFT(address,string)` contract call.
+
+The worker only needs the recipient and the token URI of the `mintNFT` call,
+so the `(address,string)` ABI layout is decoded by hand from `memoryview`
+slices of the calldata instead of going through the generic `eth_abi` decoder.
+"""
+
+from typing import Any
+
+from eth_utils.abi import function_signature_to_4byte_selector
+
+from .abi import ContractCall, InputDecoder
+from .utils import hex_to_bytes
+
+MINT_NFT_SIGNATURE = "mintNFT(address,string)"
+MINT_NFT_SELECTOR: bytes = function_signature_to_4byte_selector(MINT_NFT_SIGNATURE)
+
+_WORD = 32
+_ADDRESS_PADDING = bytes(_WORD - 20)
+
+
+def decode_mint_nft_args(args: memoryview) -> tuple[str, str]:
+    """Decode `(address,string)` ABI encoded arguments.
+
+    Follows the same validation rules as `eth_abi`: address padding must be
+    empty, the string must fit in the calldata, its padding must be empty and
+    its content must be valid UTF-8.
+
+    Args:
+        args (memoryview): Calldata without the function selector.
+
+    Returns:
+        tuple[str, str]: Lowercase recipient address and token URI.
+
+    Raises:
+        ValueError: If arguments can't be decoded.
+    """
+    size = len(args)
+    if size < 2 * _WORD:
+        raise ValueError("Invalid arguments")
+
+    if args[: _WORD - 20] != _ADDRESS_PADDING:
+        raise ValueError("Invalid arguments")
+    recipient = "0x" + args[_WORD - 20 : _WORD].hex()
+
+    offset = int.from_bytes(args[_WORD : 2 * _WORD], "big")
+    if offset + _WORD > size:
+        raise ValueError("Invalid arguments")
+    length = int.from_bytes(args[offset : offset + _WORD], "big")
+
+    start = offset + _WORD
+    end = start + length
+    padded_end = start + (length + _WORD - 1) // _WORD * _WORD
+    if padded_end > size:
+        raise ValueError("Invalid arguments")
+    if args[end:padded_end] != bytes(padded_end - end):
+        raise ValueError("Invalid arguments")
+
+    try:
+        token_uri = str(args[start:end], "utf-8")
+    except UnicodeDecodeError:
+        raise ValueError("Invalid arguments")
+
+    return recipient, token_uri
+
+
+class MintNFTDecoder(InputDecoder):
+    """Input decoder with a fast path for `mintNFT(address,string)` calls.
+
+    Calls with any other selector are decoded by `InputDecoder`.
+    """
+
+    def __init__(self, abi: list[dict[Any, Any]]):
+        """Initialize."""
+        super().__init__(abi)
+        type_def = self._selector_to_func_type.get(MINT_NFT_SELECTOR, None)
+        if type_def is None:
+            raise ValueError(f"ABI does not contain {MINT_NFT_SIGNATURE}")
+        self._mint_names = [t["name"] for t in type_def["inputs"]]
+
+    def decode_function(self, tx_input: str | bytes) -> ContractCall:
+        """Decode function.
+
+        Raises:
+            ValueError: If the function is not in the ABI, or its arguments can't be decoded.
+        """
+        raw = hex_to_bytes(tx_input)
+        data = memoryview(raw)
+        if data[:4] != MINT_NFT_SELECTOR:
+            return super().decode_function(raw)
+
+        recipient, token_uri = decode_mint_nft_args(data[4:])
+        recipient_name, token_uri_name = self._mint_names
+        return ContractCall(
+            "mintNFT",
+            [("address", recipient_name, recipient), ("string", token_uri_name, token_uri)],
+        )
@@ -10,8 +10,8 @@ from .abi import ContractCall, decode_function
 class Transaction:
     """Blockchain transaction."""
 
-    blockHash: str
-    blockNumber: int
+    blockHash: str | None
+    blockNumber: int | None
     from_: str
     to: str
     gas: int
@@ -22,6 +22,11 @@ class Transaction:
     abi: list[dict[Any, Any]] | None = None
     input: ContractCall | None = None
 
+    @property
+    def is_pending(self) -> bool:
+        """Check if the transaction is not mined yet."""
+        return self.blockNumber is None
+
     def __post_init__(self) -> None:
         """Post init."""
         if self.abi:
@@ -0,0 +1,201 @@
+"""Ethereum JSON-RPC client over WebSocket."""
+
+from asyncio import Future, Queue, Task, create_task, get_running_loop, wait_for
+from functools import partial
+from logging import getLogger
+from types import TracebackType
+from typing import Any, Awaitable, Callable, Type
+
+from aiohttp import ClientSession, ClientWebSocketResponse, WSMsgType
+
+from .client import _construct_data
+from .exceptions import RPCResponseException, RPCUnavailableException
+
+log = getLogger(__name__)
+
+_CLOSED = object()
+
+
+class Subscription:
+    """`eth_subscribe` subscription.
+
+    Iterate over it to receive notifications. Iteration stops when the
+    subscription is cancelled, and raises `RPCUnavailableException` when the
+    connection is lost.
+    """
+
+    def __init__(self, client: "WSRPCClient", id: str) -> None:
+        """Initialize the subscription."""
+        self.client = client
+        self.id = id
+        self.queue: Queue[Any] = Queue()
+
+    def __aiter__(self) -> "Subscription":
+        """Return async iterator."""
+        return self
+
+    async def __anext__(self) -> Any:
+        """Wait for the next notification."""
+        item = await self.queue.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        if isinstance(item, RPCUnavailableException):
+            raise item
+        return item
+
+    async def unsubscribe(self) -> None:
+        """Cancel the subscription."""
+        if self.client._subscriptions.pop(self.id, None) is not None:
+            self.queue.put_nowait(_CLOSED)
+            await self.client.call("eth_unsubscribe", self.id)
+
+
+class WSRPCClient:
+    """JSON-RPC client over a single persistent WebSocket connection.
+
+    Requests are multiplexed by their `id`, so any number of calls can wait
+    for responses concurrently.
+
+    Examples:
+        >>> async with WSRPCClient("wss://node.example") as ws:
+        >>>     block_number = await ws.eth_blockNumber()
+        >>>     async for head in await ws.subscribe("newHeads"):
+        >>>         print(head["number"])
+    """
+
+    id_counter = 0
+
+    def __init__(self, url: str, session: ClientSession | None = None, timeout: float = 10.0) -> None:
+        """Initialize the client.
+
+        Args:
+            url (str): WebSocket endpoint.
+            session (ClientSession | None): HTTP session.
+            timeout (float): Timeout of a single call in seconds.
+        """
+        self.url = url
+        self.timeout = timeout
+        self._own_session = session is None
+        self.session = session or ClientSession()
+        self._ws: ClientWebSocketResponse | None = None
+        self._reader: Task[None] | None = None
+        self._pending: dict[int, Future[Any]] = {}
+        self._subscriptions: dict[str, Subscription] = {}
+        # Notifications that arrived before `subscribe` registered their subscription
+        self._early: dict[str, list[Any]] = {}
+
+    async def __aenter__(self) -> "WSRPCClient":
+        """Connect to the node."""
+        await self.connect()
+        return self
+
+    async def __aexit__(
+        self, exc_type: Type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        """Close the connection."""
+        await self.close()
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        """Get the RPC method."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return partial(self.call, name)
+
+    @property
+    def connected(self) -> bool:
+        """Check if the connection is open."""
+        return self._ws is not None and not self._ws.closed
+
+    async def connect(self) -> None:
+        """Open the connection."""
+        self._ws = await self.session.ws_connect(self.url, heartbeat=30)
+        self._reader = create_task(self._read())
+        log.debug("Connected to %s", self.url)
+
+    async def close(self) -> None:
+        """Close the connection and the session, if it was created by the client."""
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            await self._reader
+            self._reader = None
+        if self._own_session:
+            await self.session.close()
+
+    async def call(self, method: str, *params: Any) -> Any:
+        """Call the RPC method.
+
+        Raises:
+            RPCResponseException: If the node returned JSON-RPC error.
+            RPCUnavailableException: If the connection is closed.
+            asyncio.TimeoutError: If the node didn't answer in time.
+        """
+        if self._ws is None or self._ws.closed:
+            raise RPCUnavailableException(f"Not connected to {self.url}")
+        self.id_counter += 1
+        id = self.id_counter
+        future: Future[Any] = get_running_loop().create_future()
+        self._pending[id] = future
+        try:
+            log.debug("Calling %s with %s", method, params)
+            await self._ws.send_json(_construct_data(method, id, list(params)))
+            return await wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(id, None)
+
+    async def subscribe(self, kind: str, *params: Any) -> Subscription:
+        """Create `eth_subscribe` subscription.
+
+        Args:
+            kind (str): Subscription type, e.g. `newHeads` or `logs`.
+            *params: Subscription parameters, e.g. logs filter.
+        """
+        id = await self.call("eth_subscribe", kind, *params)
+        subscription = Subscription(self, id)
+        self._subscriptions[id] = subscription
+        for item in self._early.pop(id, []):
+            subscription.queue.put_nowait(item)
+        return subscription
+
+    async def _read(self) -> None:
+        ws = self._ws
+        assert ws is not None
+        try:
+            while True:
+                message = await ws.receive()
+                if message.type == WSMsgType.TEXT:
+                    self._dispatch(message.json())
+                elif message.type == WSMsgType.ERROR:
+                    log.warning("WebSocket error: %s", ws.exception())
+                    break
+                elif message.type in (WSMsgType.CLOSE, WSMsgType.CLOSING, WSMsgType.CLOSED):
+                    break
+        except Exception:
+            log.exception("Error reading from %s", self.url)
+        finally:
+            error = RPCUnavailableException(f"Connection to {self.url} closed")
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            for subscription in self._subscriptions.values():
+                subscription.queue.put_nowait(error)
+            self._subscriptions.clear()
+            self._early.clear()
+
+    def _dispatch(self, data: dict[str, Any]) -> None:
+        if data.get("method") == "eth_subscription":
+            params = data["params"]
+            subscription = self._subscriptions.get(params["subscription"])
+            if subscription is not None:
+                subscription.queue.put_nowait(params["result"])
+            elif self._pending and len(self._early) < 16:
+                self._early.setdefault(params["subscription"], []).append(params["result"])
+            return
+
+        future = self._pending.get(data.get("id"))  # type: ignore
+        if future is None or future.done():
+            return
+        if "error" in data:
+            future.set_exception(RPCResponseException(data["error"].get("code", 0), data["error"].get("message", "")))
+        else:
+            future.set_result(data.get("result"))
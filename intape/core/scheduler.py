@@ -0,0 +1,222 @@
+"""Periodic tasks scheduler."""
+
+import signal
+from asyncio import (
+    CancelledError,
+    Event,
+    Task,
+    TimeoutError,
+    create_task,
+    get_running_loop,
+    wait,
+    wait_for,
+)
+from dataclasses import dataclass, field
+from logging import getLogger
+from random import uniform
+from time import monotonic, time
+from typing import Any, Callable, Coroutine
+
+from .metrics import Counter, Histogram
+
+log = getLogger(__name__)
+
+TASK_DURATION = Histogram(
+    "intape_task_duration_seconds",
+    "Duration of scheduled task runs.",
+    ["task"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+TASK_RUNS = Counter("intape_task_runs_total", "Finished scheduled task runs.", ["task", "result"])
+TASK_SKIPPED = Counter("intape_task_skipped_total", "Runs skipped because the previous run was still going.", ["task"])
+
+
+@dataclass(eq=False)
+class Job:
+    """Periodic job.
+
+    Attributes:
+        func (Callable): Coroutine function to run.
+        every (float): Period in seconds.
+        timeout (float | None): Maximum duration of a single run in seconds.
+        jitter (float): Maximum random delay of the first run in seconds.
+        name (str): Job name, used to trigger it and in logs.
+        next_run (float): Monotonic time of the next run.
+        task (Task | None): Currently running task.
+        pending (bool): Whether the job was triggered while it was running.
+        skipped (int): Number of runs skipped because the previous one was still running.
+        last_success (float | None): Unix time when the last successful run finished.
+        last_failure (float | None): Unix time when the last failed run finished.
+    """
+
+    func: Callable[[], Coroutine[Any, Any, None]]
+    every: float
+    timeout: float | None = None
+    jitter: float = 0.0
+    name: str = ""
+    next_run: float = 0.0
+    task: Task[None] | None = field(default=None, repr=False)
+    pending: bool = False
+    skipped: int = 0
+    last_success: float | None = None
+    last_failure: float | None = None
+
+    @property
+    def running(self) -> bool:
+        """Check if the job is running."""
+        return self.task is not None and not self.task.done()
+
+
+class Scheduler:
+    """Run jobs periodically without overlapping.
+
+    Runs are scheduled on the monotonic clock at fixed points in time
+    (`start + n * every`), so the schedule doesn't drift with the duration of
+    runs. If the previous run of a job is still going when the next one is due,
+    the next one is skipped. A triggered job runs right away, or once right
+    after the current run, if it is running.
+
+    Examples:
+        >>> scheduler = Scheduler()
+        >>> scheduler.add(verify_videos, every=30, timeout=120, jitter=5)
+        >>> await scheduler.run()
+    """
+
+    def __init__(self, shutdown_timeout: float = 10.0) -> None:
+        """Initialize scheduler.
+
+        Args:
+            shutdown_timeout (float): How long to wait for running jobs on stop before cancelling them.
+        """
+        self.jobs: dict[str, Job] = {}
+        self.shutdown_timeout = shutdown_timeout
+        self._wakeup = Event()
+        self._stopping = Event()
+
+    def add(
+        self,
+        func: Callable[[], Coroutine[Any, Any, None]],
+        every: float,
+        timeout: float | None = None,
+        jitter: float = 0.0,
+        name: str | None = None,
+    ) -> Job:
+        """Add a job.
+
+        Args:
+            func (Callable): Coroutine function to run.
+            every (float): Period in seconds.
+            timeout (float | None): Maximum duration of a single run in seconds.
+            jitter (float): Maximum random delay of the first run in seconds.
+            name (str | None): Job name. Defaults to function name.
+        """
+        job = Job(func, every, timeout, jitter, name or func.__name__)
+        self.jobs[job.name] = job
+        return job
+
+    def trigger(self, name: str) -> None:
+        """Run the job as soon as possible.
+
+        Raises:
+            KeyError: If there is no such job.
+        """
+        job = self.jobs[name]
+        if job.running:
+            job.pending = True
+        else:
+            job.next_run = monotonic()
+            self._wakeup.set()
+
+    def stop(self) -> None:
+        """Stop the scheduler gracefully."""
+        log.info("Stopping scheduler...")
+        self._stopping.set()
+        self._wakeup.set()
+
+    async def run_once(self) -> None:
+        """Run all jobs once, one after another."""
+        for job in self.jobs.values():
+            await self._run_job(job)
+
+    async def run(self) -> None:
+        """Run jobs until `stop` is called or SIGTERM/SIGINT is received."""
+        loop = get_running_loop()
+        signals = []
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+                signals.append(sig)
+            except (NotImplementedError, RuntimeError):
+                # Not supported on the platform or not in the main thread
+                pass
+
+        now = monotonic()
+        for job in self.jobs.values():
+            job.next_run = now + uniform(0, job.jitter)
+
+        try:
+            while not self._stopping.is_set():
+                now = monotonic()
+                for job in self.jobs.values():
+                    if job.next_run <= now:
+                        self._start(job, now)
+                delay = min(job.next_run for job in self.jobs.values()) - monotonic() if self.jobs else None
+                try:
+                    await wait_for(self._wakeup.wait(), max(delay, 0) if delay is not None else None)
+                except TimeoutError:
+                    pass
+                self._wakeup.clear()
+        finally:
+            for sig in signals:
+                loop.remove_signal_handler(sig)
+            await self._shutdown()
+
+    def _start(self, job: Job, now: float) -> None:
+        if job.running:
+            job.skipped += 1
+            TASK_SKIPPED.labels(job.name).inc()
+            log.warning("Job %s is still running, skipping run", job.name)
+        else:
+            job.task = create_task(self._run_job(job))
+        # Skip the points in time that were missed, but stay on the grid
+        missed = (now - job.next_run) // job.every + 1
+        job.next_run += missed * job.every
+
+    async def _run_job(self, job: Job) -> None:
+        start_time = monotonic()
+        result = "failure"
+        try:
+            await wait_for(job.func(), job.timeout)
+        except TimeoutError:
+            result = "timeout"
+            log.error("Job %s timed out after %s seconds", job.name, job.timeout)
+        except CancelledError:
+            log.warning("Job %s cancelled", job.name)
+            raise
+        except Exception as e:
+            log.error("Error in job %s", job.name)
+            log.exception(e)
+        else:
+            result = "success"
+            log.debug("Job %s took %s seconds", job.name, monotonic() - start_time)
+        TASK_DURATION.labels(job.name).observe(monotonic() - start_time)
+        TASK_RUNS.labels(job.name, result).inc()
+        if result == "success":
+            job.last_success = time()
+        else:
+            job.last_failure = time()
+        if job.pending:
+            job.pending = False
+            job.next_run = monotonic()
+            self._wakeup.set()
+
+    async def _shutdown(self) -> None:
+        tasks = [job.task for job in self.jobs.values() if job.task is not None and not job.task.done()]
+        if not tasks:
+            return
+        log.info("Waiting for %s running jobs...", len(tasks))
+        _, pending = await wait(tasks, timeout=self.shutdown_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await wait(pending)
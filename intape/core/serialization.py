@@ -0,0 +1,95 @@
+"""Fast JSON serialization of database rows.
+
+List endpoints used to convert every row to a schema with `from_orm`, and
+FastAPI then validated the returned schemas again against `response_model`
+before encoding them. The rows come from the database, so their types are
+already right, and both validations can be skipped: values of the schema
+fields are read from the rows and encoded to JSON bytes directly. Routes
+keep their `response_model`, so the OpenAPI schema doesn't change, and
+return the bytes in a `Response`, which FastAPI sends as is.
+
+Examples:
+    >>> @router.get("/", response_model=list[VideoSchema])
+    >>> async def get_videos(...) -> Response:
+    >>>     videos = (await db.execute(query)).scalars().all()
+    >>>     return list_response(VideoSchema, videos)
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from operator import attrgetter
+from typing import Any, Callable, Iterable
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.dict()
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+# The same settings as `JSONResponse`, so that responses are byte-for-byte equal
+_encode = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode
+
+
+class RowSerializer:
+    """Serialize ORM objects or SQL rows with the fields of a schema.
+
+    Values are read by field names, and written by aliases, as FastAPI does.
+    Any object with attributes named after the fields can be serialized,
+    including `Row` objects of queries that select only the needed columns.
+    """
+
+    def __init__(self, schema: type[BaseModel]) -> None:
+        """Initialize serializer.
+
+        Args:
+            schema (type[BaseModel]): Schema defining the fields and their order.
+        """
+        fields = list(schema.__fields__.values())
+        self.keys = tuple(field.alias for field in fields)
+        getter: Callable[[Any], Any] = attrgetter(*(field.name for field in fields))
+        # `attrgetter` with a single name returns the value, not a tuple
+        self._get: Callable[[Any], tuple[Any, ...]] = getter if len(fields) > 1 else lambda row: (getter(row),)
+
+    def to_dicts(self, rows: Iterable[Any]) -> list[dict[str, Any]]:
+        """Convert rows to dictionaries."""
+        keys = self.keys
+        get = self._get
+        return [dict(zip(keys, get(row))) for row in rows]
+
+    def to_json(self, rows: Iterable[Any]) -> bytes:
+        """Serialize rows to a JSON array."""
+        return _encode(self.to_dicts(rows)).encode()
+
+
+_serializers: dict[type[BaseModel], RowSerializer] = {}
+
+
+def get_serializer(schema: type[BaseModel]) -> RowSerializer:
+    """Return cached serializer of the schema."""
+    serializer = _serializers.get(schema)
+    if serializer is None:
+        serializer = _serializers[schema] = RowSerializer(schema)
+    return serializer
+
+
+def dump(obj: BaseModel) -> bytes:
+    """Serialize schema to JSON, as FastAPI does in responses."""
+    return _encode(jsonable_encoder(obj)).encode()
+
+
+def list_response(schema: type[BaseModel], rows: Iterable[Any], status_code: int = 200) -> Response:
+    """Return response with rows serialized as a JSON array of the schema."""
+    return Response(get_serializer(schema).to_json(rows), status_code=status_code, media_type="application/json")
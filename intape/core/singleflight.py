@@ -0,0 +1,75 @@
+"""Coalescing of identical concurrent calls.
+
+When many requests read the same entity at the same time, only the first
+one runs the query, and the others wait for its result instead of running
+the same query again. Calls are shared only while they are in flight, but a
+caller arriving after a write was committed may still get the result of a
+call started before it.
+
+Examples:
+    >>> etag, body = await single_flight.do(f"videos:{video_id}", lambda: load_video(video_id))
+"""
+from asyncio import Task, ensure_future, shield
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """Call in flight and the number of its waiters."""
+
+    def __init__(self, task: "Task[Any]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one call for each key at a time.
+
+    Callers of the same key share the result or the exception of the call in
+    flight. The call runs in its own task, so it isn't interrupted when one of
+    the callers is cancelled, and it is cancelled only when all of them are.
+    Because the call may outlive the caller which started it, it must not
+    use resources bound to the caller, like the database session of its
+    request.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._calls: dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        """Return number of calls in flight."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Call `func`, or wait for the call in flight with the same key.
+
+        Args:
+            key (Hashable): Key of the call. Calls with equal keys must return equal results.
+            func (Callable[[], Awaitable[T]]): Function to call.
+
+        Returns:
+            T: Result of the call.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(ensure_future(func()))
+            call.task.add_done_callback(partial(self._forget, key, call))
+        call.waiters += 1
+        try:
+            result: T = await shield(call.task)
+            return result
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # All callers were cancelled, and nobody waits for the result.
+                # The call is forgotten right away, so that new callers don't
+                # join the cancelled one.
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call, *_: Any) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,472 @@
+"""Tracing spans.
+
+A trace is a tree of spans started by `Tracer.trace` for a request or a
+worker task. Spans are created by `span` anywhere down the call stack, and
+the current span is stored in a context variable, so spans of concurrent
+requests are never mixed up.
+
+Only a fraction of traces is sampled. Outside of a sampled trace `span`
+returns a shared no-op span, so instrumentation costs a context variable
+lookup. Finished traces are passed to exporters, and traces slower than the
+threshold are logged with their span tree.
+
+Examples:
+    >>> set_tracer(Tracer([JSONExporter()], sample_rate=0.1, slow_threshold=1.0))
+    >>> with get_tracer().trace("verify_videos"):
+    >>>     with span("rpc.eth_getTransactionByHash", tx=tx_hash):
+    >>>         ...
+"""
+import json
+import sys
+from asyncio import Task, TimeoutError, get_running_loop, sleep
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from logging import getLogger
+from queue import SimpleQueue
+from random import getrandbits, random
+from threading import Thread
+from time import perf_counter, time_ns
+from types import TracebackType
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterator,
+    ParamSpec,
+    Sequence,
+    TextIO,
+    Type,
+    TypeVar,
+)
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+
+from .config import Config
+
+log = getLogger(__name__)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_current: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+class NoopSpan:
+    """Span that records nothing, used outside of sampled traces."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set span attribute."""
+
+    def update_name(self, name: str) -> None:
+        """Change span name."""
+
+    def __enter__(self) -> "NoopSpan":
+        """Enter span."""
+        return self
+
+    def __exit__(
+        self, exc_type: Type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        """Exit span."""
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Span(NoopSpan):
+    """Timed operation inside a trace.
+
+    Attributes:
+        name (str): Operation name, e.g. `db.get_by_key`.
+        trace_id (int): 128-bit trace ID.
+        span_id (int): 64-bit span ID.
+        parent (Span | None): Parent span, `None` for the root span.
+        attributes (dict[str, Any]): Span attributes.
+        children (list[Span]): Child spans in the order they were started.
+        start_time (int): Unix time of the start in nanoseconds.
+        duration (float): Duration in seconds, set when the span is finished.
+        error (str | None): Exception that the span was exited with.
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent",
+        "attributes",
+        "children",
+        "start_time",
+        "duration",
+        "error",
+        "_start",
+        "_token",
+    )
+
+    def __init__(self, name: str, trace_id: int, parent: "Span | None" = None, **attributes: Any) -> None:
+        """Initialize span."""
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = getrandbits(64)
+        self.parent = parent
+        self.attributes = attributes
+        self.children: list[Span] = []
+        self.start_time = 0
+        self.duration = 0.0
+        self.error: str | None = None
+        if parent is not None:
+            parent.children.append(self)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set span attribute."""
+        self.attributes[key] = value
+
+    def update_name(self, name: str) -> None:
+        """Change span name, e.g. when the route of a request is known."""
+        self.name = name
+
+    def add_child(self, name: str, start_time: int, duration: float, **attributes: Any) -> "Span":
+        """Add finished child span, e.g. from an event hook that can't use a context manager."""
+        child = Span(name, self.trace_id, self, **attributes)
+        child.start_time = start_time
+        child.duration = duration
+        return child
+
+    @property
+    def end_time(self) -> int:
+        """Unix time of the end in nanoseconds."""
+        return self.start_time + int(self.duration * 1e9)
+
+    def walk(self, depth: int = 0) -> Iterator[tuple[int, "Span"]]:
+        """Iterate over the span and its descendants with their depth."""
+        yield depth, self
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+    def format_tree(self) -> str:
+        """Format span tree for logs."""
+        lines = []
+        for depth, span in self.walk():
+            attributes = " ".join(f"{key}={value}" for key, value in span.attributes.items())
+            error = f" error={span.error}" if span.error else ""
+            lines.append(f"{'  ' * depth}{span.name} {span.duration * 1000:.1f} ms {attributes}{error}".rstrip())
+        return "\n".join(lines)
+
+    def __enter__(self) -> "Span":
+        """Start span and make it current."""
+        self.start_time = time_ns()
+        self._start = perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(
+        self, exc_type: Type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        """Finish span."""
+        self.duration = perf_counter() - self._start
+        if exc_val is not None:
+            self.error = repr(exc_val)
+        _current.reset(self._token)
+
+
+def current_span() -> Span | None:
+    """Return the current span, or `None` outside of a sampled trace."""
+    return _current.get()
+
+
+def span(name: str, **attributes: Any) -> NoopSpan:
+    """Create child span of the current one.
+
+    Use it as a context manager. Outside of a sampled trace the shared no-op
+    span is returned.
+    """
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent, **attributes)
+
+
+def traced(name: str | None = None) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Run coroutine function in a span.
+
+    Args:
+        name (str | None): Span name. Defaults to the function name.
+    """
+
+    def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        span_name = name or func.__name__
+
+        @wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if _current.get() is None:
+                return await func(*args, **kwargs)
+            with span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class SpanExporter:
+    """Base exporter of finished traces."""
+
+    def export(self, root: Span) -> None:
+        """Export finished trace.
+
+        It is called in the event loop, so it must not block.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Export buffered spans and release resources."""
+
+
+class JSONExporter(SpanExporter):
+    """Write spans as JSON lines, one span per line.
+
+    Traces are queued and written by a background thread, like log records,
+    so a slow stream doesn't block the event loop.
+    """
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        """Initialize exporter.
+
+        Args:
+            stream (TextIO | None): Output stream. Defaults to stdout.
+        """
+        self.stream = stream
+        self._queue: SimpleQueue[Span | None] = SimpleQueue()
+        self._thread: Thread | None = None
+
+    def export(self, root: Span) -> None:
+        """Queue spans of the trace."""
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name="JSONExporter", daemon=True)
+            self._thread.start()
+        self._queue.put(root)
+
+    def _run(self) -> None:
+        while True:
+            root = self._queue.get()
+            if root is None:
+                return
+            try:
+                self.write(root)
+            except Exception as e:
+                log.warning("Failed to write trace %s: %r", root.name, e)
+
+    def write(self, root: Span) -> None:
+        """Write spans of the trace."""
+        stream = self.stream or sys.stdout
+        for _, span in root.walk():
+            record = {
+                "trace_id": f"{span.trace_id:032x}",
+                "span_id": f"{span.span_id:016x}",
+                "parent_id": f"{span.parent.span_id:016x}" if span.parent is not None else None,
+                "name": span.name,
+                "start_time": span.start_time,
+                "duration_ms": round(span.duration * 1000, 3),
+                "attributes": span.attributes,
+                "error": span.error,
+            }
+            stream.write(json.dumps(record, default=str) + "\n")
+        stream.flush()
+
+    async def close(self) -> None:
+        """Write queued traces and stop the thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        await get_running_loop().run_in_executor(None, self._thread.join)
+        self._thread = None
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPExporter(SpanExporter):
+    """Send spans to an OpenTelemetry collector with OTLP/HTTP in JSON encoding.
+
+    Spans are buffered and sent in batches from a background task, so that
+    exporting doesn't delay requests. If the collector is unavailable, the
+    batch is dropped.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        service_name: str = "intape",
+        batch_size: int = 512,
+        max_queue_size: int = 4096,
+        interval: float = 5.0,
+        timeout: float = 10.0,
+    ) -> None:
+        """Initialize exporter.
+
+        Args:
+            url (str): Traces endpoint of the collector, e.g. `http://localhost:4318/v1/traces`.
+            service_name (str): Value of the `service.name` resource attribute.
+            batch_size (int): Number of spans that are sent without waiting for the interval.
+            max_queue_size (int): Maximum number of buffered spans, oldest ones are dropped.
+            interval (float): Maximum delay of buffered spans in seconds.
+            timeout (float): Request timeout in seconds.
+        """
+        self.url = url
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.max_queue_size = max_queue_size
+        self.interval = interval
+        self.timeout = timeout
+        self._queue: list[dict[str, Any]] = []
+        self._task: Task[None] | None = None
+        self._session: ClientSession | None = None
+
+    def _convert(self, span: Span) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "traceId": f"{span.trace_id:032x}",
+            "spanId": f"{span.span_id:016x}",
+            "name": span.name,
+            # Server for the root span, internal for the others
+            "kind": 2 if span.parent is None else 1,
+            "startTimeUnixNano": str(span.start_time),
+            "endTimeUnixNano": str(span.end_time),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+        }
+        if span.parent is not None:
+            data["parentSpanId"] = f"{span.parent.span_id:016x}"
+        return data
+
+    def export(self, root: Span) -> None:
+        """Buffer spans of the trace."""
+        self._queue.extend(self._convert(span) for _, span in root.walk())
+        if len(self._queue) > self.max_queue_size:
+            del self._queue[: len(self._queue) - self.max_queue_size]
+        if self._task is None or self._task.done():
+            self._task = get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        if len(self._queue) < self.batch_size:
+            await sleep(self.interval)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Send buffered spans."""
+        while self._queue:
+            batch = self._queue[: self.batch_size]
+            del self._queue[: self.batch_size]
+            payload = {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]
+                        },
+                        "scopeSpans": [{"scope": {"name": "intape"}, "spans": batch}],
+                    }
+                ]
+            }
+            if self._session is None:
+                self._session = ClientSession(timeout=ClientTimeout(total=self.timeout))
+            try:
+                async with self._session.post(self.url, json=payload) as response:
+                    response.raise_for_status()
+            except (ClientError, TimeoutError) as e:
+                log.warning("Failed to export %s spans to %s: %r", len(batch), self.url, e)
+
+    async def close(self) -> None:
+        """Send buffered spans and close HTTP session."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        await self.flush()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class Tracer:
+    """Start sampled traces and export them when they are finished."""
+
+    def __init__(
+        self,
+        exporters: Sequence[SpanExporter] = (),
+        sample_rate: float = 0.0,
+        slow_threshold: float | None = None,
+    ) -> None:
+        """Initialize tracer.
+
+        Args:
+            exporters (Sequence[SpanExporter]): Exporters of finished traces.
+            sample_rate (float): Fraction of traces that are sampled, from 0 to 1.
+            slow_threshold (float | None): Log sampled traces slower than this number of seconds.
+        """
+        self.exporters = list(exporters)
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+
+    @classmethod
+    def from_config(cls, config: Config) -> "Tracer":
+        """Create tracer from configuration."""
+        exporters: list[SpanExporter] = []
+        if "json" in config.TRACE_EXPORTERS:
+            exporters.append(JSONExporter())
+        if "otlp" in config.TRACE_EXPORTERS:
+            exporters.append(OTLPExporter(config.TRACE_OTLP_URL))
+        return cls(exporters, config.TRACE_SAMPLE_RATE, config.TRACE_SLOW_THRESHOLD)
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[NoopSpan]:
+        """Start a trace, or a child span if a trace is already active.
+
+        Yields the root span, or the no-op span if the trace isn't sampled.
+        """
+        if _current.get() is not None:
+            with span(name, **attributes) as child:
+                yield child
+            return
+        if self.sample_rate <= 0 or random() >= self.sample_rate:
+            yield NOOP_SPAN
+            return
+        root = Span(name, getrandbits(128), **attributes)
+        try:
+            with root:
+                yield root
+        finally:
+            self._finish(root)
+
+    def _finish(self, root: Span) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(root)
+            except Exception as e:
+                log.warning("Failed to export trace %s with %s: %r", root.name, exporter.__class__.__name__, e)
+        if self.slow_threshold is not None and root.duration >= self.slow_threshold:
+            log.warning("Slow %s took %.1f ms:\n%s", root.name, root.duration * 1000, root.format_tree())
+
+    async def close(self) -> None:
+        """Close exporters."""
+        for exporter in self.exporters:
+            await exporter.close()
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the global tracer."""
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    """Replace the global tracer."""
+    global _tracer
+    _tracer = tracer
@@ -3,9 +3,11 @@
 All dependencies must be re-exported in this module.
 """
 from .auth import get_current_session, get_current_user
+from .cache import get_cache
 from .config import get_config
 from .database import get_db, get_db_deprecated
 from .ipfs import get_ipfs, get_ipfs_deprecated
+from .singleflight import get_single_flight
 
 __all__ = [
     "get_db_deprecated",
@@ -15,4 +17,6 @@ __all__ = [
     "get_db",
     "get_config",
     "get_ipfs",
+    "get_cache",
+    "get_single_flight",
 ]
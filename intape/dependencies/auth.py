@@ -27,11 +27,9 @@ async def get_current_session(
     return token_model
 
 
-async def get_current_user(request: Request, token_model: UserTokenModel = Depends(get_current_session)) -> UserModel:
-    """Get current user."""
-    db = request.state.db
-    try:
-        user = await UserModel.get_by_id(db, token_model.user_id)
-    except AbstractException:
-        raise InvalidCredentialsException()
-    return user
+async def get_current_user(token_model: UserTokenModel = Depends(get_current_session)) -> UserModel:
+    """Get current user.
+
+    The user is loaded together with the session.
+    """
+    return token_model.user
@@ -0,0 +1,12 @@
+"""Cache dependency."""
+from fastapi import Request
+
+from intape.core.cache import Cache
+
+
+def get_cache(request: Request) -> Cache:
+    """Get the shared cache."""
+    return request.state.cache
+
+
+__all__ = ["get_cache"]
@@ -5,6 +5,7 @@ from asyncipfscluster import IPFSClient
 from fastapi import Request
 
 from intape.core.config import Config
+from intape.core.ipfs import InstrumentedIPFSClient
 
 __all__ = ["get_ipfs_instance_deprecated", "get_ipfs_deprecated", "get_ipfs"]
 
@@ -17,7 +18,7 @@ def get_ipfs_instance_deprecated(config: Config) -> IPFSClient:
     Returns:
         IPFSClient: Prepared IPFS session.
     """
-    return IPFSClient(config.IPFS_URL, config.IPFS_AUTH)
+    return InstrumentedIPFSClient(config.IPFS_URL, config.IPFS_AUTH)
 
 
 async def get_ipfs_deprecated(config: Config) -> AsyncGenerator[IPFSClient, None]:
@@ -0,0 +1,12 @@
+"""Single-flight dependency."""
+from intape.core.singleflight import SingleFlight
+
+SINGLE_FLIGHT = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the single-flight group shared by all requests of the process."""
+    return SINGLE_FLIGHT
+
+
+__all__ = ["get_single_flight"]
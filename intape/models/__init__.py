@@ -5,8 +5,17 @@ Alembic migrations generator.
 """
 from .collection import CollectionEntryModel, CollectionModel
 from .file import FileModel
+from .job import JobModel
 from .token import UserTokenModel
 from .user import UserModel
 from .video import VideoModel
 
-__all__ = ["UserModel", "UserTokenModel", "FileModel", "VideoModel", "CollectionModel", "CollectionEntryModel"]
+__all__ = [
+    "UserModel",
+    "UserTokenModel",
+    "FileModel",
+    "VideoModel",
+    "CollectionModel",
+    "CollectionEntryModel",
+    "JobModel",
+]
@@ -2,12 +2,38 @@
 from __future__ import annotations
 
 import typing as t
+from functools import wraps
 
 from pydantic import BaseModel
-from sqlalchemy import Column, select
+from sqlalchemy import Column, event, inspect, select
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapper
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.base import ExecutableOption
+
+from intape.core.etag import make_etag
+from intape.core.tracing import current_span, span
 
 T = t.TypeVar("T", bound="AbstractModel")
+P = t.ParamSpec("P")
+R = t.TypeVar("R")
+
+
+def _traced(func: t.Callable[P, t.Awaitable[R]]) -> t.Callable[P, t.Awaitable[R]]:
+    """Run the model method in a span named after the method, with the model name attribute."""
+    name = f"db.{func.__name__}"
+
+    @wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        if current_span() is None:
+            return await func(*args, **kwargs)
+        owner = args[0]
+        model = owner.__name__ if isinstance(owner, type) else owner.__class__.__name__
+        with span(name, model=model):
+            return await func(*args, **kwargs)
+
+    return wrapper
 
 
 class AbstractModel:
@@ -15,8 +41,18 @@ class AbstractModel:
 
     It provides the basic methods like save, remove, update, etc
     for all the models.
+
+    Relationships are not loaded unless asked, so the getters accept loader
+    options for the relationships and columns used by the caller.
+
+    Examples:
+        >>> await VideoModel.get(db, video_id, options=[joinedload(VideoModel.user)])
     """
 
+    # Bookkeeping columns, which are not serialized, so their updates don't
+    # change the version and the entity tag
+    UNVERSIONED_COLUMNS: t.ClassVar[frozenset[str]] = frozenset()
+
     def __repr__(self) -> str:
         """Return the representation of the model."""
         return f"<{self.__class__.__name__} {self.get_primary_key()}={self.get_primary_key_value(self)}>"
@@ -64,9 +100,50 @@ class AbstractModel:
         return getattr(model, cls.get_primary_key())
 
     @classmethod
-    async def get(cls: t.Type[T], db: AsyncSession, primary_key: t.Any) -> T | None:
+    def _get_version_column(cls) -> Column[t.Any]:
+        """Get the version counter column.
+
+        Raises:
+            TypeError: If the model has no version counter.
+        """
+        column: Column[t.Any] | None = cls.__table__.columns.get("version")  # type: ignore
+        if column is None:
+            raise TypeError(f"{cls.__name__} has no version counter")
+        return column
+
+    @classmethod
+    def cache_key(cls, primary_key: t.Any) -> str:
+        """Return cache key of the row, also used as the cache tag of everything built from it."""
+        return f"{cls.__tablename__}:{primary_key}"  # type: ignore
+
+    @property
+    def etag(self) -> str:
+        """Entity tag of the row, changed on every update."""
+        version = getattr(self, self._get_version_column().name)
+        return make_etag(self.__tablename__, self.get_primary_key_value(self), version)  # type: ignore
+
+    @classmethod
+    @_traced
+    async def get_etag(cls, db: AsyncSession, /, **kwargs: t.Any) -> str | None:
+        """Get entity tag of a row by multiple keys, without loading the row.
+
+        Returns:
+            str | None: Entity tag, or `None` if the row is not found.
+        """
+        primary_key = cls.__table__.primary_key.columns.values()[0]  # type: ignore
+        query = select(primary_key, cls._get_version_column()).filter_by(**kwargs)
+        row = (await db.execute(query)).first()
+        if row is None:
+            return None
+        return make_etag(cls.__tablename__, *row)  # type: ignore
+
+    @classmethod
+    @_traced
+    async def get(
+        cls: t.Type[T], db: AsyncSession, primary_key: t.Any, *, options: t.Iterable[ExecutableOption] = ()
+    ) -> T | None:
         """Get a model by primary key."""
-        query = select(cls).filter_by(**{cls.get_primary_key(): primary_key})
+        query = select(cls).filter_by(**{cls.get_primary_key(): primary_key}).options(*options)
         return (await db.execute(query)).scalars().first()
 
     @staticmethod
@@ -78,34 +155,103 @@ class AbstractModel:
         return name
 
     @classmethod
-    async def get_by_key(cls: t.Type[T], db: AsyncSession, key: Column[t.Any], value: t.Any) -> T | None:
+    @_traced
+    async def get_by_key(
+        cls: t.Type[T],
+        db: AsyncSession,
+        key: Column[t.Any],
+        value: t.Any,
+        *,
+        options: t.Iterable[ExecutableOption] = (),
+    ) -> T | None:
         """Get a model by a key."""
-        query = select(cls).filter_by(**{cls._get_column(cls, key): value})
+        query = select(cls).filter_by(**{cls._get_column(cls, key): value}).options(*options)
         return (await db.execute(query)).scalars().first()
 
     @classmethod
+    @_traced
     async def get_list_by_key(
-        cls: t.Type[T], db: AsyncSession, key: Column[t.Any], value: t.Any, limit: int = 10, offset: int = 0
+        cls: t.Type[T],
+        db: AsyncSession,
+        key: Column[t.Any],
+        value: t.Any,
+        limit: int = 10,
+        offset: int = 0,
+        *,
+        options: t.Iterable[ExecutableOption] = (),
     ) -> list[T]:
         """Get a list of models by a key."""
         query = select(cls).filter_by(**{cls._get_column(cls, key): value}).offset(offset).limit(limit)
+        query = query.options(*options)
         return (await db.execute(query)).scalars().all()
 
     @classmethod
-    async def get_by_keys(cls: t.Type[T], db: AsyncSession, /, **kwargs: t.Any) -> T | None:
+    @_traced
+    async def get_by_keys(
+        cls: t.Type[T], db: AsyncSession, /, *, options: t.Iterable[ExecutableOption] = (), **kwargs: t.Any
+    ) -> T | None:
         """Get a model by multiple keys."""
-        query = select(cls).filter_by(**kwargs)
+        query = select(cls).filter_by(**kwargs).options(*options)
         return (await db.execute(query)).scalars().first()
 
     @classmethod
+    @_traced
     async def get_list_by_keys(
-        cls: t.Type[T], db: AsyncSession, *, limit: int = 0, offset: int = 0, **kwargs: t.Any
+        cls: t.Type[T],
+        db: AsyncSession,
+        *,
+        limit: int = 0,
+        offset: int = 0,
+        options: t.Iterable[ExecutableOption] = (),
+        **kwargs: t.Any,
     ) -> list[T]:
         """Get a list of models by multiple keys."""
-        query = select(cls).filter_by(**kwargs).offset(offset).limit(limit)
+        query = select(cls).filter_by(**kwargs).offset(offset).limit(limit).options(*options)
         return (await db.execute(query)).scalars().all()
 
     @classmethod
+    def schema_columns(cls, schema: t.Type[BaseModel]) -> list[Column[t.Any]]:
+        """Return columns of the model read by the schema fields.
+
+        Raises:
+            ValueError: If the model has no column for a schema field.
+        """
+        columns = cls.__table__.columns  # type: ignore
+        missing = [name for name in schema.__fields__ if name not in columns]
+        if missing:
+            raise ValueError(f"Columns {', '.join(missing)} not found in {cls.__name__}")
+        return [columns[name] for name in schema.__fields__]
+
+    @classmethod
+    def select_schema(cls, schema: t.Type[BaseModel]) -> Select:
+        """Select only the columns read by the schema.
+
+        Rows are not loaded into the session and relationships are not
+        joined, and they can be serialized with `list_response`.
+        """
+        return select(*cls.schema_columns(schema))
+
+    @classmethod
+    @_traced
+    async def get_rows_by_keys(
+        cls,
+        db: AsyncSession,
+        schema: t.Type[BaseModel],
+        /,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+        order_by: t.Any = None,
+        **kwargs: t.Any,
+    ) -> list[Row]:
+        """Get rows with the columns read by the schema, filtered by multiple keys."""
+        query = cls.select_schema(schema).filter_by(**kwargs).offset(offset).limit(limit)
+        if order_by is not None:
+            query = query.order_by(order_by)
+        return (await db.execute(query)).all()
+
+    @classmethod
+    @_traced
     async def create(cls: t.Type[T], db: AsyncSession, **kwargs: t.Any) -> T:
         """Create a new model."""
         model = cls(**kwargs)
@@ -113,24 +259,49 @@ class AbstractModel:
         return model
 
     @classmethod
+    @_traced
     async def remove_by_primary(cls: t.Type[T], db: AsyncSession, primary_key: t.Any) -> None:
         """Remove a model by primary key."""
         model = await cls.get(db, primary_key)
         if model:
             await model.remove(db)
 
+    @_traced
     async def remove(self, db: AsyncSession) -> None:
         """Remove the model."""
         await db.delete(self)
         await db.commit()
 
+    @_traced
     async def save(self, db: AsyncSession) -> None:
         """Save the model."""
         db.add(self)
         await db.commit()
 
+    @_traced
     async def update(self, db: AsyncSession, **kwargs: t.Any) -> None:
         """Update the model."""
         for key, value in kwargs.items():
             setattr(self, key, value)
         await self.save(db)
+
+
+def _increment_version(mapper: Mapper, connection: t.Any, model: AbstractModel) -> None:
+    """Increment the version counter of the updated row.
+
+    The counter is incremented by the database, and the UPDATE isn't
+    conditional on the old version, so concurrent updates don't fail, and
+    each of them increments the counter. The new version is returned by the
+    UPDATE of the mappers with `eager_defaults`. Updates of only the
+    `UNVERSIONED_COLUMNS` keep the version.
+    """
+    column = mapper.columns.get("version")
+    if column is None:
+        return
+    state = inspect(model)
+    changed = {attr.key for attr in mapper.column_attrs if state.attrs[attr.key].history.has_changes()}
+    if changed - model.UNVERSIONED_COLUMNS:
+        setattr(model, column.key, getattr(type(model), column.key) + 1)
+
+
+event.listen(AbstractModel, "before_update", _increment_version, propagate=True)
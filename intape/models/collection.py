@@ -2,7 +2,15 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    FetchedValue,
+    ForeignKey,
+    Integer,
+    String,
+)
 from sqlalchemy.orm import relationship
 
 from intape.core.database import Base
@@ -26,7 +34,11 @@ class CollectionModel(Base, AbstractModel):
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id: int = Column("user_id", Integer, ForeignKey("users.id"), nullable=False)
-    user: "UserModel" = relationship("UserModel", lazy="joined")
+    user: "UserModel" = relationship("UserModel", lazy="raise")
+
+    # Incremented by the database on every update, used in entity tags
+    version: int = Column("version", Integer, nullable=False, default=1, server_onupdate=FetchedValue())
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class CollectionEntryModel(Base, AbstractModel):
@@ -36,9 +48,9 @@ class CollectionEntryModel(Base, AbstractModel):
 
     id = Column(Integer, primary_key=True)
     collection_id: int = Column("collection_id", Integer, ForeignKey("collections.id"), nullable=False)
-    collection: CollectionModel = relationship("CollectionModel", lazy="joined")
+    collection: CollectionModel = relationship("CollectionModel", lazy="raise")
     user_id: int = Column("user_id", Integer, ForeignKey("users.id"), nullable=False)
-    user: "UserModel" = relationship("UserModel", lazy="joined")
+    user: "UserModel" = relationship("UserModel", lazy="raise")
     video_id: int = Column("video_id", Integer, ForeignKey("videos.id"), nullable=False)
-    video: "VideoModel" = relationship("VideoModel", lazy="joined")
+    video: "VideoModel" = relationship("VideoModel", lazy="raise")
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
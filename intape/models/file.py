@@ -13,6 +13,7 @@ from intape.core.exceptions import (
     FileAlreadyExistsException,
     FileNotFoundException,
 )
+from intape.core.tracing import traced
 
 from .abc import AbstractModel
 
@@ -28,7 +29,7 @@ class FileModel(Base, AbstractModel):
     cid = Column("cid", String(128), primary_key=True, unique=True, index=True)
     mime_type: str = Column("mime_type", String(32), nullable=False)
     user_id: int = Column("user_id", Integer, ForeignKey("users.id"), nullable=False)
-    user: "UserModel" = relationship("UserModel", lazy="joined")
+    user: "UserModel" = relationship("UserModel", lazy="raise")
     created_at: datetime = Column("created_at", DateTime(timezone=True), server_default=func.now())
     remove_at: datetime | None = Column("remove_at", DateTime(timezone=True), nullable=True)
 
@@ -58,6 +59,9 @@ class FileModel(Base, AbstractModel):
     ) -> "FileModel":
         """Create new file.
 
+        The file is flushed, but not committed, so that the caller can commit
+        it together with other changes.
+
         Args:
             db (AsyncSession): Database session.
             user (UserModel): User that uploaded this file.
@@ -74,12 +78,13 @@ class FileModel(Base, AbstractModel):
         file = cls(cid=cid, mime_type=mime_type, user=user, remove_at=remove_at)
         try:
             db.add(file)
-            await db.commit()
+            await db.flush()
         except Exception:
             await db.rollback()
             raise FileAlreadyExistsException()
         return file
 
+    @traced("file.remove")
     async def remove_all(self, db: AsyncSession, ipfs: IPFSClient) -> None:
         """Remove file.
 
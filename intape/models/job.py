@@ -0,0 +1,36 @@
+"""Background job model."""
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from intape.core.database import Base
+
+from .abc import AbstractModel
+
+
+class JobModel(Base, AbstractModel):
+    """Background job model.
+
+    Rows are created by `intape.worker.enqueue` and processed by the worker.
+    """
+
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_run_at", "status", "run_at"),)
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DEAD = "dead"
+
+    id: int = Column("id", Integer, primary_key=True)
+    kind: str = Column("kind", String(32), nullable=False)
+    payload: dict[str, Any] = Column("payload", JSONB, nullable=False, default=dict)
+    status: str = Column("status", String(16), nullable=False, default=PENDING)
+    attempts: int = Column("attempts", Integer, nullable=False, default=0)
+    max_attempts: int = Column("max_attempts", Integer, nullable=False, default=5)
+    run_at: datetime = Column("run_at", DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_until: datetime | None = Column("locked_until", DateTime(timezone=True), nullable=True)
+    last_error: str | None = Column("last_error", Text, nullable=True)
+    created_at: datetime = Column("created_at", DateTime(timezone=True), server_default=func.now())
@@ -15,7 +15,7 @@ from sqlalchemy import (
     select,
 )
 from sqlalchemy.ext.asyncio import AsyncSession as Session
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import joinedload, relationship
 from sqlalchemy.sql import func
 
 from intape.core.config import Config
@@ -54,7 +54,7 @@ class UserTokenModel(Base, AbstractModel):
 
     id: int = Column("id", Integer, primary_key=True, index=True)
     user_id: int = Column("user_id", Integer, ForeignKey("users.id"), nullable=False)
-    user: "UserModel" = relationship("UserModel", lazy="joined")
+    user: "UserModel" = relationship("UserModel", lazy="raise")
     iat: int = Column("iat", Integer, nullable=False, default=generate_iat_ts)
     exp: int = Column("exp", Integer, nullable=False, default=generate_refresh_token_expire_ts)
     session_info: str | None = Column("session_info", String(64), nullable=True)
@@ -138,9 +138,8 @@ class UserTokenModel(Base, AbstractModel):
         """
         data = decode(config, token, options={"verify_exp": True})
         schema = AccessTokenSchema.parse_obj(data)
-        user_token: "UserTokenModel" | None = (
-            (await session.execute(select(cls).where(cls.id == schema.jti))).scalars().first()
-        )
+        query = select(cls).where(cls.id == schema.jti).options(joinedload(cls.user))
+        user_token: "UserTokenModel" | None = (await session.execute(query)).scalars().first()
         if user_token is None:
             raise TokenNotFoundException(detail="Token not found")
         if user_token.revoked:
@@ -205,7 +204,7 @@ class UserTokenModel(Base, AbstractModel):
 
     @classmethod
     async def get_by_access_token(cls, config: Config, session: Session, token: str) -> "UserTokenModel":
-        """Get user token by access token.
+        """Get user token by access token, with its user loaded.
 
         Args:
             session: Database session.
@@ -222,9 +221,8 @@ class UserTokenModel(Base, AbstractModel):
         """
         data = decode(config, token, options={"verify_exp": True})
         schema = AccessTokenSchema.parse_obj(data)
-        user_token: "UserTokenModel" | None = (
-            (await session.execute(select(cls).where(cls.id == schema.jti))).scalars().first()
-        )
+        query = select(cls).where(cls.id == schema.jti).options(joinedload(cls.user))
+        user_token: "UserTokenModel" | None = (await session.execute(query)).scalars().first()
         if user_token is None:
             raise TokenNotFoundException(detail="Token not found")
         if user_token.revoked:
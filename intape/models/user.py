@@ -1,7 +1,16 @@
 """User model module."""
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, or_, select
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    FetchedValue,
+    Integer,
+    String,
+    or_,
+    select,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import func
 
@@ -42,6 +51,10 @@ class UserModel(Base, AbstractModel):
     created_at: datetime = Column("created_at", DateTime(timezone=True), server_default=func.now())
     updated_at: datetime = Column("updated_at", DateTime(timezone=True), onupdate=func.now())
 
+    # Incremented by the database on every update, used in entity tags
+    version: int = Column("version", Integer, nullable=False, default=1, server_onupdate=FetchedValue())
+    __mapper_args__ = {"eager_defaults": True}
+
     @classmethod
     async def get_by_name_or_email(cls, db: AsyncSession, username: str) -> "UserModel":
         """Get user by name or email.
@@ -2,14 +2,23 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from asyncipfscluster import IPFSClient
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    FetchedValue,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
 from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from intape.core.database import Base
+from intape.core.ipfs import compute_cid
 from intape.schemas.video import VideoMetadataSchema
 
 from .abc import AbstractModel
@@ -23,6 +32,21 @@ class VideoModel(Base, AbstractModel):
     """Video model."""
 
     __tablename__ = "videos"
+    __table_args__ = (
+        # Only videos waiting for verification are indexed
+        Index(
+            "ix_videos_next_check_at",
+            "next_check_at",
+            postgresql_where=text("verify_status = 'pending' AND next_check_at IS NOT NULL"),
+        ),
+    )
+
+    VERIFY_PENDING = "pending"
+    VERIFY_CONFIRMED = "confirmed"
+    VERIFY_INVALID = "invalid"
+
+    # Verification backoff of the worker isn't part of the video
+    UNVERSIONED_COLUMNS = frozenset({"verify_attempts", "next_check_at"})
 
     id: int = Column("id", Integer, primary_key=True, index=True)
     description: str = Column("description", String(150), nullable=False)
@@ -32,23 +56,40 @@ class VideoModel(Base, AbstractModel):
     is_confirmed: bool = Column("is_confirmed", Boolean, nullable=False, default=False)
 
     user_id: int = Column("user_id", Integer, ForeignKey("users.id"), nullable=False)
-    user: "UserModel" = relationship("UserModel", lazy="joined")
+    user: "UserModel" = relationship("UserModel", lazy="raise")
 
     file_cid: str = Column("file_cid", String(128), ForeignKey("files.cid"), nullable=False)
-    file: "FileModel" = relationship("FileModel", lazy="joined")
+    file: "FileModel" = relationship("FileModel", lazy="raise")
 
     tx_hash: str | None = Column("tx_hash", String(128), nullable=True)
+    verify_status: str = Column("verify_status", String(16), nullable=False, default=VERIFY_PENDING)
+    verify_attempts: int = Column("verify_attempts", Integer, nullable=False, default=0)
+    # Time of the next transaction check, None if there is nothing to check
+    next_check_at: datetime | None = Column("next_check_at", DateTime(timezone=True), nullable=True)
 
     metadata_cid: str | None = Column("metadata_cid", String(128), nullable=True)
 
-    async def get_metadata_cid(self, db: AsyncSession, ipfs: IPFSClient) -> str:
-        """Return metadata CID."""
-        metadata = VideoMetadataSchema(
+    # Incremented by the database on every update, used in entity tags
+    version: int = Column("version", Integer, nullable=False, default=1, server_onupdate=FetchedValue())
+    # Columns generated by the database are returned by the INSERT and the
+    # UPDATE, so that videos are serialized without another query
+    __mapper_args__ = {"eager_defaults": True}
+
+    def get_metadata(self) -> VideoMetadataSchema:
+        """Return NFT metadata."""
+        return VideoMetadataSchema(
             name=self.description[:32],
             description=self.description,
             image=f"ipfs://{self.file_cid}",
         )
-        cid = await ipfs.add_bytes(metadata.json().encode(), "application/json")
-        self._metadata_cid = cid
-        await self.save(db)
-        return "ipfs://" + cid
+
+    def get_metadata_bytes(self) -> bytes:
+        """Return serialized NFT metadata."""
+        return self.get_metadata().json().encode()
+
+    def get_metadata_cid(self) -> str:
+        """Return CID of NFT metadata, without uploading it.
+
+        The metadata is added to IPFS by the `PIN_METADATA` job.
+        """
+        return "ipfs://" + compute_cid(self.get_metadata_bytes())
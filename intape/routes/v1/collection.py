@@ -1,7 +1,13 @@
 """Collection endpoints."""
-from fastapi import APIRouter, Depends
+from functools import partial
+
+from fastapi import APIRouter, Depends, Header, Response
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from intape.core.cache import Cache, get_entity, set_current_entity
+from intape.core.config import Config
+from intape.core.etag import conditional_response, etag_matches, not_modified
 from intape.core.exceptions import (
     CollectionEntryAlreadyExists,
     CollectionEntryNotFound,
@@ -11,7 +17,16 @@ from intape.core.exceptions import (
     VideoNotFoundException,
     VideoNotYetConfirmedException,
 )
-from intape.dependencies import get_current_user, get_db
+from intape.core.query_stats import query_budget
+from intape.core.serialization import dump, list_response
+from intape.core.singleflight import SingleFlight
+from intape.dependencies import (
+    get_cache,
+    get_config,
+    get_current_user,
+    get_db,
+    get_single_flight,
+)
 from intape.models import (
     CollectionEntryModel,
     CollectionModel,
@@ -46,22 +61,56 @@ async def create_collection(
 
 
 @router.get("/{collection_id}", response_model=CollectionSchema)
+@query_budget(3)
 async def get_collection(
     collection_id: int,
     db: AsyncSession = Depends(get_db),
-) -> CollectionSchema:
+    cache: Cache = Depends(get_cache),
+    config: Config = Depends(get_config),
+    single_flight: SingleFlight = Depends(get_single_flight),
+    if_none_match: str | None = Header(None),
+) -> Response:
     """Get a collection.
 
+    Responses have the `ETag` header, and requests with the `If-None-Match`
+    header matching it are answered with `304 Not Modified`. Collections are
+    cached, and concurrent requests of the same collection share one query.
+
     Raises:
     - CollectionNotFound: If the collection does not exist.
 
     Returns:
     - CollectionSchema: The collection.
     """
-    db_collection = await CollectionModel.get(db, collection_id)
-    if db_collection is None:
-        raise CollectionNotFound()
-    return CollectionSchema.from_orm(db_collection)
+    key = CollectionModel.cache_key(collection_id)
+    cached = await get_entity(cache, key)
+    if cached is not None:
+        return conditional_response(*cached, if_none_match)
+
+    if if_none_match is not None:
+        etag = await CollectionModel.get_etag(db, id=collection_id)
+        if etag is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    async def load() -> tuple[str, bytes]:
+        # The load may outlive this request, so it has its own session
+        async with AsyncSession(db.bind, expire_on_commit=False) as flight_db:
+            db_collection = await CollectionModel.get(flight_db, collection_id)
+            if db_collection is None:
+                raise CollectionNotFound()
+            body = dump(CollectionSchema.from_orm(db_collection))
+            await set_current_entity(
+                cache,
+                key,
+                db_collection.etag,
+                body,
+                partial(CollectionModel.get_etag, flight_db, id=collection_id),
+                config.CACHE_TTL,
+                [key],
+            )
+        return db_collection.etag, body
+
+    return conditional_response(*await single_flight.do(key, load), None)
 
 
 @router.post("/{collection_id}/entry", response_model=CollectionEntrySchema)
@@ -123,7 +172,7 @@ async def get_collection_entries(
     limit: int = 100,
     offset: int = 0,
     db: AsyncSession = Depends(get_db),
-) -> list[CollectionEntrySchema]:
+) -> Response:
     """Get a collection's entries.
 
     Raises:
@@ -132,15 +181,15 @@ async def get_collection_entries(
     Returns:
     - list[CollectionEntrySchema]: The collection's entries.
     """
-    # Check if the collection exists.
-    db_collection = await CollectionModel.get(db, collection_id)
-    if db_collection is None:
-        raise CollectionNotFound()
-
-    db_collection_entries = await CollectionEntryModel.get_list_by_key(
-        db, CollectionEntryModel.collection_id, collection_id, limit, offset
+    db_collection_entries = await CollectionEntryModel.get_rows_by_keys(
+        db, CollectionEntrySchema, limit=limit, offset=offset, collection_id=collection_id
     )
-    return [CollectionEntrySchema.from_orm(db_collection_entry) for db_collection_entry in db_collection_entries]
+    # Only an empty page may be of a collection which doesn't exist
+    if not db_collection_entries:
+        query = select(CollectionModel.id).filter_by(id=collection_id)
+        if (await db.execute(query)).scalar() is None:
+            raise CollectionNotFound()
+    return list_response(CollectionEntrySchema, db_collection_entries)
 
 
 @router.get("/{collection_id}/entry/{collection_entry_id}", response_model=CollectionEntrySchema)
@@ -6,13 +6,16 @@ from fastapi import APIRouter, Depends, Request, UploadFile
 from pytz import UTC
 
 from intape.core.exceptions import FileAlreadyExistsException
+from intape.core.query_stats import query_budget
 from intape.dependencies import get_current_user, get_ipfs
 from intape.models import FileModel, UserModel
+from intape.worker import EXPIRE_FILE, enqueue
 
 router = APIRouter(tags=["file"], prefix="/file")
 
 
 @router.post("/upload", response_model=str)
+@query_budget(4)
 async def upload_file(
     *,
     request: Request,
@@ -37,15 +40,14 @@ async def upload_file(
     file_content = await file.read()
     cid: str = await ipfs.add_bytes(file_content, file.content_type, file.filename, "InTape")
 
+    remove_at = datetime.now(tz=UTC) + timedelta(minutes=10)
     try:
-        await FileModel.create_obj(
-            db,
-            user,
-            cid=cid,
-            mime_type=file.content_type,
-            remove_at=datetime.now(tz=UTC) + timedelta(minutes=10),
-        )
+        await FileModel.create_obj(db, user, cid=cid, mime_type=file.content_type, remove_at=remove_at)
     except FileAlreadyExistsException:
         pass
+    else:
+        # The file and its expiry job are committed in one transaction
+        enqueue(db, EXPIRE_FILE, {"cid": cid}, run_at=remove_at)
+        await db.commit()
 
     return cid
@@ -1,9 +1,9 @@
 """Search endpoints."""
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from intape.core.serialization import list_response
 from intape.dependencies import get_db
 from intape.models import UserModel, VideoModel
 from intape.schemas.user import PublicUserSchema
@@ -17,7 +17,7 @@ async def search_videos(
     *,
     db: AsyncSession = Depends(get_db),
     query: str = Query(),
-) -> list[VideoSchema]:
+) -> Response:
     """Search videos.
 
     Used to search for videos.
@@ -25,9 +25,9 @@ async def search_videos(
     Returns:
     - list[VideoModel]: List of videos.
     """
-    query = select(VideoModel).where(VideoModel.description.like(f"%{query}%"))
-    videos = (await db.execute(query)).scalars().all()
-    return [VideoSchema.from_orm(video) for video in videos]
+    query = VideoModel.select_schema(VideoSchema).where(VideoModel.description.like(f"%{query}%"))
+    videos = (await db.execute(query)).all()
+    return list_response(VideoSchema, videos)
 
 
 @router.get("/users", response_model=list[PublicUserSchema])
@@ -35,7 +35,7 @@ async def search_users(
     *,
     db: AsyncSession = Depends(get_db),
     query: str = Query(),
-) -> list[PublicUserSchema]:
+) -> Response:
     """Search users.
 
     Used to search for users.
@@ -43,6 +43,6 @@ async def search_users(
     Returns:
     - list[PublicUserSchema]: List of users.
     """
-    query = select(UserModel).where(UserModel.username.like(f"%{query}%"))
-    users = (await db.execute(query)).scalars().all()
-    return [PublicUserSchema.from_orm(user) for user in users]
+    query = UserModel.select_schema(PublicUserSchema).where(UserModel.username.like(f"%{query}%"))
+    users = (await db.execute(query)).all()
+    return list_response(PublicUserSchema, users)
@@ -3,8 +3,9 @@
 from fastapi import APIRouter, Body, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from intape.core.cache import Cache
 from intape.core.exceptions.file import FileNotFoundException
-from intape.dependencies import get_current_user, get_db
+from intape.dependencies import get_cache, get_current_user, get_db
 from intape.models import FileModel, UserModel
 
 router = APIRouter(tags=["settings"], prefix="/settings")
@@ -15,6 +16,7 @@ async def update_avatar(
     *,
     db: AsyncSession = Depends(get_db),
     user: UserModel = Depends(get_current_user),
+    cache: Cache = Depends(get_cache),
     avatar_cid: str = Body(embed=True),
 ) -> bool:
     """Update avatar.
@@ -29,6 +31,7 @@ async def update_avatar(
         raise FileNotFoundException()
     user.avatar_cid = avatar.cid
     await user.save(db)
+    await cache.invalidate_tags(UserModel.cache_key(user.id))
     return True
 
 
@@ -37,6 +40,7 @@ async def update_username(
     *,
     db: AsyncSession = Depends(get_db),
     user: UserModel = Depends(get_current_user),
+    cache: Cache = Depends(get_cache),
     username: str = Body(embed=True),
 ) -> bool:
     """Update username.
@@ -51,6 +55,7 @@ async def update_username(
         return False
     user.username = username
     await user.save(db)
+    await cache.invalidate_tags(UserModel.cache_key(user.id))
     return True
 
 
@@ -59,6 +64,7 @@ async def update_email(
     *,
     db: AsyncSession = Depends(get_db),
     user: UserModel = Depends(get_current_user),
+    cache: Cache = Depends(get_cache),
     email: str = Body(embed=True),
     is_public: bool = Body(embed=True),
 ) -> bool:
@@ -76,4 +82,5 @@ async def update_email(
     user.is_email_verified = False
     user.is_email_public = is_public
     await user.save(db)
+    await cache.invalidate_tags(UserModel.cache_key(user.id))
     return True
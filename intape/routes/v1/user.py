@@ -1,9 +1,19 @@
 """User-related endpoints."""
-from fastapi import APIRouter, Depends, Path
+from functools import partial
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, Path, Response
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from intape.core.cache import Cache, get_entity, set_current_entity
+from intape.core.config import Config
+from intape.core.etag import conditional_response, etag_matches, not_modified
 from intape.core.exceptions import UserNotFoundException
-from intape.dependencies import get_db
+from intape.core.query_stats import query_budget
+from intape.core.serialization import dump, list_response
+from intape.core.singleflight import SingleFlight
+from intape.dependencies import get_cache, get_config, get_db, get_single_flight
 from intape.models import CollectionModel, UserModel, VideoModel
 from intape.schemas.collection import CollectionSchema
 from intape.schemas.user import PublicUserSchema
@@ -12,15 +22,35 @@ from intape.schemas.video import VideoSchema
 router = APIRouter(tags=["user"], prefix="/user")
 
 
+async def get_user_id(db: AsyncSession, username: str) -> int:
+    """Get ID of the user without loading the whole user.
+
+    Raises:
+        UserNotFoundException: If the user is not found.
+    """
+    user_id: int | None = (await db.execute(select(UserModel.id).filter_by(username=username))).scalar()
+    if user_id is None:
+        raise UserNotFoundException()
+    return user_id
+
+
 @router.get("/{username_or_id}", response_model=PublicUserSchema)
+@query_budget(3)
 async def get_user_info(
     *,
     db: AsyncSession = Depends(get_db),
+    cache: Cache = Depends(get_cache),
+    config: Config = Depends(get_config),
+    single_flight: SingleFlight = Depends(get_single_flight),
     username_or_id: str,
-) -> PublicUserSchema:
+    if_none_match: str | None = Header(None),
+) -> Response:
     """Get user info.
 
-    Used to get the info of a user.
+    Used to get the info of a user. Responses have the `ETag` header, and
+    requests with the `If-None-Match` header matching it are answered with
+    `304 Not Modified`. Users are cached, and concurrent requests of the
+    same user share one query.
 
     Raises:
     - UserNotFoundException: If the user is not found.
@@ -28,22 +58,52 @@ async def get_user_info(
     Returns:
     - PublicUserSchema: Info of the user.
     """
+    key: dict[str, Any]
     if username_or_id[0].isdecimal():
-        user = await UserModel.get_by_key(db, UserModel.id, int(username_or_id))
+        key = {"id": int(username_or_id)}
+        cache_key = UserModel.cache_key(username_or_id)
     else:
-        user = await UserModel.get_by_key(db, UserModel.username, username_or_id)
-    if user is None:
-        raise UserNotFoundException()
-    return user.to_public()
+        key = {"username": username_or_id}
+        cache_key = UserModel.cache_key(f"name:{username_or_id}")
+    cached = await get_entity(cache, cache_key)
+    if cached is not None:
+        return conditional_response(*cached, if_none_match)
+
+    if if_none_match is not None:
+        etag = await UserModel.get_etag(db, **key)
+        if etag is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    async def load() -> tuple[str, bytes]:
+        # The load may outlive this request, so it has its own session
+        async with AsyncSession(db.bind, expire_on_commit=False) as flight_db:
+            user = await UserModel.get_by_keys(flight_db, **key)
+            if user is None:
+                raise UserNotFoundException()
+            body = dump(user.to_public())
+            # Entries by the ID and by the username are invalidated together
+            await set_current_entity(
+                cache,
+                cache_key,
+                user.etag,
+                body,
+                partial(UserModel.get_etag, flight_db, id=user.id),
+                config.CACHE_TTL,
+                [UserModel.cache_key(user.id)],
+            )
+        return user.etag, body
+
+    return conditional_response(*await single_flight.do(cache_key, load), None)
 
 
 @router.get("/{username}/videos", response_model=list[VideoSchema])
+@query_budget(2)
 async def get_user_videos(
     *,
     db: AsyncSession = Depends(get_db),
     username: str = Path(min_length=3, max_length=16, regex=r"^[a-zA-Z0-9_]+$"),
     page: int = 0,
-) -> list[VideoSchema]:
+) -> Response:
     """Get user videos.
 
     Used to get the videos of a user.
@@ -54,22 +114,21 @@ async def get_user_videos(
     Returns:
     - list[VideoSchema]: List of videos.
     """
-    user = await UserModel.get_by_key(db, UserModel.username, username)
-    if user is None:
-        raise UserNotFoundException()
-    videos = await VideoModel.get_list_by_keys(
-        db, limit=10, offset=10 * page, user_id=user.id, is_deleted=False, is_confirmed=True
+    user_id = await get_user_id(db, username)
+    videos = await VideoModel.get_rows_by_keys(
+        db, VideoSchema, limit=10, offset=10 * page, user_id=user_id, is_deleted=False, is_confirmed=True
     )
-    return [VideoSchema.from_orm(video) for video in videos]
+    return list_response(VideoSchema, videos)
 
 
 @router.get("/{username}/collections", response_model=list[CollectionSchema])
+@query_budget(2)
 async def get_user_collections(
     *,
     db: AsyncSession = Depends(get_db),
     username: str = Path(min_length=3, max_length=16, regex=r"^[a-zA-Z0-9_]+$"),
     page: int = 0,
-) -> list[CollectionSchema]:
+) -> Response:
     """Get user collections.
 
     Used to get the collections of a user.
@@ -80,8 +139,8 @@ async def get_user_collections(
     Returns:
     - list[CollectionSchema]: List of collections.
     """
-    user = await UserModel.get_by_key(db, UserModel.username, username)
-    if user is None:
-        raise UserNotFoundException()
-    collections = await CollectionModel.get_list_by_keys(db, limit=10, offset=10 * page, user_id=user.id)
-    return [CollectionSchema.from_orm(collection) for collection in collections]
+    user_id = await get_user_id(db, username)
+    collections = await CollectionModel.get_rows_by_keys(
+        db, CollectionSchema, limit=10, offset=10 * page, user_id=user_id
+    )
+    return list_response(CollectionSchema, collections)
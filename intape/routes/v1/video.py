@@ -1,26 +1,39 @@
 """Video endpoint."""
-from asyncipfscluster import IPFSClient
-from fastapi import APIRouter, Body, Depends, Request
+from datetime import datetime
+from functools import partial
+
+from fastapi import APIRouter, Body, Depends, Header, Request, Response
+from pytz import UTC
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from intape.core.cache import Cache, get_entity, set_current_entity
+from intape.core.etag import conditional_response, etag_matches, not_modified
 from intape.core.exceptions import (
     FileNotFoundException,
     InsufficientPermissionsException,
     UnsupportedMimeTypeException,
     VideoNotFoundException,
 )
-from intape.dependencies import get_current_user, get_db, get_ipfs
+from intape.core.query_stats import query_budget
+from intape.core.serialization import dump, list_response
+from intape.core.singleflight import SingleFlight
+from intape.dependencies import (
+    get_cache,
+    get_current_user,
+    get_db,
+    get_single_flight,
+)
 from intape.models import FileModel, UserModel, VideoModel
 from intape.schemas.video import CreateVideoSchema, VideoSchema
+from intape.worker import PIN_METADATA, VERIFY_VIDEO, enqueue
 
 router = APIRouter(tags=["video"], prefix="/video")
 
 
 @router.get("/", response_model=list[VideoSchema])
-async def get_videos(
-    request: Request, _user: UserModel = Depends(get_current_user), offset: int = 0
-) -> list[VideoSchema]:
+@query_budget(3)
+async def get_videos(request: Request, _user: UserModel = Depends(get_current_user), offset: int = 0) -> Response:
     """Get videos.
 
     Get videos in local timeline.
@@ -29,18 +42,17 @@ async def get_videos(
     - list[VideoSchema]: List of videos. Limited to 10 videos.
     """
     db = request.state.db
-    query = (
-        select(VideoModel).filter_by(is_deleted=False).order_by(VideoModel.created_at.desc()).offset(offset).limit(10)
+    videos = await VideoModel.get_rows_by_keys(
+        db, VideoSchema, limit=10, offset=offset, order_by=VideoModel.created_at.desc(), is_deleted=False
     )
-    videos: list[VideoModel] = (await db.execute(query)).scalars().all()
-    return [VideoSchema.from_orm(video) for video in videos]
+    return list_response(VideoSchema, videos)
 
 
 @router.post("/", response_model=VideoSchema)
+@query_budget(6)
 async def create_video(
     *,
     db: AsyncSession = Depends(get_db),
-    ipfs: IPFSClient = Depends(get_ipfs),
     user: UserModel = Depends(get_current_user),
     video: CreateVideoSchema,
 ) -> VideoSchema:
@@ -65,7 +77,8 @@ async def create_video(
 
     # Create video
     db_video = VideoModel(**video.dict(), user_id=user.id)
-    db_video.metadata_cid = await db_video.get_metadata_cid(db, ipfs)
+    # The metadata is uploaded by the job, its CID is known beforehand
+    db_video.metadata_cid = db_video.get_metadata_cid()
 
     # Save file
     file.remove_at = None
@@ -73,15 +86,12 @@ async def create_video(
     db.add(db_video)
     db.add(file)
 
-    await db.commit()
+    await db.flush()
+    enqueue(db, PIN_METADATA, {"video_id": db_video.id})
 
-    # Get video from database.
-    # SA for some reason doesn't return the video correctly and
-    # raises greenlet error with the user relation.
-    db_video: VideoModel | None = await VideoModel.get(db, db_video.id)
-    if not db_video:
-        raise VideoNotFoundException(detail="Video was not created.")
+    await db.commit()
 
+    # `created_at` is returned by the INSERT, so the video isn't selected again
     return VideoSchema.from_orm(db_video)
 
 
@@ -90,6 +100,7 @@ async def set_video_tx(
     *,
     db: AsyncSession = Depends(get_db),
     user: UserModel = Depends(get_current_user),
+    cache: Cache = Depends(get_cache),
     video_id: int,
     tx_hash: str = Body(embed=True),
 ) -> bool:
@@ -115,18 +126,35 @@ async def set_video_tx(
     if db_video.tx_hash:
         return False
 
-    # Set tx hash
+    # Set tx hash and verify it in the background
     db_video.tx_hash = tx_hash
+    db_video.verify_status = VideoModel.VERIFY_PENDING
+    db_video.verify_attempts = 0
+    db_video.next_check_at = datetime.now(tz=UTC)
+    enqueue(db, VERIFY_VIDEO, {"video_id": db_video.id}, max_attempts=10)
     await db_video.save(db)
+    # The version is changed, so cached entity tag is stale
+    await cache.invalidate_tags(VideoModel.cache_key(video_id))
 
     return True
 
 
 @router.get("/{video_id}", response_model=VideoSchema)
-async def get_video(*, request: Request, video_id: int) -> VideoSchema:
+@query_budget(3)
+async def get_video(
+    *,
+    request: Request,
+    cache: Cache = Depends(get_cache),
+    single_flight: SingleFlight = Depends(get_single_flight),
+    video_id: int,
+    if_none_match: str | None = Header(None),
+) -> Response:
     """Get video.
 
-    Get a video by ID.
+    Get a video by ID. Responses have the `ETag` header, and requests with
+    the `If-None-Match` header matching it are answered with
+    `304 Not Modified`. Videos are cached, and concurrent requests of the
+    same video share one query.
 
     Raises:
     - VideoNotFoundException: If the video is not found or is deleted.
@@ -134,18 +162,51 @@ async def get_video(*, request: Request, video_id: int) -> VideoSchema:
     Returns:
     - VideoSchema: Video.
     """
+    key = VideoModel.cache_key(video_id)
+    cached = await get_entity(cache, key)
+    if cached is not None:
+        return conditional_response(*cached, if_none_match)
+
     db = request.state.db
-    query = select(VideoModel).filter_by(id=video_id)
-    video: VideoModel | None = (await db.execute(query)).scalars().first()
-    if not video:
-        raise VideoNotFoundException(detail="Video not found.")
-    if video.is_deleted:
-        raise VideoNotFoundException(detail="Video is deleted.")
-    return VideoSchema.from_orm(video)
+    if if_none_match is not None:
+        # Deleting the video changes its version, so the tag of a deleted
+        # video never matches
+        etag = await VideoModel.get_etag(db, id=video_id)
+        if etag is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    async def load() -> tuple[str, bytes]:
+        # The load may outlive this request, so it has its own session
+        async with AsyncSession(db.bind, expire_on_commit=False) as flight_db:
+            query = select(VideoModel).filter_by(id=video_id)
+            video: VideoModel | None = (await flight_db.execute(query)).scalars().first()
+            if not video:
+                raise VideoNotFoundException(detail="Video not found.")
+            if video.is_deleted:
+                raise VideoNotFoundException(detail="Video is deleted.")
+            body = dump(VideoSchema.from_orm(video))
+            await set_current_entity(
+                cache,
+                key,
+                video.etag,
+                body,
+                partial(VideoModel.get_etag, flight_db, id=video_id),
+                request.state.config.CACHE_TTL,
+                [key],
+            )
+        return video.etag, body
+
+    return conditional_response(*await single_flight.do(key, load), None)
 
 
 @router.delete("/{video_id}", response_model=bool)
-async def hide_video(*, request: Request, user: UserModel = Depends(get_current_user), video_id: int) -> bool:
+async def hide_video(
+    *,
+    request: Request,
+    user: UserModel = Depends(get_current_user),
+    cache: Cache = Depends(get_cache),
+    video_id: int,
+) -> bool:
     """Hide video.
 
     Hide a video by ID. Video can't be deleted, only hidden (because of the IPFS & blockchain).
@@ -169,4 +230,5 @@ async def hide_video(*, request: Request, user: UserModel = Depends(get_current_
     video.is_deleted = True
     db.add(video)
     await db.commit()
+    await cache.invalidate_tags(VideoModel.cache_key(video_id))
     return True
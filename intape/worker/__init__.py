@@ -0,0 +1,26 @@
+"""Background worker and jobs queue."""
+from .queue import (
+    EXPIRE_FILE,
+    JOBS_CHANNEL,
+    PIN_METADATA,
+    VERIFY_VIDEO,
+    ack,
+    claim,
+    enqueue,
+    retry,
+)
+from .resources import WorkerResources
+from .worker import Worker
+
+__all__ = [
+    "Worker",
+    "WorkerResources",
+    "enqueue",
+    "claim",
+    "ack",
+    "retry",
+    "VERIFY_VIDEO",
+    "EXPIRE_FILE",
+    "PIN_METADATA",
+    "JOBS_CHANNEL",
+]
@@ -0,0 +1,148 @@
+"""Durable jobs queue stored in the `jobs` table.
+
+Jobs are enqueued in the same transaction as the change that needs them, so a
+job exists if and only if the change was committed. Workers claim due jobs
+with `FOR UPDATE SKIP LOCKED`, and then either `ack` them, or `retry` them with
+exponential backoff. Jobs that failed `max_attempts` times are moved to the
+dead letter state and kept for inspection.
+
+Every inserted job sends `NOTIFY` on `JOBS_CHANNEL` with the job kind as the
+payload. Postgres delivers it when the transaction commits, so listeners are
+never woken up for jobs that aren't visible yet.
+"""
+from datetime import datetime, timedelta
+from logging import getLogger
+from random import uniform
+from typing import Any
+
+from pytz import UTC
+from sqlalchemy import event, func, or_, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapper
+
+from intape.models import JobModel
+
+log = getLogger(__name__)
+
+VERIFY_VIDEO = "verify_video"
+EXPIRE_FILE = "expire_file"
+PIN_METADATA = "pin_metadata"
+
+JOBS_CHANNEL = "intape_jobs"
+
+
+def _notify(_mapper: Mapper, connection: Connection, job: JobModel) -> None:
+    connection.execute(select(func.pg_notify(JOBS_CHANNEL, job.kind)))
+
+
+event.listen(JobModel, "after_insert", _notify)
+
+
+def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: dict[str, Any] | None = None,
+    *,
+    run_at: datetime | None = None,
+    max_attempts: int = 5,
+) -> JobModel:
+    """Add job to the session.
+
+    The job is inserted when the session is committed by the caller.
+
+    Args:
+        db (AsyncSession): Database session.
+        kind (str): Job kind, e.g. `VERIFY_VIDEO`.
+        payload (dict | None): JSON-serializable job arguments.
+        run_at (datetime | None): Don't run the job before this time. Defaults to now.
+        max_attempts (int): Number of attempts before the job is moved to the dead letter state.
+
+    Returns:
+        JobModel: Pending job.
+    """
+    job = JobModel(
+        kind=kind,
+        payload=payload or {},
+        status=JobModel.PENDING,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_at=run_at or datetime.now(tz=UTC),
+    )
+    db.add(job)
+    return job
+
+
+async def claim(db: AsyncSession, limit: int = 1, lease: float = 5 * 60) -> list[JobModel]:
+    """Claim due jobs.
+
+    Jobs of a worker that died are claimed again after their lease expires,
+    unless they have no attempts left. Such jobs are moved to the dead letter
+    state instead, so that a job which crashes or hangs the worker is not
+    retried forever.
+
+    Args:
+        db (AsyncSession): Database session.
+        limit (int): Maximum number of jobs.
+        lease (float): Time in seconds for which the jobs are reserved for the caller.
+
+    Returns:
+        list[JobModel]: Claimed jobs.
+    """
+    now = datetime.now(tz=UTC)
+    query = (
+        select(JobModel)
+        .where(
+            or_(
+                (JobModel.status == JobModel.PENDING) & (JobModel.run_at <= now),
+                (JobModel.status == JobModel.RUNNING) & (JobModel.locked_until < now),
+            )
+        )
+        .order_by(JobModel.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    jobs: list[JobModel] = (await db.execute(query)).scalars().all()
+    claimed = []
+    for job in jobs:
+        if job.status == JobModel.RUNNING and job.attempts >= job.max_attempts:
+            job.status = JobModel.DEAD
+            job.locked_until = None
+            job.last_error = "Lease expired"
+            log.error("Job %s#%s lease expired after %s attempts, job is dead", job.kind, job.id, job.attempts)
+            continue
+        job.status = JobModel.RUNNING
+        job.attempts += 1
+        job.locked_until = now + timedelta(seconds=lease)
+        claimed.append(job)
+    await db.commit()
+    return claimed
+
+
+async def ack(db: AsyncSession, job: JobModel) -> None:
+    """Remove successfully processed job."""
+    await db.delete(job)
+    await db.commit()
+
+
+def backoff(attempts: int, base: float = 10.0, cap: float = 60 * 60) -> float:
+    """Return delay in seconds before the next attempt.
+
+    Full jitter is applied, so that retries of jobs that failed together are
+    spread over time.
+    """
+    return uniform(0, min(cap, base * 2 ** max(attempts - 1, 0)))
+
+
+async def retry(db: AsyncSession, job: JobModel, error: str) -> None:
+    """Schedule failed job for another attempt or move it to the dead letter state."""
+    job.last_error = error
+    job.locked_until = None
+    if job.attempts >= job.max_attempts:
+        job.status = JobModel.DEAD
+        log.error("Job %s#%s failed %s times and is dead: %s", job.kind, job.id, job.attempts, error)
+    else:
+        job.status = JobModel.PENDING
+        job.run_at = datetime.now(tz=UTC) + timedelta(seconds=backoff(job.attempts))
+        log.warning("Job %s#%s failed, retrying at %s: %s", job.kind, job.id, job.run_at, error)
+    await db.commit()
@@ -0,0 +1,101 @@
+"""Long-lived clients shared by worker tasks."""
+from contextlib import AsyncExitStack
+from logging import getLogger
+from types import TracebackType
+from typing import Type
+
+from asyncipfscluster import IPFSClient
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+from sqlalchemy.orm import sessionmaker
+
+from intape.core.config import Config
+from intape.core.query_stats import instrument_engine
+from intape.core.rpc import EthClient, RateLimiter, TransactionCache
+from intape.dependencies.ipfs import get_ipfs_instance_deprecated
+
+log = getLogger(__name__)
+
+
+class WorkerResources:
+    """Database engine, IPFS and Ethereum clients of the worker process.
+
+    They are created once on enter and closed on exit, and tasks only borrow
+    them. Database connections are pooled and checked with a ping before
+    they are handed out, so connections dropped by Postgres or a proxy are
+    replaced transparently. HTTP clients keep their connections alive between
+    requests, and `EthClient` fails over between RPC endpoints by itself.
+
+    Examples:
+        >>> async with WorkerResources(config) as resources:
+        >>>     async with resources.session() as db:
+        >>>         ...
+    """
+
+    engine: AsyncEngine
+    ipfs: IPFSClient
+    eth: EthClient
+
+    def __init__(
+        self,
+        config: Config,
+        tx_cache: TransactionCache | None = None,
+        limiter: RateLimiter | None = None,
+        pool_size: int = 5,
+    ) -> None:
+        """Initialize resources.
+
+        Args:
+            config (Config): Application configuration.
+            tx_cache (TransactionCache | None): Cache of mined transactions.
+            limiter (RateLimiter | None): RPC rate limiter.
+            pool_size (int): Number of database connections kept open.
+        """
+        self.config = config
+        self.tx_cache = tx_cache
+        self.limiter = limiter
+        self.pool_size = pool_size
+        self._stack = AsyncExitStack()
+
+    async def __aenter__(self) -> "WorkerResources":
+        """Create clients."""
+        self.engine = create_async_engine(
+            self.config.DATABASE_URL,
+            future=True,
+            pool_size=self.pool_size,
+            pool_pre_ping=True,
+            pool_recycle=30 * 60,
+        )
+        instrument_engine(self.engine)
+        self._stack.push_async_callback(self.engine.dispose)
+        self._sessionmaker = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.ipfs = await self._stack.enter_async_context(get_ipfs_instance_deprecated(self.config))
+        self.eth = await self._stack.enter_async_context(
+            EthClient(
+                self.config.RPC_URLS,
+                timeout=self.config.RPC_TIMEOUT,
+                retries=self.config.RPC_RETRIES,
+                cache=self.tx_cache,
+                limiter=self.limiter,
+            )
+        )
+        log.debug("Worker resources created")
+        return self
+
+    async def __aexit__(
+        self, exc_type: Type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        """Close clients."""
+        await self._stack.aclose()
+        log.debug("Worker resources closed")
+
+    def session(self) -> AsyncSession:
+        """Create database session.
+
+        Use it as an async context manager, so that the session is closed and
+        its connection is returned to the pool.
+        """
+        return self._sessionmaker()
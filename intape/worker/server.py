@@ -0,0 +1,78 @@
+"""Worker HTTP server with metrics and health check."""
+from time import time
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import web
+
+from intape.core.metrics import CONTENT_TYPE, REGISTRY
+from intape.core.profiling import (
+    ProfilerBusyException,
+    check_token,
+    sample_stacks,
+)
+
+if TYPE_CHECKING:
+    from .worker import Worker
+
+
+def task_health(worker: "Worker") -> tuple[bool, dict[str, dict[str, Any]]]:
+    """Return health of the scheduled tasks.
+
+    A task is unhealthy if it didn't finish successfully for three of its
+    periods (plus its timeout), counting from the worker start.
+    """
+    now = time()
+    healthy = True
+    tasks = {}
+    for name, job in worker.scheduler.jobs.items():
+        since = job.last_success if job.last_success is not None else worker.started_at
+        ok = now - since < 3 * job.every + (job.timeout or 0)
+        healthy = healthy and ok
+        tasks[name] = {
+            "ok": ok,
+            "running": job.running,
+            "last_success": job.last_success,
+            "last_failure": job.last_failure,
+            "skipped": job.skipped,
+        }
+    return healthy, tasks
+
+
+def create_app(worker: "Worker") -> web.Application:
+    """Create worker HTTP application.
+
+    Routes:
+    - `/metrics`: Metrics in Prometheus text format.
+    - `/healthz`: Health of the scheduled tasks, 503 if any task is unhealthy.
+    - `/debug/profile`: Collapsed stacks sampled for `seconds` (10 by default) every
+      `interval` seconds (0.005 by default). Requires the profiling token in the
+      `X-Profiling-Token` header. Added only when the profiling token is configured.
+    """
+
+    async def metrics(_: web.Request) -> web.Response:
+        return web.Response(body=REGISTRY.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    async def healthz(_: web.Request) -> web.Response:
+        healthy, tasks = task_health(worker)
+        return web.json_response({"ok": healthy, "tasks": tasks}, status=200 if healthy else 503)
+
+    async def profile(request: web.Request) -> web.Response:
+        if not check_token(worker.config.PROFILING_TOKEN, request.headers.get("X-Profiling-Token")):
+            return web.Response(text="Invalid profiling token", status=403)
+        try:
+            seconds = float(request.query.get("seconds", 10))
+            interval = float(request.query.get("interval", 0.005))
+        except ValueError:
+            return web.Response(text="Invalid seconds or interval", status=400)
+        try:
+            stacks = await sample_stacks(seconds, interval)
+        except ProfilerBusyException:
+            return web.Response(text="Another profile is being taken", status=409)
+        return web.Response(text=stacks, headers={"Content-Disposition": 'attachment; filename="profile.folded"'})
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    app.router.add_get("/healthz", healthz)
+    if worker.config.PROFILING_TOKEN is not None:
+        app.router.add_get("/debug/profile", profile)
+    return app
@@ -0,0 +1,525 @@
+"""Worker module."""
+import logging
+from asyncio import (
+    Event,
+    Task,
+    TimeoutError,
+    create_task,
+    gather,
+    sleep,
+    wait_for,
+)
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta
+from functools import wraps
+from random import uniform
+from time import monotonic, time
+from typing import Any, Callable, Coroutine
+
+import asyncpg
+from aiohttp import ClientError, web
+from asyncipfscluster import IPFSClient
+from pytz import UTC
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from intape.core.cache import create_cache
+from intape.core.config import Config
+from intape.core.locks import advisory_lock
+from intape.core.loop_monitor import LoopMonitor
+from intape.core.metrics import Counter, Gauge, Histogram
+from intape.core.rpc import (
+    EthClient,
+    MintNFTDecoder,
+    RateLimiter,
+    RPCException,
+    TransactionCache,
+    TransactionNotFoundException,
+    WSRPCClient,
+)
+from intape.core.rpc.erc721_abi import ERC721_ABI
+from intape.core.scheduler import Scheduler
+from intape.core.tracing import Tracer, get_tracer, set_tracer, traced
+from intape.models import FileModel, JobModel, UserModel, VideoModel
+
+from .queue import (
+    EXPIRE_FILE,
+    JOBS_CHANNEL,
+    PIN_METADATA,
+    VERIFY_VIDEO,
+    ack,
+    claim,
+    retry,
+)
+from .resources import WorkerResources
+from .server import create_app
+
+log = logging.getLogger(__name__)
+
+JOB_DURATION = Histogram(
+    "intape_job_duration_seconds",
+    "Duration of queued job runs.",
+    ["kind"],
+    buckets=(0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+JOB_RUNS = Counter("intape_job_runs_total", "Finished queued job runs.", ["kind", "result"])
+BACKLOG = Gauge("intape_worker_backlog", "Number of items waiting for the worker.", ["queue"])
+
+# Mint transactions are checked against the address of the video owner
+VIDEO_RECIPIENT = joinedload(VideoModel.user).load_only(UserModel.eth_address)
+
+
+class Worker:
+    """Worker class."""
+
+    def __init__(self, debug: bool = False) -> None:
+        """Initialize worker."""
+        self.task_counter = 0
+        self.debug = debug
+        # Number of videos claimed by a single transaction
+        self.batch_size = 50
+        # Pending transactions are checked again after 15 seconds, then after
+        # 30 seconds and so on, up to once an hour for about two days
+        self.verify_backoff_base = 15.0
+        self.verify_backoff_cap = 60 * 60
+        self.verify_max_attempts = 56
+        # Jobs are processed as soon as they are enqueued, periodic tasks only
+        # pick up what was missed
+        self.scheduler = Scheduler()
+        self.scheduler.add(self.function_proxy(self.verify_videos), every=60 * 5, timeout=5 * 60, jitter=30)
+        self.scheduler.add(
+            self.function_proxy(self.remove_old_files, exclusive=True), every=60 * 30, timeout=10 * 60, jitter=60
+        )
+        self.scheduler.add(self.function_proxy(self.collect_backlog), every=60, timeout=30, jitter=5)
+        self.handlers: dict[str, Callable[..., Coroutine[Any, Any, None]]] = {
+            VERIFY_VIDEO: self.job_verify_video,
+            EXPIRE_FILE: self.job_expire_file,
+            PIN_METADATA: self.job_pin_metadata,
+        }
+        # Consumers are woken up by `NOTIFY`, polling of the empty queue is
+        # only a fallback for lost notifications
+        self.poll_interval = 10.0
+        self.jobs_available = Event()
+        self.job_timeout = 5 * 60
+        self.contract_decoder = MintNFTDecoder(ERC721_ABI)  # type: ignore
+        self.config = Config.from_env()
+        # Shared between runs, so that mined transactions are fetched only once
+        # and the provider quota is respected by all tasks together
+        self.tx_cache = TransactionCache(self.config.RPC_CACHE_SIZE, path=self.config.RPC_CACHE_FILE)
+        self.rpc_limiter = RateLimiter(self.config.RPC_RATE_LIMIT, max_concurrency=self.config.RPC_MAX_CONCURRENCY)
+        self.rpc_limiter.export_metrics()
+        # Cached responses of the videos are invalidated when their verification
+        # changes, which reaches the API only with a shared backend like Redis
+        self.cache = create_cache(self.config.CACHE_URL)
+        # Every consumer and periodic task may hold a connection at once
+        self.resources = WorkerResources(
+            self.config,
+            self.tx_cache,
+            self.rpc_limiter,
+            pool_size=self.config.WORKER_CONCURRENCY + len(self.scheduler.jobs),
+        )
+        self.tracer = Tracer.from_config(self.config)
+        self.loop_monitor = LoopMonitor(slow_threshold=self.config.LOOP_SLOW_THRESHOLD)
+        set_tracer(self.tracer)
+        self.started_at = time()
+        log.debug("Worker initialized")
+
+    async def run(self) -> None:
+        """Run worker."""
+        try:
+            async with self.resources:
+                await self.run_tasks()
+        finally:
+            await self.cache.close()
+            await self.tracer.close()
+
+    async def run_tasks(self) -> None:
+        """Run scheduled tasks and jobs consumers until stopped."""
+        log.info("Worker started scheduled tasks.")
+        self.started_at = time()
+        if self.debug:
+            log.info("Debug mode enabled. Starting all tasks...")
+            await self.scheduler.run_once()
+            return
+
+        runner = None
+        if self.config.WORKER_HTTP_PORT is not None:
+            runner = web.AppRunner(create_app(self), access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, port=self.config.WORKER_HTTP_PORT).start()
+            log.info("Metrics and health check are served on port %s", self.config.WORKER_HTTP_PORT)
+
+        await self.loop_monitor.start()
+        tasks: list[Task[None]] = [create_task(self.consume(i)) for i in range(self.config.WORKER_CONCURRENCY)]
+        tasks.append(create_task(self.listen()))
+        if self.config.RPC_WS_URL is not None:
+            tasks.append(create_task(self.watch_chain(self.config.RPC_WS_URL)))
+        try:
+            await self.scheduler.run()
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Cancelled tasks may still roll back and close their sessions, which
+            # must happen before the resources are closed
+            await gather(*tasks, return_exceptions=True)
+            await self.loop_monitor.stop()
+            if runner is not None:
+                await runner.cleanup()
+        log.info("Worker stopped.")
+
+    def trigger(self, name: str) -> None:
+        """Run the task with given name as soon as possible."""
+        self.scheduler.trigger(name)
+
+    async def watch_chain(self, url: str) -> None:
+        """Trigger videos verification when the NFT contract emits logs.
+
+        Keeps a WebSocket subscription to the contract logs, so that mints are
+        verified right after they are included in a block. Every block
+        (`newHeads`) would wake the worker far more often than needed.
+        The periodic run stays as a fallback, e.g. when the connection is lost.
+        """
+        delay = 1
+        while True:
+            try:
+                async with WSRPCClient(url, timeout=self.config.RPC_TIMEOUT) as ws:
+                    subscription = await ws.subscribe("logs", {"address": self.config.CONTRACT_ADDRESS})
+                    log.info("Subscribed to contract logs on %s", url)
+                    delay = 1
+                    async for _ in subscription:
+                        self.trigger("verify_videos")
+            except (RPCException, ClientError, OSError, TimeoutError) as e:
+                log.warning("Contract logs subscription failed: %r. Reconnecting in %s seconds...", e, delay)
+            await sleep(delay)
+            delay = min(delay * 2, 60)
+
+    async def listen(self) -> None:
+        """Wake up jobs consumers on `NOTIFY` from the API.
+
+        Holds a dedicated connection with `LISTEN`, which is checked
+        periodically and reopened when lost.
+        """
+        dsn = make_url(self.config.DATABASE_URL).set(drivername="postgresql")
+        delay = 1
+        while True:
+            try:
+                conn = await asyncpg.connect(dsn.render_as_string(hide_password=False))
+                try:
+                    await conn.add_listener(JOBS_CHANNEL, self.on_notify)
+                    log.info("Listening for %s notifications", JOBS_CHANNEL)
+                    delay = 1
+                    # Jobs enqueued while there was no listener
+                    self.jobs_available.set()
+                    while True:
+                        await sleep(30)
+                        await conn.execute("SELECT 1", timeout=10)
+                finally:
+                    await conn.close(timeout=5)
+            except (asyncpg.PostgresError, OSError, TimeoutError) as e:
+                log.warning("Jobs listener failed: %r. Reconnecting in %s seconds...", e, delay)
+            await sleep(delay)
+            delay = min(delay * 2, 60)
+
+    def on_notify(self, _conn: Any, _pid: int, _channel: str, kind: str) -> None:
+        """Handle notification about new job."""
+        log.debug("New %s job", kind)
+        self.jobs_available.set()
+
+    async def consume(self, consumer_id: int) -> None:
+        """Process jobs from the queue until cancelled.
+
+        Jobs that were interrupted by cancellation are claimed again after
+        their lease expires.
+        """
+        log.info("Jobs consumer #%s started.", consumer_id)
+        while True:
+            try:
+                self.jobs_available.clear()
+                async with self.resources.session() as db:
+                    jobs = await claim(db, lease=self.job_timeout)
+                    for job in jobs:
+                        await self.process_job(db, self.resources.ipfs, self.resources.eth, job)
+                if not jobs:
+                    try:
+                        await wait_for(self.jobs_available.wait(), self.poll_interval)
+                    except TimeoutError:
+                        pass
+            except Exception as e:
+                log.error("Error in jobs consumer #%s", consumer_id)
+                log.exception(e)
+                await sleep(self.poll_interval)
+
+    async def process_job(self, db: AsyncSession, ipfs: IPFSClient, eth: EthClient, job: JobModel) -> None:
+        """Run handler of the claimed job, and ack or retry it."""
+        log.debug("Running job %s#%s...", job.kind, job.id)
+        start_time = monotonic()
+        try:
+            handler = self.handlers.get(job.kind)
+            if handler is None:
+                raise ValueError(f"Unknown job kind {job.kind}")
+            with get_tracer().trace(f"job.{job.kind}", job_id=job.id, attempt=job.attempts):
+                await wait_for(handler(db, ipfs, eth, **job.payload), self.job_timeout)
+        except Exception as e:
+            JOB_DURATION.labels(job.kind).observe(monotonic() - start_time)
+            JOB_RUNS.labels(job.kind, "failure").inc()
+            await db.rollback()
+            await db.refresh(job)
+            await retry(db, job, repr(e))
+        else:
+            JOB_DURATION.labels(job.kind).observe(monotonic() - start_time)
+            JOB_RUNS.labels(job.kind, "success").inc()
+            await ack(db, job)
+
+    def function_proxy(
+        self,
+        func: Callable[..., Coroutine[Any, Any, None]],
+        *args: list[Any],
+        exclusive: bool = False,
+        **kwargs: dict[str, Any],
+    ) -> Callable[[], Coroutine[Any, Any, None]]:
+        """Proxy function.
+
+        Pass to it essential dependencies. Errors are reported by the scheduler.
+
+        Exclusive functions are run by only one worker process at a time,
+        other processes skip the run while the advisory lock is held.
+
+        Essential dependencies are:
+        - Database session (AsyncSession, first positional argument)
+        - IPFS client (IPFSClient, second positional argument)
+        - Ethereum client (EthClient, third positional argument)
+
+        Args:
+            func (Callable): Function to proxy.
+            *args: Arguments to pass to the function.
+            exclusive (bool): Whether to hold the advisory lock while the function is running.
+            **kwargs: Keyword arguments to pass to the function.
+        """
+
+        @wraps(func)
+        async def function_proxy_inner() -> None:
+            task_id = self.task_counter
+            self.task_counter += 1
+            try:
+                async with AsyncExitStack() as stack:
+                    if exclusive and not await stack.enter_async_context(
+                        advisory_lock(self.resources.engine, func.__name__)
+                    ):
+                        log.debug("Task %s#%s is running in another worker, skipping", func.__name__, task_id)
+                        return
+                    db = await stack.enter_async_context(self.resources.session())
+                    log.info("Running task %s#%s...", func.__name__, task_id)
+                    with get_tracer().trace(f"task.{func.__name__}", task_id=task_id):
+                        await func(db, self.resources.ipfs, self.resources.eth, *args, **kwargs)
+            finally:
+                self.tx_cache.save()
+
+        return function_proxy_inner
+
+    async def collect_backlog(self, db: AsyncSession, _ipfs: IPFSClient, _eth: EthClient) -> None:
+        """Update backlog size metrics."""
+        queries = {
+            "unverified_videos": select(func.count())
+            .select_from(VideoModel)
+            .where(VideoModel.verify_status == VideoModel.VERIFY_PENDING)
+            .where(VideoModel.next_check_at != None),
+            "files_pending_removal": select(func.count()).select_from(FileModel).where(FileModel.remove_at != None),
+            "jobs_pending": select(func.count()).select_from(JobModel).where(JobModel.status == JobModel.PENDING),
+            "jobs_dead": select(func.count()).select_from(JobModel).where(JobModel.status == JobModel.DEAD),
+        }
+        for name, query in queries.items():
+            BACKLOG.labels(name).set(await db.scalar(query))
+
+    async def remove_old_files(self, db: AsyncSession, ipfs: IPFSClient, _eth: EthClient) -> None:
+        """Remove old files."""
+        now = datetime.now(tz=UTC)
+        query = select(FileModel).where(FileModel.remove_at != None).where(FileModel.remove_at < now)
+        files: list[FileModel] = (await db.execute(query)).scalars().all()
+
+        # Removed files counter
+        i = 0
+
+        for file in files:
+            # Show mypy that file.remove_at is not None
+            if file.remove_at is None:
+                continue
+
+            if file.remove_at.replace(tzinfo=UTC) < now:
+                log.debug("Removing file %s (%s)...", file.cid, file.mime_type)
+                await file.remove_all(db, ipfs)
+                i += 1
+
+        await db.commit()
+
+        log.info("Removed %s files of total %s scheduled for removal files.", i, len(files))
+
+    async def verify_videos(self, db: AsyncSession, _ipfs: IPFSClient, eth: EthClient) -> None:
+        """Verify videos.
+
+        Verify new videos in blockchain.
+
+        Only videos that are due for a check are selected. Videos are claimed
+        in batches with `FOR UPDATE SKIP LOCKED`, so that several workers split
+        the backlog instead of checking the same rows.
+        """
+        # Verified and total videos counters
+        i = 0
+        total = 0
+        seen: set[int] = set()
+
+        while True:
+            query = (
+                select(VideoModel)
+                .where(VideoModel.verify_status == VideoModel.VERIFY_PENDING)
+                .where(VideoModel.next_check_at <= datetime.now(tz=UTC))
+                .order_by(VideoModel.next_check_at)
+                .limit(self.batch_size)
+                .with_for_update(of=VideoModel, skip_locked=True)
+                .options(VIDEO_RECIPIENT)
+            )
+            videos: list[VideoModel] = (await db.execute(query)).scalars().all()
+            # Every checked video is rescheduled, so seen videos mean that the
+            # rest of the due videos are claimed by other workers
+            videos = [video for video in videos if video.id not in seen]
+            if not videos:
+                break
+            seen.update(video.id for video in videos)
+            total += len(videos)
+
+            for video in videos:
+                try:
+                    if await self.verify_video(video, eth) == VideoModel.VERIFY_CONFIRMED:
+                        i += 1
+                except Exception as e:
+                    log.error("Error getting transaction %s", video.tx_hash)
+                    log.exception(e)
+                    self.schedule_check(video)
+
+            # Committing releases the row locks of the batch
+            await db.commit()
+            await self.invalidate_videos(
+                *(video.id for video in videos if video.verify_status != VideoModel.VERIFY_PENDING)
+            )
+
+        log.info("Verified %s videos of total %s.", i, total)
+
+    async def invalidate_videos(self, *video_ids: int) -> None:
+        """Delete cached responses of the videos, after their verification changed."""
+        if video_ids:
+            await self.cache.invalidate_tags(*(VideoModel.cache_key(video_id) for video_id in video_ids))
+
+    def schedule_check(self, video: VideoModel) -> None:
+        """Schedule another check of the pending video with exponential backoff.
+
+        Videos that weren't confirmed after `verify_max_attempts` checks are
+        marked as invalid.
+        """
+        video.verify_attempts += 1
+        if video.verify_attempts >= self.verify_max_attempts:
+            log.error("Video %s wasn't confirmed after %s checks", video.id, video.verify_attempts)
+            video.verify_status = VideoModel.VERIFY_INVALID
+            video.next_check_at = None
+            return
+        delay = min(self.verify_backoff_cap, self.verify_backoff_base * 2 ** (video.verify_attempts - 1))
+        video.next_check_at = datetime.now(tz=UTC) + timedelta(seconds=delay * uniform(0.9, 1.1))
+
+    async def check_mint(self, video: VideoModel, eth: EthClient) -> str:
+        """Check mint transaction of the video.
+
+        Returns:
+            str: Verify status of the video.
+        """
+        if video.tx_hash is None:
+            return VideoModel.VERIFY_INVALID
+        try:
+            tx = await eth.get_tx(video.tx_hash)
+        except TransactionNotFoundException:
+            log.debug("Transaction %s is not found", video.tx_hash)
+            return VideoModel.VERIFY_PENDING
+        if tx.is_pending:
+            log.debug("Transaction %s is not mined yet", video.tx_hash)
+            return VideoModel.VERIFY_PENDING
+        try:
+            inp = self.contract_decoder.decode_function(tx.raw_input)
+        except ValueError:
+            log.error("Transaction %s input can't be decoded", video.tx_hash)
+            return VideoModel.VERIFY_INVALID
+        if inp.name != "mintNFT":
+            log.error("Transaction %s is not mintNFT", video.tx_hash)
+            return VideoModel.VERIFY_INVALID
+        recipent, token = inp.arguments
+        if recipent[2] != video.user.eth_address:
+            log.error("Transaction %s is not for user %s", video.tx_hash, video.user.eth_address)
+            return VideoModel.VERIFY_INVALID
+        if token[2] != video.metadata_cid:
+            log.error("Transaction %s has wrong metadata CID %s", video.tx_hash, token[2])
+            return VideoModel.VERIFY_INVALID
+        return VideoModel.VERIFY_CONFIRMED
+
+    @traced("video.verify")
+    async def verify_video(self, video: VideoModel, eth: EthClient) -> str:
+        """Check mint transaction of the video and update its verification state.
+
+        The change is not committed.
+
+        Returns:
+            str: New verify status of the video.
+        """
+        log.debug("Verifying video %s...", video.id)
+        status = await self.check_mint(video, eth)
+        if status == VideoModel.VERIFY_PENDING:
+            self.schedule_check(video)
+            return video.verify_status
+        video.verify_status = status
+        video.next_check_at = None
+        if status == VideoModel.VERIFY_CONFIRMED:
+            video.is_confirmed = True
+            log.info("Verified video %s with transaction %s", video.id, video.tx_hash)
+        return status
+
+    async def job_verify_video(self, db: AsyncSession, _ipfs: IPFSClient, eth: EthClient, video_id: int) -> None:
+        """Verify video after its transaction hash was set.
+
+        The video is checked once. If the transaction is still pending, the
+        next check is scheduled on the video and left to `verify_videos`, so
+        the job is not retried. Videos claimed by `verify_videos` are skipped.
+        """
+        query = (
+            select(VideoModel)
+            .filter_by(id=video_id)
+            .with_for_update(of=VideoModel, skip_locked=True)
+            .options(VIDEO_RECIPIENT)
+        )
+        video: VideoModel | None = (await db.execute(query)).scalars().first()
+        if video is None or video.verify_status != VideoModel.VERIFY_PENDING:
+            return
+        status = await self.verify_video(video, eth)
+        await db.commit()
+        if status != VideoModel.VERIFY_PENDING:
+            await self.invalidate_videos(video.id)
+
+    async def job_expire_file(self, db: AsyncSession, ipfs: IPFSClient, _eth: EthClient, cid: str) -> None:
+        """Remove uploaded file, if it is still not used by anything."""
+        file = await FileModel.get(db, cid)
+        if file is None or file.remove_at is None:
+            return
+        if file.remove_at.replace(tzinfo=UTC) > datetime.now(tz=UTC):
+            raise ValueError(f"File {cid} is not expired yet")
+        log.debug("Removing file %s (%s)...", file.cid, file.mime_type)
+        await file.remove_all(db, ipfs)
+
+    async def job_pin_metadata(self, db: AsyncSession, ipfs: IPFSClient, _eth: EthClient, video_id: int) -> None:
+        """Make sure that video metadata is pinned in IPFS cluster.
+
+        The metadata is uploaded only here, the API computes its CID without
+        uploading it. Adding the same content again pins it, and returns the
+        same CID.
+        """
+        video = await VideoModel.get(db, video_id)
+        if video is None:
+            return
+        cid = "ipfs://" + await ipfs.add_bytes(video.get_metadata_bytes(), "application/json")
+        if cid != video.metadata_cid:
+            log.error("Video %s metadata CID %s doesn't match pinned %s", video_id, video.metadata_cid, cid)
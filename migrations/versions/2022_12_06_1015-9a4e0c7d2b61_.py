@@ -0,0 +1,38 @@
+"""Add video verification state.
+
+Revision ID: 9a4e0c7d2b61
+Revises: 3b8d52c1f0e7
+Create Date: 2022-12-06 10:15:37.902114+00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "9a4e0c7d2b61"
+down_revision = "3b8d52c1f0e7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("videos", sa.Column("verify_status", sa.String(length=16), server_default="pending", nullable=False))
+    op.add_column("videos", sa.Column("verify_attempts", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("videos", sa.Column("next_check_at", sa.DateTime(timezone=True), nullable=True))
+    op.alter_column("videos", "verify_status", server_default=None)
+    op.alter_column("videos", "verify_attempts", server_default=None)
+    op.execute("UPDATE videos SET verify_status = 'confirmed' WHERE is_confirmed")
+    op.execute("UPDATE videos SET next_check_at = now() WHERE NOT is_confirmed AND tx_hash IS NOT NULL")
+    op.create_index(
+        "ix_videos_next_check_at",
+        "videos",
+        ["next_check_at"],
+        unique=False,
+        postgresql_where=sa.text("verify_status = 'pending' AND next_check_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_videos_next_check_at", table_name="videos")
+    op.drop_column("videos", "next_check_at")
+    op.drop_column("videos", "verify_attempts")
+    op.drop_column("videos", "verify_status")
@@ -0,0 +1,25 @@
+"""Add version counters.
+
+Revision ID: 5c1e7a9b3d24
+Revises: 9a4e0c7d2b61
+Create Date: 2022-12-08 10:20:41.275093+00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "5c1e7a9b3d24"
+down_revision = "9a4e0c7d2b61"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for table in ("users", "videos", "collections"):
+        op.add_column(table, sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+        op.alter_column(table, "version", server_default=None)
+
+
+def downgrade() -> None:
+    for table in ("users", "videos", "collections"):
+        op.drop_column(table, "version")
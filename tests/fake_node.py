@@ -0,0 +1,97 @@
+"""Fake Ethereum node with WebSocket JSON-RPC interface."""
+
+from asyncio import create_task, sleep
+from typing import Any
+
+from aiohttp import WSMsgType, web
+from aiohttp.test_utils import TestServer
+
+
+class FakeNode:
+    """Fake Ethereum node.
+
+    Supports `eth_blockNumber`, `eth_subscribe` (`newHeads` and `logs`),
+    `eth_unsubscribe` and `test_sleep`, which answers after the given delay,
+    so that responses can be sent out of order.
+
+    Examples:
+        >>> async with FakeNode() as node:
+        >>>     async with WSRPCClient(node.url) as ws:
+        >>>         ...
+    """
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.block_number = 0
+        self.subscriptions: dict[str, tuple[web.WebSocketResponse, str]] = {}
+        self.sockets: list[web.WebSocketResponse] = []
+        app = web.Application()
+        app.router.add_get("/", self.handler)
+        self.server = TestServer(app)
+
+    @property
+    def url(self) -> str:
+        """WebSocket URL of the node."""
+        return str(self.server.make_url("/")).replace("http://", "ws://")
+
+    async def __aenter__(self) -> "FakeNode":
+        """Start the node."""
+        await self.server.start_server()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        """Stop the node."""
+        await self.disconnect()
+        await self.server.close()
+
+    async def disconnect(self) -> None:
+        """Close all client connections."""
+        for ws in self.sockets:
+            await ws.close()
+
+    async def new_head(self) -> None:
+        """Mine a new block and notify `newHeads` subscribers."""
+        self.block_number += 1
+        await self.notify("newHeads", {"number": hex(self.block_number)})
+
+    async def new_log(self, log: dict[str, Any]) -> None:
+        """Notify `logs` subscribers."""
+        await self.notify("logs", log)
+
+    async def notify(self, kind: str, result: Any) -> None:
+        """Send notification to subscribers of the given kind."""
+        for id, (ws, sub_kind) in list(self.subscriptions.items()):
+            if sub_kind == kind and not ws.closed:
+                await ws.send_json(
+                    {"jsonrpc": "2.0", "method": "eth_subscription", "params": {"subscription": id, "result": result}}
+                )
+
+    async def handler(self, request: web.Request) -> web.WebSocketResponse:
+        """Handle WebSocket connection."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.append(ws)
+        async for message in ws:
+            if message.type == WSMsgType.TEXT:
+                create_task(self.respond(ws, message.json()))
+        return ws
+
+    async def respond(self, ws: web.WebSocketResponse, data: dict[str, Any]) -> None:
+        """Answer a single request."""
+        method, params = data["method"], data["params"]
+        response: dict[str, Any] = {"jsonrpc": "2.0", "id": data["id"]}
+        if method == "eth_blockNumber":
+            response["result"] = hex(self.block_number)
+        elif method == "eth_subscribe" and params[0] in ("newHeads", "logs"):
+            id = hex(len(self.subscriptions) + 1)
+            self.subscriptions[id] = (ws, params[0])
+            response["result"] = id
+        elif method == "eth_unsubscribe":
+            response["result"] = self.subscriptions.pop(params[0], None) is not None
+        elif method == "test_sleep":
+            await sleep(params[0])
+            response["result"] = params[0]
+        else:
+            response["error"] = {"code": -32601, "message": "Method not found"}
+        if not ws.closed:
+            await ws.send_json(response)
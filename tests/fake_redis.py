@@ -0,0 +1,156 @@
+"""Fake Redis server."""
+from asyncio import (
+    IncompleteReadError,
+    Server,
+    StreamReader,
+    StreamWriter,
+    Task,
+    current_task,
+    gather,
+    start_server,
+)
+from time import monotonic
+from typing import Any
+
+
+class FakeRedis:
+    """Fake Redis server speaking RESP2.
+
+    Supports `AUTH`, `SELECT`, `PING`, `GET`, `MGET`, `SET` (with `PX`),
+    `DEL`, `SADD`, `SMEMBERS`, `PEXPIRE`, `PTTL` and `PERSIST`. Values of all
+    databases are kept together.
+
+    Examples:
+        >>> async with FakeRedis() as redis:
+        >>>     cache = RedisCache.from_url(redis.url)
+    """
+
+    def __init__(self, password: str | None = None) -> None:
+        """Initialize the server."""
+        self.password = password
+        self.data: dict[bytes, Any] = {}
+        self.expires: dict[bytes, float] = {}
+        self.commands: list[list[bytes]] = []
+        self.server: Server | None = None
+        self.handlers: set[Task[None]] = set()
+        self.port = 0
+
+    @property
+    def url(self) -> str:
+        """URL of the server."""
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{self.port}/1"
+
+    async def __aenter__(self) -> "FakeRedis":
+        """Start the server."""
+        self.server = await start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        """Stop the server."""
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+        for task in self.handlers:
+            task.cancel()
+        await gather(*self.handlers, return_exceptions=True)
+
+    async def handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        """Handle client connection."""
+        task = current_task()
+        assert task is not None
+        self.handlers.add(task)
+        authenticated = self.password is None
+        try:
+            while True:
+                command = await self.read_command(reader)
+                self.commands.append(command)
+                name = command[0].upper()
+                if name == b"AUTH":
+                    authenticated = command[-1].decode() == self.password
+                    reply: Any = "OK" if authenticated else Exception("WRONGPASS invalid password")
+                elif not authenticated:
+                    reply = Exception("NOAUTH Authentication required")
+                else:
+                    reply = self.execute(name, command[1:])
+                writer.write(self.encode(reply))
+                await writer.drain()
+        except (IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            self.handlers.discard(task)
+
+    @staticmethod
+    async def read_command(reader: StreamReader) -> list[bytes]:
+        """Read command sent as an array of bulk strings."""
+        count = int((await reader.readuntil(b"\r\n"))[1:-2])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readuntil(b"\r\n"))[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def encode(self, reply: Any) -> bytes:
+        """Encode reply."""
+        if isinstance(reply, Exception):
+            return f"-{reply}\r\n".encode()
+        if isinstance(reply, str):
+            return f"+{reply}\r\n".encode()
+        if isinstance(reply, int):
+            return f":{reply}\r\n".encode()
+        if isinstance(reply, (list, set)):
+            return b"*%d\r\n" % len(reply) + b"".join(self.encode(item) for item in reply)
+        if reply is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+    def get(self, key: bytes) -> Any:
+        """Get value of the key, if it is not expired."""
+        expires = self.expires.get(key)
+        if expires is not None and expires <= monotonic():
+            self.data.pop(key, None)
+            del self.expires[key]
+        return self.data.get(key)
+
+    def execute(self, name: bytes, args: list[bytes]) -> Any:
+        """Execute command."""
+        if name in (b"SELECT", b"PING"):
+            return "OK" if name == b"SELECT" else "PONG"
+        if name == b"GET":
+            return self.get(args[0])
+        if name == b"MGET":
+            return [self.get(key) for key in args]
+        if name == b"SET":
+            self.data[args[0]] = args[1]
+            self.expires.pop(args[0], None)
+            if len(args) == 4 and args[2].upper() == b"PX":
+                self.expires[args[0]] = monotonic() + int(args[3]) / 1000
+            return "OK"
+        if name == b"DEL":
+            deleted = [key for key in args if self.get(key) is not None]
+            for key in deleted:
+                del self.data[key]
+                self.expires.pop(key, None)
+            return len(deleted)
+        if name == b"SADD":
+            members = self.get(args[0]) or set()
+            added = len(set(args[1:]) - members)
+            self.data[args[0]] = members | set(args[1:])
+            return added
+        if name == b"SMEMBERS":
+            return self.get(args[0]) or set()
+        if name == b"PEXPIRE":
+            if self.get(args[0]) is None:
+                return 0
+            self.expires[args[0]] = monotonic() + int(args[1]) / 1000
+            return 1
+        if name == b"PTTL":
+            if self.get(args[0]) is None:
+                return -2
+            expires = self.expires.get(args[0])
+            return -1 if expires is None else int((expires - monotonic()) * 1000)
+        if name == b"PERSIST":
+            return 1 if self.expires.pop(args[0], None) is not None else 0
+        return Exception(f"ERR unknown command '{name.decode()}'")
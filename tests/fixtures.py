@@ -1,6 +1,8 @@
 """Fixtures for tests."""
 
+from contextlib import contextmanager
 from secrets import token_hex
+from typing import Callable, ContextManager, Iterator
 
 import pytest
 from eth_account import Account
@@ -8,6 +10,7 @@ from eth_account.messages import encode_defunct
 from fastapi.testclient import TestClient
 
 from intape import app
+from intape.core.query_stats import REQUEST_LISTENERS, QueryStats
 
 
 @pytest.fixture(scope="session")
@@ -88,3 +91,29 @@ def refresh_token(tokens: tuple[str, str]) -> str:
 def access_token(tokens: tuple[str, str]) -> str:
     """Return access token."""
     return tokens[1]
+
+
+@pytest.fixture
+def assert_queries() -> Iterator[Callable[[int], ContextManager[None]]]:
+    """Return a context manager asserting the number of SQL statements of API requests made in it.
+
+    Examples:
+        >>> with assert_queries(1):
+        >>>     client.get(f"/v1/user/{username}")
+    """
+    requests: list[tuple[str, QueryStats]] = []
+
+    def listener(route: str, stats: QueryStats) -> None:
+        requests.append((route, stats))
+
+    @contextmanager
+    def assert_queries(expected: int) -> Iterator[None]:
+        requests.clear()
+        yield
+        count = sum(stats.count for _, stats in requests)
+        details = "\n".join(f"{route}: {stats.count}\n{stats.format_slowest()}" for route, stats in requests)
+        assert count == expected, f"Expected {expected} statements, executed {count}:\n{details}"
+
+    REQUEST_LISTENERS.append(listener)
+    yield assert_queries
+    REQUEST_LISTENERS.remove(listener)
@@ -0,0 +1,22 @@
+"""Postgres fixtures for tests of database behavior."""
+from typing import AsyncIterator
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from intape.core.config import Config
+
+
+@pytest.fixture
+async def engine() -> AsyncIterator[AsyncEngine]:
+    """Return engine of the test database, skipping the test if it is not available."""
+    engine = create_async_engine(Config.from_env().DATABASE_URL)
+    try:
+        async with engine.connect():
+            pass
+    except (OSError, DBAPIError) as e:
+        await engine.dispose()
+        pytest.skip(f"Postgres is not available: {e!r}")
+    yield engine
+    await engine.dispose()
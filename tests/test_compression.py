@@ -0,0 +1,146 @@
+"""Test response compression."""
+import gzip
+from typing import Iterator
+
+import brotli
+import pytest
+from fastapi import FastAPI, Header
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from intape.core.compression import choose_encoding
+from intape.core.etag import etag_matches, not_modified
+from intape.core.middlewares import CompressionMiddleware
+
+ITEMS = [{"id": i, "description": "Highly repetitive video description"} for i in range(100)]
+BODY = JSONResponse(ITEMS).body
+ENCODED = gzip.compress(BODY)
+ETAG = '"items-1"'
+
+
+def chunks() -> Iterator[bytes]:
+    """Yield chunks of a streaming body."""
+    for i in range(100):
+        yield f"line {i}\n".encode()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    """Return client of an application with the compression middleware."""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    async def large() -> list[dict[str, object]]:
+        return ITEMS
+
+    @app.get("/small")
+    async def small() -> list[dict[str, object]]:
+        return ITEMS[:1]
+
+    @app.get("/image")
+    async def image() -> Response:
+        return Response(b"\0" * 1000, media_type="image/png")
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/etag")
+    async def etag(if_none_match: str | None = Header(None)) -> Response:
+        if etag_matches(if_none_match, ETAG):
+            return not_modified(ETAG)
+        return JSONResponse(ITEMS, headers={"ETag": ETAG})
+
+    @app.get("/encoded")
+    async def encoded() -> Response:
+        return Response(ENCODED, media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "header, encoding",
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("deflate, gzip;q=0.5", "gzip"),
+        ("gzip;q=0", None),
+        ("*", "br"),
+        ("*;q=0.1, gzip;q=0", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("GZIP;q=invalid", None),
+    ],
+)
+def test_choose_encoding(header: str, encoding: str | None):
+    """Test the supported encoding with the highest quality is chosen."""
+    assert choose_encoding(header) == encoding
+
+
+def test_large_body(client: TestClient):
+    """Test large bodies are compressed."""
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"}, stream=True)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    compressed = response.raw.read(decode_content=False)
+    assert int(response.headers["Content-Length"]) == len(compressed) < len(BODY) / 5
+    assert gzip.decompress(compressed) == BODY
+
+
+@pytest.mark.parametrize(
+    "path, headers",
+    [
+        ("/small", {"Accept-Encoding": "gzip"}),
+        ("/image", {"Accept-Encoding": "gzip"}),
+        ("/large", {"Accept-Encoding": "identity"}),
+    ],
+)
+def test_not_compressed(client: TestClient, path: str, headers: dict[str, str]):
+    """Test small bodies, compressed types and clients without compression support get raw bodies."""
+    response = client.get(path, headers=headers)
+    assert "Content-Encoding" not in response.headers
+    assert int(response.headers["Content-Length"]) == len(response.content)
+
+
+def test_streaming_body(client: TestClient):
+    """Test streaming bodies are compressed chunk by chunk."""
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert response.content == b"".join(chunks())
+
+
+def test_encoded_response(client: TestClient):
+    """Test bodies which are already encoded are not compressed again."""
+    response = client.get("/encoded", headers={"Accept-Encoding": "gzip"}, stream=True)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.raw.read(decode_content=False) == ENCODED
+
+
+def test_etag(client: TestClient):
+    """Test compressed variants have their own entity tags, and are validated with them."""
+    response = client.get("/etag", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["ETag"] == '"items-1-gzip"'
+
+    response = client.get("/etag", headers={"Accept-Encoding": "gzip", "If-None-Match": '"items-1-gzip"'})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"items-1-gzip"'
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+    response = client.get("/etag", headers={"Accept-Encoding": "identity"})
+    assert response.headers["ETag"] == ETAG
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.content == BODY
+
+    # The compressed variant doesn't validate the raw one
+    response = client.get("/etag", headers={"Accept-Encoding": "identity", "If-None-Match": '"items-1-gzip"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == ETAG
+
+
+def test_brotli(client: TestClient):
+    """Test brotli is preferred over gzip."""
+    response = client.get("/large", headers={"Accept-Encoding": "gzip, br"}, stream=True)
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.raw.read(decode_content=False)) == BODY
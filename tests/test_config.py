@@ -50,3 +50,13 @@ def test_get_env_existing(faker: Faker):
     environ[key := faker.word()] = faker.pystr()
     returned = Config._get_env(key)
     assert returned == environ[key]
+
+
+def test_rpc_urls():
+    """Test RPC_URL with several endpoints."""
+    environ["RPC_URL"], old = "http://a:8545, http://b:8545", environ["RPC_URL"]
+    try:
+        config = Config.from_env()
+    finally:
+        environ["RPC_URL"] = old
+    assert config.RPC_URLS == ("http://a:8545", "http://b:8545")
@@ -0,0 +1,105 @@
+"""Test entity tags."""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from intape.core.etag import etag_matches, make_etag, not_modified
+from intape.models import FileModel, UserModel
+
+
+@pytest.mark.parametrize(
+    "if_none_match, matches",
+    [
+        (None, False),
+        ("", False),
+        ('"users-1-2"', True),
+        ('W/"users-1-2"', True),
+        ('"users-1-1", "users-1-2"', True),
+        ("*", True),
+        ('"users-1-1"', False),
+        ("users-1-2", False),
+    ],
+)
+def test_etag_matches(if_none_match: str | None, matches: bool):
+    """Test tags in the `If-None-Match` header are compared with the weak comparison."""
+    assert etag_matches(if_none_match, make_etag("users", 1, 2)) is matches
+
+
+def test_not_modified():
+    """Test not modified response has no body."""
+    response = not_modified('"users-1-2"')
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"users-1-2"'
+    assert response.body == b""
+
+
+def test_model_etag():
+    """Test entity tag changes on every update."""
+    engine = create_engine("sqlite://")
+    UserModel.__table__.create(engine)  # type: ignore[attr-defined]
+    with Session(engine, expire_on_commit=False) as session:
+        user = UserModel(username="user", eth_address="0x" + "ab" * 20)
+        session.add(user)
+        session.commit()
+        assert user.etag == '"users-1-1"'
+        user.bio = "Bio"
+        session.commit()
+        assert user.etag == '"users-1-2"'
+
+
+def test_concurrent_updates():
+    """Test concurrent updates don't fail, and each of them increments the version."""
+    engine = create_engine("sqlite://")
+    UserModel.__table__.create(engine)  # type: ignore[attr-defined]
+    with Session(engine) as session:
+        session.add(UserModel(username="user", eth_address="0x" + "ab" * 20))
+        session.commit()
+    with Session(engine) as first, Session(engine) as second:
+        users = [session.get(UserModel, 1) for session in (first, second)]
+        users[0].bio = "First"
+        first.commit()
+        users[1].first_name = "Second"
+        second.commit()
+        assert users[1].etag == '"users-1-3"'
+
+
+def test_unversioned_columns(monkeypatch: pytest.MonkeyPatch):
+    """Test updates of only the unversioned columns don't change the entity tag."""
+    monkeypatch.setattr(UserModel, "UNVERSIONED_COLUMNS", frozenset({"bio"}))
+    engine = create_engine("sqlite://")
+    UserModel.__table__.create(engine)  # type: ignore[attr-defined]
+    with Session(engine) as session:
+        user = UserModel(username="user", eth_address="0x" + "ab" * 20)
+        session.add(user)
+        session.commit()
+        user.bio = "Bio"
+        session.commit()
+        assert user.etag == '"users-1-1"'
+        user.bio = "Other bio"
+        user.first_name = "User"
+        session.commit()
+        assert user.etag == '"users-1-2"'
+
+
+def test_model_without_version():
+    """Test models without version counter have no entity tags."""
+    with pytest.raises(TypeError, match="FileModel has no version counter"):
+        FileModel(cid="cid").etag
+
+
+async def test_get_etag_query():
+    """Test only the primary key and the version are selected for the entity tag."""
+
+    class Result:
+        def first(self) -> tuple[int, int]:
+            return (1, 3)
+
+    class DB:
+        async def execute(self, query):
+            self.sql = str(query.compile(dialect=postgresql.dialect()))
+            return Result()
+
+    db = DB()
+    assert await UserModel.get_etag(db, username="user") == '"users-1-3"'  # type: ignore[arg-type]
+    assert db.sql.startswith("SELECT users.id, users.version \nFROM users \nWHERE users.username =")
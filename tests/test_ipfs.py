@@ -0,0 +1,22 @@
+"""Test IPFS helpers."""
+import pytest
+
+from intape.core.ipfs import CHUNK_SIZE, compute_cid
+
+
+@pytest.mark.parametrize(
+    "data, cid",
+    [
+        (b"Hello from cofob!", "QmdkTR6yFkXLh96DtAgBqW2bDGsxYKDTKZSLGgHkP8niyU"),
+        (b"", "QmbFMke1KXqnYyBBWxB74N4c5SBnJMVAiMNRcGu6x1AwQH"),
+    ],
+)
+def test_compute_cid(data: bytes, cid: str):
+    """Test CIDs are the ones given by `ipfs add`."""
+    assert compute_cid(data) == cid
+
+
+def test_compute_cid_large():
+    """Test data split into many blocks is rejected."""
+    with pytest.raises(ValueError):
+        compute_cid(b"\0" * (CHUNK_SIZE + 1))
@@ -0,0 +1,79 @@
+"""Test relationship loading."""
+from typing import Any, Iterator
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Result
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, joinedload, load_only
+
+from intape.models import FileModel, UserModel
+
+USER = joinedload(FileModel.user)
+
+
+class AsyncAdapter:
+    """Awaitable `execute` of a synchronous session, like `AsyncSession.execute`.
+
+    Model getters only execute queries, so they can be tested on SQLite
+    without an async driver.
+    """
+
+    def __init__(self, session: Session) -> None:
+        """Initialize adapter."""
+        self.session = session
+
+    async def execute(self, statement: Any) -> Result:
+        """Execute statement."""
+        return self.session.execute(statement)
+
+
+@pytest.fixture
+def db() -> Iterator[Any]:
+    """Return session of in-memory database with a file of a user."""
+    engine = create_engine("sqlite://")
+    for model in (UserModel, FileModel):
+        model.__table__.create(engine)  # type: ignore[attr-defined]
+    with Session(engine) as session:
+        session.add(UserModel(id=1, username="user", eth_address="0x" + "ab" * 20, version=1))
+        session.add(FileModel(cid="cid", mime_type="video/mp4", user_id=1))
+        session.commit()
+        session.expunge_all()
+        yield AsyncAdapter(session)
+
+
+async def test_relationships_not_loaded(db: Any):
+    """Test relationships are not loaded by the getters unless asked."""
+    file = await FileModel.get(db, "cid")
+    assert file is not None
+    assert file.user_id == 1
+    with pytest.raises(InvalidRequestError, match="lazy='raise'"):
+        file.user
+
+
+async def test_getters_options(db: Any):
+    """Test all getters load relationships with the options."""
+    getters = [
+        lambda: FileModel.get(db, "cid", options=[USER]),
+        lambda: FileModel.get_by_key(db, FileModel.cid, "cid", options=[USER]),
+        lambda: FileModel.get_by_keys(db, cid="cid", options=[USER]),
+        lambda: FileModel.get_list_by_key(db, FileModel.user_id, 1, options=[USER]),
+        lambda: FileModel.get_list_by_keys(db, limit=10, user_id=1, options=[USER]),
+    ]
+    for getter in getters:
+        # Every getter loads the file anew
+        db.session.expunge_all()
+        result = await getter()
+        file = result[0] if isinstance(result, list) else result
+        assert file is not None
+        assert file.user.username == "user"
+
+
+async def test_loader_options(db: Any):
+    """Test only the columns of the options are loaded."""
+    options = [USER.load_only(UserModel.eth_address), load_only(FileModel.user_id)]
+    file = await FileModel.get(db, "cid", options=options)
+    assert file is not None
+    assert file.user.eth_address == "0x" + "ab" * 20
+    assert "mime_type" not in file.__dict__
+    assert "username" not in file.user.__dict__
@@ -0,0 +1,29 @@
+"""Test advisory locks."""
+from secrets import token_hex
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from intape.core.locks import advisory_lock, lock_key
+
+from .postgres import engine  # noqa: F401
+
+
+def test_lock_key():
+    """Test lock keys are stable signed 64-bit integers."""
+    assert lock_key("remove_old_files") == lock_key("remove_old_files")
+    assert lock_key("remove_old_files") != lock_key("verify_videos")
+    for name in ("a", "b", "verify_videos"):
+        assert -(2**63) <= lock_key(name) < 2**63
+
+
+async def test_advisory_lock(engine: AsyncEngine):  # noqa: F811
+    """Test the lock is held by one holder at a time and released on exit."""
+    name = "test_" + token_hex(4)
+    async with advisory_lock(engine, name) as first:
+        async with advisory_lock(engine, name) as second:
+            assert first
+            assert not second
+        async with advisory_lock(engine, "other_" + name) as other:
+            assert other
+    async with advisory_lock(engine, name) as again:
+        assert again
@@ -0,0 +1,87 @@
+"""Test logging pipeline."""
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from intape.core.logs import (
+    JSONFormatter,
+    LazyQueueHandler,
+    SamplingFilter,
+    parse_sampling,
+    setup_logging,
+    stop_logging,
+)
+from intape.core.tracing import Tracer
+
+
+def make_record(name: str, level: int, msg: str = "message", *args: object) -> logging.LogRecord:
+    """Create log record."""
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_sampling_filter():
+    """Test debug records are sampled by the most specific logger."""
+    sampling = SamplingFilter(parse_sampling("intape.worker=0, intape.worker.queue=1"))
+    assert not sampling.filter(make_record("intape.worker", logging.DEBUG))
+    assert not sampling.filter(make_record("intape.worker.worker", logging.DEBUG))
+    assert sampling.filter(make_record("intape.worker.queue", logging.DEBUG))
+    assert sampling.filter(make_record("intape.worker", logging.INFO))
+    assert sampling.filter(make_record("intape.workers", logging.DEBUG))
+
+
+def test_parse_sampling_error():
+    """Test malformed sampling rates are rejected."""
+    with pytest.raises(ValueError):
+        parse_sampling("intape.worker")
+
+
+def test_lazy_queue_handler():
+    """Test records are queued with merged arguments and rendered traceback."""
+    items = ["a"]
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("intape", logging.ERROR, __file__, 1, "items %s", (items,), None)
+        record.exc_info = __import__("sys").exc_info()
+    with Tracer(sample_rate=1).trace("root") as root:
+        prepared = LazyQueueHandler(None).prepare(record)  # type: ignore[arg-type]
+    items.append("b")
+    assert prepared.getMessage() == "items ['a']"
+    assert prepared.exc_info is None
+    assert prepared.exc_text is not None and "ValueError: boom" in prepared.exc_text
+    assert prepared.trace_id == f"{root.trace_id:032x}"  # type: ignore[attr-defined]
+
+
+def test_json_formatter():
+    """Test records are formatted as JSON with extra fields."""
+    record = make_record("intape.worker", logging.WARNING, "job %s failed", 1)
+    record.job_id = 1
+    data = json.loads(JSONFormatter().format(record))
+    assert data["level"] == "WARNING"
+    assert data["logger"] == "intape.worker"
+    assert data["message"] == "job 1 failed"
+    assert data["job_id"] == 1
+    assert "exception" not in data
+
+
+def test_setup_logging(tmp_path: Path):
+    """Test records are written to the log file by the listener thread."""
+    root = logging.getLogger()
+    level = root.level
+    log_file = tmp_path / "intape.log"
+    try:
+        setup_logging("DEBUG", log_file=str(log_file))
+        setup_logging("DEBUG", log_file=str(log_file), json_format=True, sampling={"test.sampled": 0})
+        assert sum(isinstance(handler, LazyQueueHandler) for handler in root.handlers) == 1
+        logging.getLogger("test.sampled").debug("dropped")
+        logging.getLogger("test.kept").info("kept %s", 1, extra={"user": "alice"})
+    finally:
+        stop_logging()
+        root.setLevel(level)
+    assert not any(isinstance(handler, LazyQueueHandler) for handler in root.handlers)
+    (line,) = log_file.read_text().splitlines()
+    data = json.loads(line)
+    assert data["message"] == "kept 1"
+    assert data["user"] == "alice"
@@ -0,0 +1,44 @@
+"""Test event loop lag monitor."""
+import logging
+import time
+from asyncio import sleep
+
+import pytest
+
+from intape.core.loop_monitor import LOOP_LAG, SLOW_CALLBACKS, LoopMonitor
+
+
+def block_loop(seconds: float) -> None:
+    """Block the event loop."""
+    time.sleep(seconds)
+
+
+async def test_slow_callback(caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch):
+    """Test loop lag is measured and blocking code is logged with its stack."""
+    # Alembic's logging config disables existing loggers when migrations are tested
+    monkeypatch.setattr(logging.getLogger("intape.core.loop_monitor"), "disabled", False)
+    slow_callbacks = SLOW_CALLBACKS.labels().value
+    monitor = LoopMonitor(interval=0.01, slow_threshold=0.05)
+    with caplog.at_level(logging.WARNING, "intape.core.loop_monitor"):
+        await monitor.start()
+        await sleep(0.05)
+        block_loop(0.2)
+        await sleep(0.05)
+        await monitor.stop()
+
+    assert SLOW_CALLBACKS.labels().value == slow_callbacks + 1
+    blocked, lag = [record.message for record in caplog.records]
+    assert blocked.startswith("Event loop is blocked for more than 50.0 ms by:")
+    assert "in block_loop" in blocked
+    assert lag.startswith("Event loop was blocked for ")
+    assert LOOP_LAG.labels().get() < 0.05
+
+
+async def test_without_watchdog():
+    """Test lag is measured without the watchdog thread."""
+    monitor = LoopMonitor(interval=0.01, slow_threshold=None)
+    await monitor.start()
+    block_loop(0.05)
+    await sleep(0.02)
+    assert monitor._watchdog is None
+    await monitor.stop()
@@ -0,0 +1,83 @@
+"""Test metrics."""
+import pytest
+from fastapi.testclient import TestClient
+
+from intape import app
+from intape.core.metrics import Counter, Gauge, Histogram, Registry
+from intape.core.middlewares.metrics import REQUESTS
+
+
+def test_counter_and_gauge():
+    """Test counters and gauges are rendered with escaped labels."""
+    registry = Registry()
+    counter = Counter("requests_total", "Requests.", ["route"], registry=registry)
+    counter.labels('/a"b').inc()
+    counter.labels('/a"b').inc(2)
+    gauge = Gauge("in_flight", "In flight.", registry=registry)
+    gauge.inc()
+    gauge.dec(3)
+    lazy = Gauge("lazy", "Lazy.", registry=registry)
+    lazy.set_function(lambda: 42)
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 3.0',
+        "# HELP in_flight In flight.",
+        "# TYPE in_flight gauge",
+        "in_flight -2.0",
+        "# HELP lazy Lazy.",
+        "# TYPE lazy gauge",
+        "lazy 42.0",
+    ]
+
+
+def test_histogram():
+    """Test histogram buckets are cumulative."""
+    registry = Registry()
+    histogram = Histogram("duration_seconds", "Duration.", ["task"], registry=registry, buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 5):
+        histogram.labels("a").observe(value)
+    assert registry.render().splitlines()[2:] == [
+        'duration_seconds_bucket{task="a",le="0.1"} 2',
+        'duration_seconds_bucket{task="a",le="1.0"} 3',
+        'duration_seconds_bucket{task="a",le="+Inf"} 4',
+        'duration_seconds_sum{task="a"} 5.65',
+        'duration_seconds_count{task="a"} 4',
+    ]
+
+
+def test_registry_errors():
+    """Test duplicate metrics and wrong labels are rejected."""
+    registry = Registry()
+    counter = Counter("total", "Total.", ["a"], registry=registry)
+    with pytest.raises(ValueError):
+        Counter("total", "Total.", registry=registry)
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+
+
+def test_api_metrics():
+    """Test API requests are counted by route template."""
+    client = TestClient(app())
+    assert client.get("/v1/ping/").status_code == 200
+    assert client.get("/v1/video/not-a-number").status_code == 422
+    assert client.get("/not-found").status_code == 404
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    text = response.text
+    assert 'intape_http_requests_total{method="GET",route="/v1/ping/",status="200"}' in text
+    assert 'intape_http_requests_total{method="GET",route="/v1/video/{video_id}",status="422"}' in text
+    assert 'intape_http_requests_total{method="GET",route="<unmatched>",status="404"}' in text
+    assert "not-a-number" not in text
+    assert "intape_http_requests_in_flight 1.0" in text
+    assert "intape_db_pool_checked_out 0.0" in text
+
+
+def test_api_metrics_conditional_request():
+    """Test requests with the entity tag of a compressed variant are labeled by route template."""
+    client = TestClient(app())
+    ping = REQUESTS.labels("GET", "/v1/ping/", "200")
+    count = ping.value
+    headers = {"Accept-Encoding": "gzip", "If-None-Match": '"ping-1-gzip"'}
+    assert client.get("/v1/ping/", headers=headers).status_code == 200
+    assert ping.value == count + 1
@@ -0,0 +1,112 @@
+"""Test profilers."""
+import pstats
+from asyncio import gather, sleep
+from dataclasses import replace
+from pathlib import Path
+from threading import Event, Thread
+
+import pytest
+from aiohttp.test_utils import TestClient as AioTestClient
+from aiohttp.test_utils import TestServer
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from intape.app import App
+from intape.core.config import Config
+from intape.core.middlewares import ProfilingMiddleware
+from intape.core.profiling import (
+    CallProfiler,
+    ProfilerBusyException,
+    sample_stacks,
+)
+from intape.worker import Worker
+from intape.worker.server import create_app
+
+
+def spin(stopped: Event) -> None:
+    """Keep the thread busy."""
+    while not stopped.is_set():
+        sum(range(1000))
+
+
+async def test_sample_stacks():
+    """Test stacks of other threads are sampled."""
+    stopped = Event()
+    thread = Thread(target=spin, args=(stopped,))
+    thread.start()
+    try:
+        stacks, busy = await gather(sample_stacks(0.2, 0.001), sample_stacks(0.1), return_exceptions=True)
+    finally:
+        stopped.set()
+        thread.join()
+    assert isinstance(busy, ProfilerBusyException)
+    assert isinstance(stacks, str)
+    lines = [line for line in stacks.splitlines() if "spin_(" in line]
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.split(";")[-1].startswith("spin_(")
+
+
+def test_call_profiler(tmp_path: Path):
+    """Test profile is saved in the pstats format."""
+    with CallProfiler() as profiler:
+        with pytest.raises(ProfilerBusyException):
+            with CallProfiler():
+                pass
+        sum(range(1000))
+    path = tmp_path / "request.prof"
+    path.write_bytes(profiler.dump())
+    stats = pstats.Stats(str(path))
+    assert stats.total_calls > 0  # type: ignore[attr-defined]
+
+
+def test_request_profile(tmp_path: Path):
+    """Test requests with the profiling header are answered with the profile."""
+    app = FastAPI()
+
+    @app.get("/created")
+    async def created() -> None:
+        await sleep(0)
+
+    app.add_middleware(ProfilingMiddleware, token="secret")
+    client = TestClient(app)
+
+    assert client.get("/created").json() is None
+    assert client.get("/created", headers={"X-Intape-Profile": "wrong"}).status_code == 403
+
+    response = client.get("/created", headers={"X-Intape-Profile": "secret"})
+    assert response.status_code == 200
+    assert response.headers["X-Profiled-Status"] == "200"
+    assert response.headers["Content-Disposition"] == 'attachment; filename="request.prof"'
+    path = tmp_path / "request.prof"
+    path.write_bytes(response.content)
+    assert pstats.Stats(str(path)).total_calls > 0  # type: ignore[attr-defined]
+
+
+def test_profile_endpoint():
+    """Test the profile endpoint exists only with the profiling token."""
+    config = Config.from_env()
+    assert TestClient(App(config).app).get("/debug/profile").status_code == 404
+
+    client = TestClient(App(replace(config, PROFILING_TOKEN="secret")).app)
+    assert client.get("/debug/profile", headers={"X-Profiling-Token": "wrong"}).status_code == 403
+    response = client.get("/debug/profile?seconds=0.05", headers={"X-Profiling-Token": "secret"})
+    assert response.status_code == 200
+    assert response.headers["Content-Disposition"] == 'attachment; filename="profile.folded"'
+
+
+async def test_worker_profile_endpoint():
+    """Test the worker serves the profile endpoint with the profiling token."""
+    worker = Worker()
+    async with AioTestClient(TestServer(create_app(worker))) as client:
+        assert (await client.get("/debug/profile")).status == 404
+
+    worker.config = replace(worker.config, PROFILING_TOKEN="secret")
+    async with AioTestClient(TestServer(create_app(worker))) as client:
+        response = await client.get("/debug/profile?seconds=0.05", headers={"X-Profiling-Token": "wrong"})
+        assert response.status == 403
+        response = await client.get("/debug/profile?seconds=0.05", headers={"X-Profiling-Token": "secret"})
+        assert response.status == 200
+        # The event loop is blocked in the test client while the stacks are sampled
+        assert "_run_once" in await response.text()
@@ -0,0 +1,54 @@
+"""Test column-projection queries."""
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from intape.core.serialization import list_response
+from intape.models import CollectionEntryModel, UserModel, VideoModel
+from intape.schemas.collection import CollectionEntrySchema
+from intape.schemas.user import PublicUserSchema, UserAuthSchema
+from intape.schemas.video import VideoSchema
+
+
+def compile_query(query) -> str:
+    """Compile query to PostgreSQL SQL."""
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_select_schema():
+    """Test only the schema columns are selected, without joins."""
+    sql = compile_query(VideoModel.select_schema(VideoSchema))
+    selected = sql.split(" FROM ")[0]
+    for name in VideoSchema.__fields__:
+        assert f"videos.{name}" in selected
+    assert "verify_" not in selected
+    assert "JOIN" not in sql
+    assert "users" not in sql
+
+
+def test_schema_columns_order():
+    """Test columns follow the order of the schema fields."""
+    columns = UserModel.schema_columns(PublicUserSchema)
+    assert [column.name for column in columns] == list(PublicUserSchema.__fields__)
+
+
+def test_missing_column():
+    """Test schema fields without columns are rejected."""
+    with pytest.raises(ValueError, match="refresh_token, access_token, session_id"):
+        UserModel.select_schema(UserAuthSchema)
+
+
+def test_projected_rows_serialization():
+    """Test rows of projected queries are serialized like ORM objects."""
+    engine = create_engine("sqlite://")
+    table = CollectionEntryModel.__table__  # type: ignore[attr-defined]
+    table.create(engine)
+    with Session(engine) as session:
+        session.execute(table.insert().values(id=1, collection_id=2, user_id=3, video_id=4))
+        rows = session.execute(CollectionEntryModel.select_schema(CollectionEntrySchema)).all()
+    assert rows[0]._fields == tuple(CollectionEntrySchema.__fields__)
+    expected = [CollectionEntrySchema(id=1, collection_id=2, user_id=3, video_id=4, created_at=rows[0].created_at)]
+    assert list_response(CollectionEntrySchema, rows).body == JSONResponse(jsonable_encoder(expected)).body
@@ -0,0 +1,96 @@
+"""Test SQL statement statistics."""
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from intape.core.middlewares import QueryStatsMiddleware
+from intape.core.query_stats import (
+    REQUEST_LISTENERS,
+    QueryBudgetExceeded,
+    QueryStats,
+    instrument_engine,
+    query_budget,
+    track_queries,
+)
+
+
+def test_slowest_statements():
+    """Test only the slowest statements are kept, slowest first."""
+    stats = QueryStats()
+    for duration in (0.1, 0.5, 0.2, 0.05, 0.3):
+        stats.record(f"SELECT {duration}", duration)
+    assert stats.count == 5
+    assert stats.total_time == pytest.approx(1.15)
+    assert stats.slowest == [(0.5, "SELECT 0.5"), (0.3, "SELECT 0.3"), (0.2, "SELECT 0.2")]
+
+
+def test_track_queries():
+    """Test statements are recorded only while tracked."""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    instrument_engine(engine)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with track_queries() as stats:
+            conn.execute(text("SELECT 2"))
+            conn.execute(text("SELECT 3"))
+        conn.execute(text("SELECT 4"))
+    assert stats.count == 2
+    assert sorted(statement for _, statement in stats.slowest) == ["SELECT 2", "SELECT 3"]
+
+
+def make_app(budget: int, strict: bool) -> FastAPI:
+    """Create application executing statements."""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    app = FastAPI()
+
+    @app.get("/items/{count}")
+    async def get_items(count: int) -> int:
+        with engine.connect() as conn:
+            for i in range(count):
+                conn.execute(text(f"SELECT {i}"))
+        return count
+
+    @app.get("/budget/{count}")
+    @query_budget(5)
+    async def get_items_with_budget(count: int) -> int:
+        return await get_items(count)
+
+    app.add_middleware(QueryStatsMiddleware, routes=app.routes, budget=budget, strict=strict)
+    return app
+
+
+def test_budget_warning(caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch):
+    """Test requests over the budget are logged."""
+    # Alembic's logging config disables existing loggers when migrations are tested
+    monkeypatch.setattr(logging.getLogger("intape.core.middlewares.query_stats"), "disabled", False)
+    requests: list[tuple[str, QueryStats]] = []
+    REQUEST_LISTENERS.append(lambda route, stats: requests.append((route, stats)))
+    try:
+        client = TestClient(make_app(budget=2, strict=False))
+        with caplog.at_level(logging.WARNING, "intape.core.middlewares.query_stats"):
+            assert client.get("/items/2").status_code == 200
+            assert not caplog.records
+            assert client.get("/items/3").status_code == 200
+            assert client.get("/budget/4").status_code == 200
+    finally:
+        REQUEST_LISTENERS.clear()
+    assert [(route, stats.count) for route, stats in requests] == [
+        ("/items/{count}", 2),
+        ("/items/{count}", 3),
+        ("/budget/{count}", 4),
+    ]
+    assert len(caplog.records) == 1
+    assert "GET /items/{count} executed 3 statements, budget is 2" in caplog.records[0].message
+
+
+def test_budget_strict():
+    """Test requests over the budget fail in strict mode."""
+    client = TestClient(make_app(budget=2, strict=True))
+    assert client.get("/budget/5").status_code == 200
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/budget/6")
@@ -0,0 +1,55 @@
+"""Test jobs queue."""
+from datetime import datetime, timedelta
+
+from pytz import UTC
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from intape.models import JobModel
+from intape.worker import VERIFY_VIDEO, claim, enqueue
+from intape.worker.queue import backoff
+
+from .postgres import engine  # noqa: F401
+
+
+def test_enqueue():
+    """Test enqueued job is added to the session as pending."""
+    db = AsyncSession()
+    job = enqueue(db, VERIFY_VIDEO, {"video_id": 1}, max_attempts=10)
+    assert job in db.new
+    assert job.status == JobModel.PENDING
+    assert job.payload == {"video_id": 1}
+    assert job.attempts == 0
+    assert job.max_attempts == 10
+    assert job.run_at is not None
+
+
+def test_backoff():
+    """Test retry delay grows exponentially up to the cap."""
+    for attempts, limit in ((1, 10), (2, 20), (4, 80), (20, 60 * 60)):
+        delays = [backoff(attempts) for _ in range(100)]
+        assert all(0 <= delay <= limit for delay in delays)
+        assert max(delays) > limit / 2
+
+
+async def test_claim_expired_lease(engine: AsyncEngine):  # noqa: F811
+    """Test jobs with expired leases are claimed again until they have no attempts left."""
+    long_ago = datetime(2000, 1, 1, tzinfo=UTC)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        job = enqueue(db, "test_expired_lease", run_at=long_ago, max_attempts=2)
+        job.status = JobModel.RUNNING
+        job.attempts = 1
+        job.locked_until = long_ago
+        await db.commit()
+        try:
+            assert await claim(db) == [job]
+            assert (job.status, job.attempts) == (JobModel.RUNNING, 2)
+
+            job.locked_until = long_ago
+            await db.commit()
+            assert await claim(db) == []
+            assert job.status == JobModel.DEAD
+            assert job.locked_until is None
+        finally:
+            await db.execute(delete(JobModel).filter_by(id=job.id))
+            await db.commit()
@@ -0,0 +1,324 @@
+"""Test RPC client and decoders."""
+from asyncio import gather, sleep, wait_for
+from random import Random
+from time import monotonic
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from eth_abi.abi import encode
+
+from intape.core.rpc import (
+    EthClient,
+    InputDecoder,
+    MintNFTDecoder,
+    RateLimiter,
+    RPCResponseException,
+    RPCUnavailableException,
+    TransactionCache,
+    TransactionNotFoundException,
+    WSRPCClient,
+)
+from intape.core.rpc.client import EndpointPool
+from intape.core.rpc.erc721_abi import ERC721_ABI
+from intape.core.rpc.mint import MINT_NFT_SELECTOR
+
+from .fake_node import FakeNode
+
+
+def random_mint_input(rnd: Random) -> bytes:
+    """Return random mintNFT calldata."""
+    address = "0x" + rnd.randbytes(20).hex()
+    alphabet = "abcXYZ0123456789:/._-é€😀"
+    token_uri = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 200)))
+    return MINT_NFT_SELECTOR + encode(["address", "string"], [address, token_uri])
+
+
+def mutate(rnd: Random, data: bytes) -> bytes:
+    """Randomly corrupt calldata, keeping the selector."""
+    buf = bytearray(data)
+    action = rnd.randint(0, 2)
+    if action == 0:
+        return bytes(buf[: rnd.randint(4, len(buf))])
+    if action == 1:
+        buf[rnd.randint(4, len(buf) - 1)] = rnd.randint(0, 255)
+        return bytes(buf)
+    return bytes(buf + rnd.randbytes(rnd.randint(1, 64)))
+
+
+def decode_or_error(decoder: InputDecoder, data: bytes) -> object:
+    """Decode data, returning the type and the message of `ValueError` on failure.
+
+    Other exceptions are not caught, so they fail the test.
+    """
+    try:
+        return decoder.decode_function(data)
+    except ValueError as e:
+        return type(e), str(e)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_mint_decoder_matches_input_decoder(seed: int):
+    """Test MintNFTDecoder against InputDecoder on random valid calldata."""
+    rnd = Random(seed)
+    fast, generic = MintNFTDecoder(ERC721_ABI), InputDecoder(ERC721_ABI)
+    for _ in range(200):
+        data = random_mint_input(rnd)
+        assert fast.decode_function(data) == generic.decode_function(data)
+        assert fast.decode_function("0x" + data.hex()) == generic.decode_function(data)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_mint_decoder_matches_input_decoder_on_corrupted_input(seed: int):
+    """Test MintNFTDecoder against InputDecoder on corrupted calldata."""
+    rnd = Random(seed)
+    fast, generic = MintNFTDecoder(ERC721_ABI), InputDecoder(ERC721_ABI)
+    for _ in range(200):
+        data = mutate(rnd, random_mint_input(rnd))
+        assert decode_or_error(fast, data) == decode_or_error(generic, data)
+
+
+def test_decoders_raise_value_error():
+    """Test both decoders raise `ValueError` for calldata `eth_abi` can't decode."""
+    data = random_mint_input(Random(0))[:40]
+    for decoder in (MintNFTDecoder(ERC721_ABI), InputDecoder(ERC721_ABI)):
+        with pytest.raises(ValueError, match="Invalid arguments"):
+            decoder.decode_function(data)
+
+
+def test_mint_decoder_fallback():
+    """Test MintNFTDecoder falls back to InputDecoder for other selectors."""
+    generic = InputDecoder(ERC721_ABI)
+    selector = next(s for s, t in generic._selector_to_func_type.items() if t["name"] == "isApprovedForAll")
+    tx_input = selector + encode(["address", "address"], ["0x" + "11" * 20, "0x" + "22" * 20])
+    call = MintNFTDecoder(ERC721_ABI).decode_function(tx_input)
+    assert call == generic.decode_function(tx_input)
+    assert call.name == "isApprovedForAll"
+
+
+def rpc_app(result: object = "0x10", status: int = 200, delay: float = 0.0) -> web.Application:
+    """Return a fake JSON-RPC node application."""
+
+    async def handler(request: web.Request) -> web.Response:
+        request.app["calls"].append((await request.json())["method"])
+        await sleep(delay)
+        if status != 200:
+            return web.Response(status=status)
+        return web.json_response({"jsonrpc": "2.0", "id": 1, "result": result})
+
+    app = web.Application()
+    app["calls"] = []
+    app.router.add_post("/", handler)
+    return app
+
+
+async def test_rpc_failover():
+    """Test idempotent calls fail over to a healthy endpoint."""
+    async with TestServer(rpc_app(status=500)) as bad, TestServer(rpc_app()) as good:
+        async with EthClient([str(bad.make_url("/")), str(good.make_url("/"))]) as eth:
+            eth.rpc.backoff_base = 0
+            for _ in range(5):
+                assert await eth.get_block_number() == 16
+        assert len(bad.app["calls"]) == 1
+        assert len(good.app["calls"]) == 5
+
+
+async def test_rpc_timeout_retry():
+    """Test slow endpoint is abandoned after the call timeout."""
+    async with TestServer(rpc_app(delay=1)) as slow, TestServer(rpc_app()) as fast:
+        async with EthClient([str(slow.make_url("/")), str(fast.make_url("/"))], timeout=0.1) as eth:
+            eth.rpc.backoff_base = 0
+            assert await eth.get_block_number() == 16
+        assert slow.app["calls"] and fast.app["calls"]
+
+
+async def test_rpc_non_idempotent_not_retried():
+    """Test non-idempotent methods are sent only once."""
+    async with TestServer(rpc_app(status=500)) as bad:
+        async with EthClient(str(bad.make_url("/"))) as eth:
+            with pytest.raises(RPCUnavailableException):
+                await eth.rpc.eth_sendRawTransaction("0x00")
+        assert bad.app["calls"] == ["eth_sendRawTransaction"]
+
+
+async def test_rpc_error_response():
+    """Test JSON-RPC errors are raised and not retried."""
+    app = web.Application()
+    app.router.add_post("/", lambda _: web.json_response({"id": 1, "error": {"code": -32000, "message": "boom"}}))
+    async with TestServer(app) as server:
+        async with EthClient(str(server.make_url("/"))) as eth:
+            with pytest.raises(RPCResponseException) as e:
+                await eth.get_block_number()
+    assert e.value.code == -32000
+
+
+def test_endpoint_pool_routing():
+    """Test pool prefers the fastest endpoint and skips open circuit breakers."""
+    pool = EndpointPool(["a", "b", "c"], failure_threshold=2, cooldown=60)
+    a, b, c = pool.endpoints
+    a.record_success(0.3)
+    b.record_success(0.1)
+    c.record_success(0.2)
+    assert pool.select() is b
+    assert pool.select([b]) is c
+
+    b.record_failure(monotonic())
+    b.record_failure(monotonic())
+    assert not b.is_available(monotonic())
+    assert pool.select() is c
+
+    for endpoint in pool.endpoints:
+        endpoint.open_until = monotonic() + 10
+    b.open_until = monotonic() + 5
+    assert pool.select() is b
+
+
+def raw_tx(block_number: str | None = "0x1") -> dict[str, str | None]:
+    """Return a raw eth_getTransactionByHash result."""
+    return {
+        "blockHash": "0x" + "ab" * 32 if block_number else None,
+        "blockNumber": block_number,
+        "from": "0x" + "11" * 20,
+        "to": "0x" + "22" * 20,
+        "gas": "0x5208",
+        "gasPrice": "0x1",
+        "hash": "0x" + "cd" * 32,
+        "input": "0x",
+        "nonce": "0x0",
+    }
+
+
+async def test_eth_client_caches_mined_transactions():
+    """Test mined transactions are fetched only once."""
+    async with TestServer(rpc_app(result=raw_tx())) as node:
+        async with EthClient(str(node.make_url("/"))) as eth:
+            for _ in range(3):
+                tx = await eth.get_tx("0x" + "CD" * 32)
+                assert tx.blockNumber == 1
+        assert len(node.app["calls"]) == 1
+
+
+async def test_eth_client_negative_cache():
+    """Test pending and not found transactions are cached briefly."""
+    async with TestServer(rpc_app(result=raw_tx(None))) as pending, TestServer(rpc_app(result=None)) as missing:
+        async with EthClient(str(pending.make_url("/")), cache=TransactionCache(negative_ttl=60)) as eth:
+            assert (await eth.get_tx("0x01")).is_pending
+            assert (await eth.get_tx("0x01")).is_pending
+        async with EthClient(str(missing.make_url("/")), cache=TransactionCache(negative_ttl=0)) as eth:
+            for _ in range(2):
+                with pytest.raises(TransactionNotFoundException):
+                    await eth.get_tx("0x01")
+        assert len(pending.app["calls"]) == 1
+        assert len(missing.app["calls"]) == 2
+
+
+def test_transaction_cache_lru_and_persistence(tmp_path):
+    """Test cache evicts least recently used entries and persists mined ones."""
+    path = str(tmp_path / "tx.json")
+    cache = TransactionCache(maxsize=2, path=path)
+    cache.put("0xa", raw_tx())
+    cache.put("0xb", raw_tx())
+    cache.get("0xa")
+    cache.put("0xc", raw_tx())
+    cache.put("0xd", raw_tx(None))
+    assert cache.get("0xb") == (False, None)
+    assert cache.get("0xa")[0] and cache.get("0xc")[0] and cache.get("0xd")[0]
+    cache.save()
+
+    loaded = TransactionCache(path=path)
+    assert len(loaded) == 2
+    assert loaded.get("0xA") == (True, raw_tx())
+    assert loaded.get("0xd") == (False, None)
+
+
+async def test_rate_limiter_aimd():
+    """Test limiter halves concurrency on throttling and ramps up on success."""
+    limiter = RateLimiter(rate=0, max_concurrency=8)
+    await limiter.acquire()
+    await limiter.release(throttled=True)
+    assert limiter.limit == 4
+    await limiter.acquire()
+    await limiter.release(throttled=True)
+    assert limiter.limit == 2
+    for _ in range(20):
+        await limiter.acquire()
+        await limiter.release()
+    assert limiter.limit > 2
+    assert (limiter.in_flight, limiter.queue_depth) == (0, 0)
+
+
+async def test_rate_limiter_concurrency_and_rate():
+    """Test limiter caps concurrent calls and the request rate."""
+    limiter = RateLimiter(rate=50, burst=1, max_concurrency=2)
+    active, peak = 0, 0
+
+    async def call() -> None:
+        nonlocal active, peak
+        await limiter.acquire()
+        active += 1
+        peak = max(peak, active)
+        await sleep(0.01)
+        active -= 1
+        await limiter.release()
+
+    start = monotonic()
+    await gather(*(call() for _ in range(6)))
+    assert peak <= 2
+    assert monotonic() - start >= 5 / 50
+
+
+async def test_rpc_throttled_call_backs_off():
+    """Test rate limit errors lower concurrency and are retried."""
+    responses = [web.Response(status=429), web.json_response({"id": 1, "error": {"code": -32005, "message": "limit"}})]
+
+    async def handler(_: web.Request) -> web.Response:
+        return responses.pop(0) if responses else web.json_response({"id": 1, "result": "0x1"})
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+    async with TestServer(app) as server:
+        limiter = RateLimiter(rate=0, max_concurrency=8)
+        async with EthClient(str(server.make_url("/")), limiter=limiter) as eth:
+            eth.rpc.backoff_base = 0
+            assert await eth.get_block_number() == 1
+    assert limiter.limit < 8
+
+
+async def test_ws_concurrent_calls():
+    """Test WebSocket calls are matched to responses arriving out of order."""
+    async with FakeNode() as node, WSRPCClient(node.url) as ws:
+        results = await gather(ws.test_sleep(0.05), ws.test_sleep(0.01), ws.eth_blockNumber())
+        assert results == [0.05, 0.01, "0x0"]
+        with pytest.raises(RPCResponseException):
+            await ws.eth_unknownMethod()
+
+
+async def test_ws_subscription():
+    """Test WebSocket subscription receives notifications until cancelled."""
+    async with FakeNode() as node, WSRPCClient(node.url) as ws:
+        heads = await ws.subscribe("newHeads")
+        logs = await ws.subscribe("logs", {"address": "0x0"})
+        await node.new_head()
+        await node.new_log({"data": "0x"})
+        await node.new_head()
+        assert (await heads.__anext__())["number"] == "0x1"
+        assert (await heads.__anext__())["number"] == "0x2"
+        assert await logs.__anext__() == {"data": "0x"}
+        await heads.unsubscribe()
+        assert [head async for head in heads] == []
+        assert heads.id not in node.subscriptions
+
+
+async def test_ws_disconnect():
+    """Test pending calls and subscriptions fail when the connection is lost."""
+    async with FakeNode() as node, WSRPCClient(node.url) as ws:
+        heads = await ws.subscribe("newHeads")
+        call = gather(ws.test_sleep(1))
+        await sleep(0.01)
+        await node.disconnect()
+        with pytest.raises(RPCUnavailableException):
+            await wait_for(call, 1)
+        with pytest.raises(RPCUnavailableException):
+            await wait_for(heads.__anext__(), 1)
+        with pytest.raises(RPCUnavailableException):
+            await ws.eth_blockNumber()
@@ -0,0 +1,88 @@
+"""Test periodic tasks scheduler."""
+from asyncio import create_task, sleep, wait_for
+
+from intape.core.scheduler import Scheduler
+
+
+async def test_scheduler_no_overlap():
+    """Test runs of a slow job don't overlap and are skipped instead."""
+    scheduler = Scheduler()
+    active, peak, runs = 0, 0, 0
+
+    async def slow() -> None:
+        nonlocal active, peak, runs
+        active += 1
+        runs += 1
+        peak = max(peak, active)
+        await sleep(0.05)
+        active -= 1
+
+    job = scheduler.add(slow, every=0.02)
+    task = create_task(scheduler.run())
+    await sleep(0.17)
+    scheduler.stop()
+    await wait_for(task, 1)
+    assert peak == 1
+    assert 2 <= runs <= 4
+    assert job.skipped > 0
+    assert active == 0
+
+
+async def test_scheduler_timeout():
+    """Test job runs are cancelled after the timeout."""
+    scheduler = Scheduler()
+    finished = False
+
+    async def hang() -> None:
+        nonlocal finished
+        await sleep(10)
+        finished = True
+
+    job = scheduler.add(hang, every=10, timeout=0.01)
+    await wait_for(scheduler.run_once(), 1)
+    assert not finished
+    assert not job.running
+
+
+async def test_scheduler_trigger_coalesces():
+    """Test triggers during a run are coalesced into a single run."""
+    scheduler = Scheduler()
+    runs = 0
+
+    async def job() -> None:
+        nonlocal runs
+        runs += 1
+        await sleep(0.03)
+
+    scheduler.add(job, every=60)
+    task = create_task(scheduler.run())
+    await sleep(0.01)
+    for _ in range(5):
+        scheduler.trigger("job")
+    await sleep(0.1)
+    scheduler.stop()
+    await wait_for(task, 1)
+    assert runs == 2
+
+
+async def test_scheduler_stop_waits_for_running_jobs():
+    """Test stop lets running jobs finish and cancels them after the grace period."""
+    scheduler = Scheduler(shutdown_timeout=0.05)
+    finished = []
+
+    async def short() -> None:
+        await sleep(0.02)
+        finished.append("short")
+
+    async def long() -> None:
+        await sleep(10)
+        finished.append("long")
+
+    scheduler.add(short, every=60)
+    scheduler.add(long, every=60)
+    task = create_task(scheduler.run())
+    await sleep(0.01)
+    scheduler.stop()
+    await wait_for(task, 1)
+    assert finished == ["short"]
+    assert not any(job.running for job in scheduler.jobs.values())
@@ -0,0 +1,60 @@
+"""Test fast serialization."""
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from pytz import UTC
+
+from intape import app
+from intape.core.serialization import get_serializer, list_response
+from intape.schemas.collection import CollectionEntrySchema
+from intape.schemas.video import VideoSchema
+
+
+def make_videos(count: int) -> list[SimpleNamespace]:
+    """Create objects with video columns."""
+    return [
+        SimpleNamespace(
+            id=i,
+            description=f'Video "{i}" — ünïcode',
+            tags=["a", "b"],
+            file_cid="QmdkTR6yFkXLh96DtAgBqW2bDGsxYKDTKZSLGgHkP8niyU",
+            created_at=datetime(2022, 12, 1, 12, 30, i, 123456, tzinfo=UTC),
+            user_id=1,
+            metadata_cid="ipfs://QmdkTR6yFkXLh96DtAgBqW2bDGsxYKDTKZSLGgHkP8niyU",
+            is_deleted=False,
+        )
+        for i in range(count)
+    ]
+
+
+def test_same_as_validated():
+    """Test output is byte-for-byte equal to the validated response."""
+    videos = make_videos(3)
+    validated = jsonable_encoder([VideoSchema.from_orm(video) for video in videos])
+    expected = json.dumps(validated, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+    response = list_response(VideoSchema, videos)
+    assert response.body == expected
+    assert response.headers["Content-Type"] == "application/json"
+    assert list_response(VideoSchema, []).body == b"[]"
+
+
+def test_single_field_schema():
+    """Test schemas with a single field are serialized."""
+
+    class IdSchema(CollectionEntrySchema.__base__):  # type: ignore
+        """Schema with a single field."""
+
+    assert get_serializer(IdSchema).to_dicts([SimpleNamespace(video_id=1)]) == [{"video_id": 1}]
+
+
+def test_openapi_schema():
+    """Test list endpoints still document their response models."""
+    paths = TestClient(app()).get("/openapi.json").json()["paths"]
+    for path in ("/v1/video/", "/v1/search/videos", "/v1/user/{username}/videos"):
+        schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema["items"] == {"$ref": "#/components/schemas/VideoSchema"}
+    schema = paths["/v1/collection/{collection_id}/entry"]["get"]["responses"]["200"]["content"]["application/json"]
+    assert schema["schema"]["items"] == {"$ref": "#/components/schemas/CollectionEntrySchema"}
@@ -0,0 +1,95 @@
+"""Test coalescing of concurrent calls."""
+from asyncio import CancelledError, Event, create_task, gather, sleep
+
+import pytest
+
+from intape.core.singleflight import SingleFlight
+
+
+class Loader:
+    """Counting function waiting for the event to return."""
+
+    def __init__(self, result: object = "result") -> None:
+        """Initialize."""
+        self.result = result
+        self.calls = 0
+        self.cancelled = 0
+        self.release = Event()
+
+    async def __call__(self) -> object:
+        """Wait for the release and return the result."""
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def test_concurrent_calls_are_shared():
+    """Test concurrent calls of the same key share one call, and other keys don't."""
+    flight = SingleFlight()
+    loader, other = Loader(), Loader("other")
+    tasks = [create_task(flight.do("a", loader)) for _ in range(5)]
+    tasks.append(create_task(flight.do("b", other)))
+    await sleep(0)
+    assert len(flight) == 2
+    loader.release.set()
+    other.release.set()
+    assert await gather(*tasks) == ["result"] * 5 + ["other"]
+    assert (loader.calls, other.calls) == (1, 1)
+    assert len(flight) == 0
+
+    # Finished calls are not reused
+    assert await flight.do("a", loader) == "result"
+    assert loader.calls == 2
+
+
+async def test_exceptions_are_shared():
+    """Test all callers get the exception of the call."""
+    flight = SingleFlight()
+    loader = Loader(ValueError("not found"))
+    tasks = [create_task(flight.do("a", loader)) for _ in range(3)]
+    await sleep(0)
+    loader.release.set()
+    results = await gather(*tasks, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert loader.calls == 1
+    assert len(flight) == 0
+
+
+async def test_cancelled_caller():
+    """Test cancelling one caller doesn't cancel the call of the others."""
+    flight = SingleFlight()
+    loader = Loader()
+    first = create_task(flight.do("a", loader))
+    second = create_task(flight.do("a", loader))
+    await sleep(0)
+    first.cancel()
+    with pytest.raises(CancelledError):
+        await first
+    loader.release.set()
+    assert await second == "result"
+    assert (loader.calls, loader.cancelled) == (1, 0)
+
+
+async def test_all_callers_cancelled():
+    """Test the call is cancelled when all callers are, and new callers start a new call."""
+    flight = SingleFlight()
+    loader = Loader()
+    tasks = [create_task(flight.do("a", loader)) for _ in range(2)]
+    await sleep(0)
+    for task in tasks:
+        task.cancel()
+    await gather(*tasks, return_exceptions=True)
+    assert len(flight) == 0
+
+    task = create_task(flight.do("a", loader))
+    await sleep(0)
+    assert loader.cancelled == 1
+    loader.release.set()
+    assert await task == "result"
+    assert loader.calls == 2
@@ -0,0 +1,219 @@
+"""Test tracing spans."""
+import json
+import logging
+from asyncio import gather, sleep
+from io import StringIO
+from threading import Event
+from typing import Any
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from intape.core.middlewares import TracingMiddleware
+from intape.core.query_stats import instrument_engine
+from intape.core.tracing import (
+    NOOP_SPAN,
+    JSONExporter,
+    OTLPExporter,
+    Span,
+    SpanExporter,
+    Tracer,
+    get_tracer,
+    set_tracer,
+    span,
+    traced,
+)
+
+
+class ListExporter(SpanExporter):
+    """Keep finished traces in a list."""
+
+    def __init__(self) -> None:
+        """Initialize exporter."""
+        self.traces: list[Span] = []
+
+    def export(self, root: Span) -> None:
+        """Keep the trace."""
+        self.traces.append(root)
+
+
+def test_not_sampled():
+    """Test no spans are created outside of sampled traces."""
+    assert span("a") is NOOP_SPAN
+    exporter = ListExporter()
+    tracer = Tracer([exporter], sample_rate=0)
+    with tracer.trace("root") as root:
+        assert root is NOOP_SPAN
+        with span("child") as child:
+            child.set_attribute("a", 1)
+            assert child is NOOP_SPAN
+    assert not exporter.traces
+
+
+@traced()
+async def load(delay: float) -> None:
+    """Load something."""
+    await sleep(delay)
+
+
+async def test_span_tree():
+    """Test spans of concurrent tasks are added to the parent span."""
+    exporter = ListExporter()
+    tracer = Tracer([exporter], sample_rate=1)
+    with tracer.trace("root", user=1):
+        with span("parallel"):
+            await gather(load(0.01), load(0.02))
+        with pytest.raises(ValueError):
+            with span("failing"):
+                raise ValueError("boom")
+    await load(0)
+
+    (root,) = exporter.traces
+    assert [(depth, span.name) for depth, span in root.walk()] == [
+        (0, "root"),
+        (1, "parallel"),
+        (2, "load"),
+        (2, "load"),
+        (1, "failing"),
+    ]
+    assert {span.trace_id for _, span in root.walk()} == {root.trace_id}
+    parallel = root.children[0]
+    assert root.duration >= parallel.duration >= 0.02
+    assert root.children[1].error == "ValueError('boom')"
+    assert root.attributes == {"user": 1}
+
+
+def test_slow_trace_log(caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch):
+    """Test slow traces are logged with the span tree."""
+    # Alembic's logging config disables existing loggers when migrations are tested
+    monkeypatch.setattr(logging.getLogger("intape.core.tracing"), "disabled", False)
+    tracer = Tracer(sample_rate=1, slow_threshold=0)
+    with caplog.at_level(logging.WARNING, "intape.core.tracing"):
+        with tracer.trace("root"):
+            with span("child", cid="Qm"):
+                pass
+    (record,) = caplog.records
+    lines = record.message.splitlines()
+    assert lines[0].startswith("Slow root took ")
+    assert lines[1].startswith("root ")
+    assert lines[2].startswith("  child ") and lines[2].endswith(" ms cid=Qm")
+
+
+async def test_json_exporter():
+    """Test spans are written as JSON lines."""
+    stream = StringIO()
+    tracer = Tracer([JSONExporter(stream)], sample_rate=1)
+    with tracer.trace("root"):
+        with span("child", n=1):
+            pass
+    await tracer.close()
+    root, child = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert root["parent_id"] is None
+    assert child["parent_id"] == root["span_id"]
+    assert child["trace_id"] == root["trace_id"]
+    assert len(root["trace_id"]) == 32
+    assert child["name"] == "child"
+    assert child["attributes"] == {"n": 1}
+
+
+class BlockedStream(StringIO):
+    """Stream whose writes wait for the event."""
+
+    def __init__(self) -> None:
+        """Initialize stream."""
+        super().__init__()
+        self.unblocked = Event()
+
+    def write(self, s: str) -> int:
+        """Wait for the event and write."""
+        self.unblocked.wait()
+        return super().write(s)
+
+
+async def test_json_exporter_does_not_block():
+    """Test traces are written by a background thread."""
+    stream = BlockedStream()
+    tracer = Tracer([JSONExporter(stream)], sample_rate=1)
+    with tracer.trace("root"):
+        pass
+    assert stream.getvalue() == ""
+    stream.unblocked.set()
+    await tracer.close()
+    assert json.loads(stream.getvalue())["name"] == "root"
+
+
+async def test_otlp_exporter():
+    """Test spans are sent to the collector in batches."""
+    requests: list[dict[str, Any]] = []
+
+    async def collector(request: web.Request) -> web.Response:
+        requests.append(await request.json())
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_post("/v1/traces", collector)
+    async with TestServer(app) as server:
+        exporter = OTLPExporter(str(server.make_url("/v1/traces")), batch_size=2, interval=60)
+        tracer = Tracer([exporter], sample_rate=1)
+        with tracer.trace("root"):
+            with span("child", ok=True, ratio=0.5):
+                pass
+        await sleep(0.1)
+        assert len(requests) == 1
+        with tracer.trace("second"):
+            pass
+        await exporter.close()
+
+    assert len(requests) == 2
+    spans = requests[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root, child = spans
+    assert root["kind"] == 2 and "parentSpanId" not in root
+    assert child["parentSpanId"] == root["spanId"]
+    assert child["attributes"] == [
+        {"key": "ok", "value": {"boolValue": True}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+    ]
+    assert int(child["endTimeUnixNano"]) >= int(child["startTimeUnixNano"])
+    assert requests[1]["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == "second"
+
+
+def test_statement_spans():
+    """Test SQL statements are added to the current span."""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    exporter = ListExporter()
+    tracer = Tracer([exporter], sample_rate=1)
+    with engine.connect() as conn:
+        with tracer.trace("root"):
+            conn.execute(text("SELECT   1"))
+    (root,) = exporter.traces
+    (statement,) = root.children
+    assert statement.name == "db.statement"
+    assert statement.attributes == {"statement": "SELECT 1"}
+
+
+def test_request_trace():
+    """Test requests are traced with route templates."""
+    exporter = ListExporter()
+    previous = get_tracer()
+    set_tracer(Tracer([exporter], sample_rate=1))
+    try:
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int) -> int:
+            with span("load"):
+                return item_id
+
+        app.add_middleware(TracingMiddleware, routes=app.routes)
+        assert TestClient(app).get("/items/1").status_code == 200
+    finally:
+        set_tracer(previous)
+    (root,) = exporter.traces
+    assert root.name == "GET /items/{item_id}"
+    assert root.attributes == {"status": 200}
+    assert [span.name for span in root.children] == ["load"]
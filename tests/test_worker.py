@@ -1,8 +1,280 @@
 """Test worker."""
-from intape.worker import Worker
+from asyncio import create_task, sleep, wait_for
+from dataclasses import replace
+from datetime import datetime
+from secrets import token_hex
+from time import time
+from typing import AsyncIterator
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from eth_abi.abi import encode
+from eth_utils.abi import function_signature_to_4byte_selector
+from pytz import UTC
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from intape.core.cache import MemoryCache
+from intape.core.rpc import TransactionNotFoundException
+from intape.core.rpc.mint import MINT_NFT_SELECTOR
+from intape.core.rpc.types import Transaction
+from intape.models import FileModel, UserModel, VideoModel
+from intape.worker import JOBS_CHANNEL, VERIFY_VIDEO, Worker
+from intape.worker.server import create_app
+
+from .fake_node import FakeNode
+from .postgres import engine  # noqa: F401
 
 
 async def test_worker():
     """Test worker."""
     worker = Worker(debug=True)
     await worker.run()
+
+
+async def test_worker_watch_chain():
+    """Test contract logs trigger videos verification."""
+    async with FakeNode() as node:
+        worker = Worker(debug=True)
+        task = create_task(worker.watch_chain(node.url))
+        while not node.subscriptions:
+            await sleep(0.01)
+        await node.new_log({"data": "0x"})
+        job = worker.scheduler.jobs["verify_videos"]
+        job.next_run = float("inf")
+        while job.next_run == float("inf"):
+            await sleep(0.01)
+        task.cancel()
+
+
+async def test_worker_run_tasks_waits_for_cancelled_tasks(monkeypatch: pytest.MonkeyPatch):
+    """Test cancelled consumers finish their cleanup before the worker stops."""
+    worker = Worker()
+    worker.config = replace(worker.config, WORKER_HTTP_PORT=None, RPC_WS_URL=None)
+    finished = []
+
+    async def task(name: object) -> None:
+        try:
+            await sleep(3600)
+        finally:
+            # Like a rollback of the session
+            await sleep(0.01)
+            finished.append(name)
+
+    monkeypatch.setattr(worker, "consume", task)
+    monkeypatch.setattr(worker, "listen", lambda: task("listen"))
+    monkeypatch.setattr(worker.scheduler, "run", lambda: sleep(0.01))
+    await worker.run_tasks()
+    assert sorted(map(str, finished)) == sorted([*map(str, range(worker.config.WORKER_CONCURRENCY)), "listen"])
+
+
+async def test_worker_on_notify():
+    """Test job notifications wake up consumers."""
+    worker = Worker()
+    assert not worker.jobs_available.is_set()
+    worker.on_notify(None, 1, JOBS_CHANNEL, VERIFY_VIDEO)
+    assert worker.jobs_available.is_set()
+
+
+async def test_worker_resources():
+    """Test resources are shared between sessions and closed on exit."""
+    worker = Worker()
+    async with worker.resources as resources:
+        async with resources.session() as db1, resources.session() as db2:
+            assert db1 is not db2
+            assert db1.bind is db2.bind is resources.engine
+        eth_session = resources.eth.session
+        assert not eth_session.closed
+    assert eth_session.closed
+
+
+class FakeEth:
+    """Ethereum client returning a single transaction."""
+
+    def __init__(self, tx: Transaction | None) -> None:
+        """Initialize the client."""
+        self.tx = tx
+        self.requested: list[str] = []
+
+    async def get_tx(self, tx_hash: str) -> Transaction:
+        """Return the transaction."""
+        self.requested.append(tx_hash)
+        if self.tx is None:
+            raise TransactionNotFoundException(tx_hash)
+        return self.tx
+
+
+APPROVE_SELECTOR = function_signature_to_4byte_selector("approve(address,uint256)")
+
+
+def mint_tx(address: str, token_uri: str, block_number: int | None = 1) -> Transaction:
+    """Return mintNFT transaction."""
+    raw_input = "0x" + (MINT_NFT_SELECTOR + encode(["address", "string"], [address, token_uri])).hex()
+    return Transaction(None, block_number, "0x0", "0x0", 0, 0, "0x1", 0, raw_input)
+
+
+def pending_video() -> VideoModel:
+    """Return video waiting for verification."""
+    user = UserModel(eth_address="0x" + "ab" * 20)
+    return VideoModel(
+        id=1,
+        user=user,
+        tx_hash="0x1",
+        metadata_cid="ipfs://metadata",
+        is_confirmed=False,
+        verify_status=VideoModel.VERIFY_PENDING,
+        verify_attempts=0,
+    )
+
+
+async def test_verify_video_confirmed():
+    """Test valid mint transaction confirms the video."""
+    worker = Worker()
+    video = pending_video()
+    eth = FakeEth(mint_tx(video.user.eth_address, "ipfs://metadata"))
+    assert await worker.verify_video(video, eth) == VideoModel.VERIFY_CONFIRMED
+    assert video.is_confirmed
+    assert video.next_check_at is None
+
+
+async def test_verify_video_invalid():
+    """Test invalid transactions are not checked again."""
+    worker = Worker()
+    for tx in (
+        mint_tx("0x" + "cd" * 20, "ipfs://metadata"),
+        mint_tx("0x" + "ab" * 20, "ipfs://other"),
+        Transaction(None, 1, "0x0", "0x0", 0, 0, "0x1", 0, "0xdeadbeef"),
+        # Calldata of another function which can't be decoded
+        Transaction(None, 1, "0x0", "0x0", 0, 0, "0x1", 0, "0x" + APPROVE_SELECTOR.hex() + "00" * 10),
+    ):
+        video = pending_video()
+        assert await worker.verify_video(video, FakeEth(tx)) == VideoModel.VERIFY_INVALID
+        assert not video.is_confirmed
+        assert video.next_check_at is None
+
+
+async def test_verify_video_backoff():
+    """Test pending transactions are checked with exponential backoff until given up."""
+    worker = Worker()
+    video = pending_video()
+    delays = []
+    for eth in (FakeEth(None), FakeEth(mint_tx(video.user.eth_address, "ipfs://metadata", None))):
+        for _ in range(3):
+            assert await worker.verify_video(video, eth) == VideoModel.VERIFY_PENDING
+            assert video.next_check_at is not None
+            delays.append((video.next_check_at - datetime.now(tz=UTC)).total_seconds())
+    assert video.verify_attempts == 6
+    assert all(13 < delay / 2**i < 17 for i, delay in enumerate(delays))
+
+    video.verify_attempts = worker.verify_max_attempts - 1
+    assert await worker.verify_video(video, FakeEth(None)) == VideoModel.VERIFY_INVALID
+    assert video.next_check_at is None
+
+
+async def test_worker_server():
+    """Test worker serves metrics and reports unhealthy tasks."""
+    worker = Worker()
+    async with TestClient(TestServer(create_app(worker))) as client:
+        response = await client.get("/metrics")
+        assert response.status == 200
+        text = await response.text()
+        assert "# TYPE intape_task_runs_total counter" in text
+        # State of the limiter shared by the RPC clients
+        assert f"intape_rpc_concurrency_limit {float(worker.rpc_limiter.limit)}" in text
+        assert "intape_rpc_in_flight 0.0" in text
+        assert "intape_rpc_queue_depth 0.0" in text
+
+        response = await client.get("/healthz")
+        assert response.status == 200
+        assert (await response.json())["tasks"]["verify_videos"]["ok"]
+
+        worker.started_at -= 24 * 60 * 60
+        worker.scheduler.jobs["verify_videos"].last_success = time()
+        response = await client.get("/healthz")
+        assert response.status == 503
+        tasks = (await response.json())["tasks"]
+        assert tasks["verify_videos"]["ok"]
+        assert not tasks["remove_old_files"]["ok"]
+
+
+@pytest.fixture
+async def due_videos(engine: AsyncEngine) -> AsyncIterator[tuple[sessionmaker, list[VideoModel]]]:  # noqa: F811
+    """Return session maker and two videos due for verification, removed after the test."""
+    session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    suffix = token_hex(4)
+    async with session() as db:
+        user = UserModel(username="L" + suffix, eth_address="0x" + token_hex(20))
+        db.add(user)
+        await db.flush()
+        file = FileModel(cid="locked" + suffix, mime_type="video/mp4", user_id=user.id)
+        db.add(file)
+        await db.flush()
+        videos = [
+            VideoModel(
+                description="",
+                tags=[],
+                user_id=user.id,
+                file_cid=file.cid,
+                tx_hash=f"0x{i}{suffix}",
+                next_check_at=datetime(2000, 1, 1, tzinfo=UTC),
+            )
+            for i in range(2)
+        ]
+        db.add_all(videos)
+        await db.commit()
+
+    yield session, videos
+
+    async with session() as db:
+        await db.execute(delete(VideoModel).filter_by(user_id=user.id))
+        await db.execute(delete(FileModel).filter_by(cid=file.cid))
+        await db.execute(delete(UserModel).filter_by(id=user.id))
+        await db.commit()
+
+
+async def test_verify_videos_skips_locked(due_videos: tuple[sessionmaker, list[VideoModel]]):
+    """Test videos locked by another worker are not checked."""
+    session, (locked, free) = due_videos
+    eth = FakeEth(None)
+    async with session() as other, session() as db:
+        # Another worker claimed the video
+        await other.execute(select(VideoModel.id).filter_by(id=locked.id).with_for_update())
+        await Worker().verify_videos(db, None, eth)  # type: ignore
+    assert free.tx_hash in eth.requested
+    assert locked.tx_hash not in eth.requested
+
+
+async def test_job_verify_video(due_videos: tuple[sessionmaker, list[VideoModel]]):
+    """Test the job checks a pending video once and leaves retries to the video backoff."""
+    session, (locked, free) = due_videos
+    worker = Worker()
+    eth = FakeEth(None)
+    async with session() as other, session() as db:
+        await other.execute(select(VideoModel.id).filter_by(id=locked.id).with_for_update())
+        await worker.job_verify_video(db, None, eth, video_id=locked.id)  # type: ignore
+        # Pending transaction doesn't fail the job
+        await worker.job_verify_video(db, None, eth, video_id=free.id)  # type: ignore
+    assert eth.requested == [free.tx_hash]
+
+    async with session() as db:
+        video = await VideoModel.get(db, free.id)
+        assert video is not None
+        assert video.verify_status == VideoModel.VERIFY_PENDING
+        assert video.verify_attempts == 1
+        assert video.next_check_at is not None
+
+
+async def test_job_verify_video_invalidates_cache(due_videos: tuple[sessionmaker, list[VideoModel]]):
+    """Test cached responses of the video are deleted when its verification changes."""
+    session, (video, _) = due_videos
+    worker = Worker()
+    worker.cache = MemoryCache()
+    key = VideoModel.cache_key(video.id)
+    await worker.cache.set(key, b"body", tags=[key])
+    async with session() as db:
+        await worker.job_verify_video(db, None, FakeEth(None), video_id=video.id)  # type: ignore
+        assert await worker.cache.get(key) == b"body"
+        invalid = Transaction(None, 1, "0x0", "0x0", 0, 0, "0x1", 0, "0xdeadbeef")
+        await worker.job_verify_video(db, None, FakeEth(invalid), video_id=video.id)  # type: ignore
+    assert await worker.cache.get(key) is None
@@ -1,4 +1,5 @@
 """Test ping endpoint."""
+from typing import Callable, ContextManager
 
 from faker import Faker
 from fastapi.testclient import TestClient
@@ -13,7 +14,7 @@ def test_register(access_token: str):
     assert is_jwt(access_token)
 
 
-def test_login(signature: str, confirmation_jwt: str):
+def test_login(signature: str, confirmation_jwt: str, assert_queries: Callable[[int], ContextManager[None]]):
     """Test login endpoint."""
     client = TestClient(app())
 
@@ -22,42 +23,53 @@ def test_login(signature: str, confirmation_jwt: str):
         "signature": signature,
     }
     print(f"Payload: {payload}")
-    response = client.post("/v1/auth/login", json=payload)
+    # User and new session
+    with assert_queries(2):
+        response = client.post("/v1/auth/login", json=payload)
     print(f"Response: {response.text}")
     assert response.status_code == 200
     assert response.json()["access_token"] != ""
     assert is_jwt(response.json()["access_token"])
 
 
-def test_refresh_token(refresh_token: str):
+def test_refresh_token(refresh_token: str, assert_queries: Callable[[int], ContextManager[None]]):
     """Test refresh token endpoint."""
     client = TestClient(app())
-    response = client.post("/v1/auth/access_token", json=refresh_token)
+    with assert_queries(1):
+        response = client.post("/v1/auth/access_token", json=refresh_token)
     print(f"Response: {response.text}")
     assert response.status_code == 200
     assert is_jwt(response.json())
 
 
-def test_check_username(faker: Faker):
+def test_check_username(faker: Faker, username: str, assert_queries: Callable[[int], ContextManager[None]]):
     """Test check username endpoint."""
     client = TestClient(app())
-    username = faker.user_name()[:16]
 
-    response = client.get(f"/v1/auth/check_username?username={username}")
+    response = client.get(f"/v1/auth/check_username?username={faker.user_name()[:16]}")
     assert response.status_code == 200
     assert isinstance(response.json(), bool)
 
+    with assert_queries(1):
+        response = client.get(f"/v1/auth/check_username?username={username}")
+    assert response.status_code == 200
+    assert response.json() is False
+
 
-def test_valid_auth(access_token: str, username: str):
+def test_valid_auth(access_token: str, username: str, assert_queries: Callable[[int], ContextManager[None]]):
     """Test valid auth."""
     client = TestClient(app())
-    response = client.get("/v1/auth/check_auth", headers={"Authorization": f"Bearer {access_token}"})
+    # Session with its user
+    with assert_queries(1):
+        response = client.get("/v1/auth/check_auth", headers={"Authorization": f"Bearer {access_token}"})
     assert response.status_code == 200
     assert response.json()["username"] == username
 
 
-def test_invalid_auth():
+def test_invalid_auth(assert_queries: Callable[[int], ContextManager[None]]):
     """Test invalid auth."""
     client = TestClient(app())
-    response = client.get("/v1/auth/check_auth", headers={"Authorization": f"Bearer some.invalid.token"})
+    # Invalid tokens are rejected before querying the session
+    with assert_queries(0):
+        response = client.get("/v1/auth/check_auth", headers={"Authorization": f"Bearer some.invalid.token"})
     assert response.status_code != 200
@@ -1,6 +1,8 @@
 """Test file endpoints."""
 
 from io import BytesIO
+from secrets import token_bytes
+from typing import Callable, ContextManager
 
 from fastapi.testclient import TestClient
 
@@ -8,11 +10,13 @@ from intape import app
 from tests.fixtures import *
 
 
-def test_file_upload(access_token: str):
+def test_file_upload(access_token: str, assert_queries: Callable[[int], ContextManager[None]]):
     """Test file upload endpoint."""
     client = TestClient(app())
     client.headers["Authorization"] = f"Bearer {access_token}"
-    response = client.post("/v1/file/upload", files={"file": BytesIO(b"test")})
+    # Session with its user, file, expiry job and its notification
+    with assert_queries(4):
+        response = client.post("/v1/file/upload", files={"file": BytesIO(token_bytes(16))})
     print(f"Response: {response.text}")
     assert response.status_code == 200
     assert response.json().startswith("Qm")
@@ -1,16 +1,68 @@
 """Test user endpoints."""
+from dataclasses import replace
+from typing import Callable, ContextManager
 
 from fastapi.testclient import TestClient
 
 from intape import app
+from intape.app import App
+from intape.core.config import Config
 from tests.fixtures import *
 
 
-def test_get_user_info(username: str):
+def test_get_user_info(username: str, assert_queries: Callable[[int], ContextManager[None]]):
     """Test get user info endpoint."""
     client = TestClient(app())
-    response = client.get(f"/v1/user/{username}")
+    with assert_queries(1):
+        response = client.get(f"/v1/user/{username}")
     print(f"Response: {response.text}")
     assert response.status_code == 200
     assert isinstance(response.json(), dict)
     assert response.json()["username"] == username
+
+
+def test_get_user_info_cached(username: str, assert_queries: Callable[[int], ContextManager[None]]):
+    """Test user info is cached, and not sent again when the entity tag matches."""
+    client = TestClient(App(replace(Config.from_env(), CACHE_URL="memory://")).app)
+    etag = client.get(f"/v1/user/{username}").headers["ETag"]
+    with assert_queries(0):
+        response = client.get(f"/v1/user/{username}")
+        assert response.status_code == 200
+        assert response.headers["ETag"] == etag
+        response = client.get(f"/v1/user/{username}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_get_user_info_not_modified(username: str, assert_queries: Callable[[int], ContextManager[None]]):
+    """Test only the version is queried when the entity tag matches."""
+    client = TestClient(App(replace(Config.from_env(), CACHE_URL=None)).app)
+    etag = client.get(f"/v1/user/{username}").headers["ETag"]
+    with assert_queries(1):
+        response = client.get(f"/v1/user/{username}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    response = client.get(f"/v1/user/{username}", headers={"If-None-Match": '"users-0-0"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == etag
+
+
+def test_get_user_videos(username: str, assert_queries: Callable[[int], ContextManager[None]]):
+    """Test get user videos endpoint."""
+    client = TestClient(app())
+    # User ID and videos
+    with assert_queries(2):
+        response = client.get(f"/v1/user/{username}/videos")
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+
+
+def test_get_user_collections(username: str, assert_queries: Callable[[int], ContextManager[None]]):
+    """Test get user collections endpoint."""
+    client = TestClient(app())
+    # User ID and collections
+    with assert_queries(2):
+        response = client.get(f"/v1/user/{username}/collections")
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
@@ -0,0 +1,46 @@
+"""Test video endpoints."""
+from io import BytesIO
+from secrets import token_bytes
+from typing import Callable, ContextManager
+
+import pytest
+from fastapi.testclient import TestClient
+
+from intape import app
+from intape.core.ipfs import InstrumentedIPFSClient
+from tests.fixtures import *
+
+
+def test_create_and_get_video(
+    access_token: str, assert_queries: Callable[[int], ContextManager[None]], monkeypatch: pytest.MonkeyPatch
+):
+    """Test video is created without IPFS and read with the expected number of statements."""
+    client = TestClient(app())
+    client.headers["Authorization"] = f"Bearer {access_token}"
+    file_cid = client.post(
+        "/v1/file/upload", files={"file": ("video.mp4", BytesIO(token_bytes(16)), "video/mp4")}
+    ).json()
+
+    async def add_formdata(*args: object, **kwargs: object) -> str:
+        raise AssertionError("The metadata is added to IPFS by the worker")
+
+    monkeypatch.setattr(InstrumentedIPFSClient, "_add_formdata", add_formdata)
+    # Session with its user, file, update of the file, video, metadata pinning job and its notification
+    with assert_queries(6):
+        response = client.post("/v1/video/", json={"description": "Test video", "tags": ["test"], "file_cid": file_cid})
+    assert response.status_code == 200
+    video = response.json()
+    assert video["file_cid"] == file_cid
+    assert video["created_at"] is not None
+    assert video["metadata_cid"].startswith("ipfs://Qm")
+
+    with assert_queries(1):
+        response = client.get(f"/v1/video/{video['id']}")
+    assert response.status_code == 200
+    assert response.json() == video
+
+    # Session, user and videos
+    with assert_queries(3):
+        response = client.get("/v1/video/")
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)